@@ -5,10 +5,13 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__f
 
 # Internal
 import argparse
+import concurrent.futures
 
 # Local
+import database
 import distribute
 import util
+import check_batch_pack_fqdn
 
 #-------------------------------------------------------------------------------
 
@@ -17,11 +20,15 @@ class TaskFqdn(distribute.Task):
     def __init__(self, 
                  domains_database_user,
                  domains_database_password,
+                 domains_database_backend,
+                 domains_database_path_file,
                  inspect_date,
                  batch_pack_path,
                  fqdn_file_name):
         self._domains_database_user = domains_database_user
         self._domains_database_password = domains_database_password
+        self._domains_database_backend = domains_database_backend
+        self._domains_database_path_file = domains_database_path_file
         self._inspect_date = inspect_date
         self._fqdn_path_file = os.path.join(batch_pack_path, fqdn_file_name)
         self._report_path_file = os.path.join(batch_pack_path, fqdn_file_name.replace(".fqdn.txt", ".report.txt"))
@@ -39,11 +46,20 @@ class TaskFqdn(distribute.Task):
                    fqdn_py_path_file,
                    "--domains_database_user", self._domains_database_user,
                    "--domains_database_password", self._domains_database_password, 
+                   "--domains_database_backend", self._domains_database_backend,
                    "--inspect_date", self._inspect_date.isoformat(),
                    "--fqdn_path_file", self._fqdn_path_file,
                    "--report_path_file", self._report_path_file]
+        if self._domains_database_path_file is not None:
+            command = command + ["--domains_database_path_file", self._domains_database_path_file]
         return command
 
+    def make_call(self):
+        # As the command, without the interpreter and script.
+        return (distribute.call_main,
+                check_batch_pack_fqdn.start_pool,
+                self.get_popen_command()[2:])
+
 #-------------------------------------------------------------------------------
 
 class Main():
@@ -52,10 +68,13 @@ class Main():
         # Arguments.
         self._batch_pack_path = None
         self._core_total = None
+        self._pool = None
 
         # State.
         self._domains_database_user = None
         self._domains_database_password = None
+        self._domains_database_backend = None
+        self._domains_database_path_file = None
         self._inspect_date = None
 
     def process_arguments(self):
@@ -72,34 +91,55 @@ class Main():
                             help="Number of cores. "
                                  "Must be 1 or more. "
                                  "(Mandatory)")
+        argument_parser.add_argument("--pool",
+                                     default=False,
+                                     action="store_true",
+                                     help="Check parts within a pool of long lived processes, one per core, "
+                                          "each retaining its Domains Database connection across parts, "
+                                          "rather than a process per part. "
+                                          "(Optional)")
 
         namespace = argument_parser.parse_args()
         self._batch_pack_path = util.make_item_path_exist(namespace.batch_pack_path)
         self._core_total = util.make_int_ge(namespace.core_total, 1)
+        self._pool = namespace.pool
 
     def process_config(self):
         self._config = util.Config(self._batch_pack_path)
         self._config.read()
         self._domains_database_user = self._config.get_value("domains_database_user")
         self._domains_database_password = self._config.get_value("domains_database_password")
+        # Optional, as packs made before the sqlite backend are of MariaDB.
+        self._domains_database_backend = self._config.find_none_value("domains_database_backend")
+        if self._domains_database_backend is None:
+            self._domains_database_backend = database.MARIADB
+        self._domains_database_path_file = self._config.find_none_value("domains_database_path_file")
         self._inspect_date = self._config.get_value("inspect_date")
 
     def process_fqdns(self):
+        executor = None
+        if self._pool:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=self._core_total)
         task_manager = distribute.TaskManager(label="FQDNS",
                                               core_total=self._core_total,
                                               idle_freq_seconds=5,
-                                              track_freq_seconds=30)
+                                              track_freq_seconds=30,
+                                              executor=executor)
         file_names = os.listdir(self._batch_pack_path)
         for file_name in sorted(file_names):
             if file_name.endswith(".fqdn.txt"):
                 fqdn_path_file = os.path.join(self._batch_pack_path, file_name)
                 task_fqdn = TaskFqdn(self._domains_database_user,
                                      self._domains_database_password,
+                                     self._domains_database_backend,
+                                     self._domains_database_path_file,
                                      self._inspect_date,
                                      self._batch_pack_path,
                                      file_name)
                 task_manager.add_task(task_fqdn)
         task_manager.execute()
+        if executor is not None:
+            executor.shutdown()
 
     def start(self):
         self.process_arguments()
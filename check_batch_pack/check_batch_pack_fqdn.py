@@ -14,10 +14,19 @@ import database
 
 class Main():
 
-    def __init__(self):
+    # Fqdns read, then inspected, at a time.
+    CHUNK_TOTAL = 1000
+
+    def __init__(self, pool=False):
+        # Within a pool process, the Domains Database is retained across
+        # parts.
+        self._pool = pool
+
         # Arguments.
         self._domains_database_user = None
         self._domains_database_password = None
+        self._domains_database_backend = None
+        self._domains_database_path_file = None
         self._inspect_date = None
         self._rdap = None
         self._fqdn_path_file = None
@@ -27,7 +36,7 @@ class Main():
         self._domains_db = None
         ###self._rdap = None
 
-    def process_arguments(self):
+    def process_arguments(self, arguments):
         argument_parser = argparse.ArgumentParser()
         argument_parser.add_argument("--domains_database_user",
                                      type=str,
@@ -39,6 +48,18 @@ class Main():
                                      required=True,
                                      help="Domains Database password. "
                                           "(Mandatory)")
+        argument_parser.add_argument("--domains_database_backend",
+                                     type=str,
+                                     choices=database.BACKENDS,
+                                     default=database.MARIADB,
+                                     help="Domains Database backend. "
+                                          f"Default: {database.MARIADB}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_path_file",
+                                     type=str,
+                                     default=None,
+                                     help=f"Domains Database path file, for the {database.SQLITE} backend. "
+                                          "(Optional)")
         argument_parser.add_argument("--inspect_date",
                                      type=str,
                                      required=True,
@@ -57,23 +78,32 @@ class Main():
                                           "May exist. Parent path must exist. "
                                           "(Mandatory)")
 
-        namespace = argument_parser.parse_args()
+        namespace = argument_parser.parse_args(arguments)
         self._domains_database_user = namespace.domains_database_user
         self._domains_database_password = namespace.domains_database_password
+        self._domains_database_backend = namespace.domains_database_backend
+        self._domains_database_path_file = namespace.domains_database_path_file
         self._inspect_date = util.make_item_date(namespace.inspect_date)
         self._fqdn_path_file = util.make_item_path_file_exist(namespace.fqdn_path_file)
         self._report_path_file = util.make_item_path_file_viable(namespace.report_path_file)
-        self._domains_db = database.DomainsDB(self._domains_database_user,
-                                              self._domains_database_password)
+        if self._pool:
+            self._domains_db = database.PoolDomainsDB.get(self._domains_database_backend,
+                                                          self._domains_database_user,
+                                                          self._domains_database_password,
+                                                          self._domains_database_path_file)
+        else:
+            self._domains_db = database.make_domains_db(self._domains_database_backend,
+                                                        self._domains_database_user,
+                                                        self._domains_database_password,
+                                                        self._domains_database_path_file)
 
-    def process_fqdn(self, report_handle, sld_label, tld_label):
+    def process_fqdn(self, report_handle, sld_label, tld_label, result):
         free = True
         sources = []
-        result = self._domains_db.inspect_fqdn(sld_label, tld_label)
         if result is not None:
             (sources, start_none_date, until_none_date) = result
             if len(sources) == 0:
-                msg = f"Unexpected zero sources result for FQDN: {fqdn}\n"
+                msg = f"Unexpected zero sources result for FQDN: {sld_label}.{tld_label}\n"
                 util.stop(msg)
             if ((start_none_date is not None) and (until_none_date is not None)):
                 if ((start_none_date <= self._inspect_date) and (self._inspect_date <= until_none_date)):
@@ -82,9 +112,16 @@ class Main():
         if free:
             report_handle.write(f"{sld_label}.{tld_label}#{','.join(sources)}\n")
 
+    def process_chunk(self, report_handle, sld_tld_labels):
+        # Inspected together, rather than a round trip per fqdn.
+        results = self._domains_db.inspect_fqdns(sld_tld_labels)
+        for ((sld_label, tld_label), result) in zip(sld_tld_labels, results):
+            self.process_fqdn(report_handle, sld_label, tld_label, result)
+
     def process_fqdns(self):
         fqdn_handle = open(self._fqdn_path_file, "r")
         report_handle = open(self._report_path_file, "w")
+        sld_tld_labels = []
         for line in fqdn_handle:
             fqdn = line.strip()
             fqdn_parts = fqdn.split(sep=".")
@@ -94,14 +131,28 @@ class Main():
             else:
                 msg = f"Unexpected FQDN: {fqdn}\n"
                 util.stop(msg)
-            self.process_fqdn(report_handle, sld_label, tld_label)
+            sld_tld_labels.append((sld_label, tld_label))
+            if len(sld_tld_labels) == Main.CHUNK_TOTAL:
+                self.process_chunk(report_handle, sld_tld_labels)
+                sld_tld_labels = []
+        if len(sld_tld_labels) > 0:
+            self.process_chunk(report_handle, sld_tld_labels)
         report_handle.close()
         fqdn_handle.close()
 
-    def start(self):
-        self.process_arguments()
+    def start(self, arguments=None):
+        self.process_arguments(arguments)
         self.process_fqdns()
 
+#-------------------------------------------------------------------------------
+
+def start_pool(arguments):
+    # Within a pool process, through distribute.call_main.
+    main = Main(pool=True)
+    main.start(arguments)
+
+#-------------------------------------------------------------------------------
+
 if __name__ == '__main__':
     main = Main()
     main.start()
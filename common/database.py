@@ -1,14 +1,27 @@
 # Internal
+import collections
 import os
+import sqlite3
 import sys
 import datetime
+import time
 
-# External
-import mariadb
+# External, only for the MariaDB backend, so the sqlite backend needs no
+# server or client.
+try:
+    import mariadb
+except ImportError:
+    mariadb = None
 
 # Local
 import util
 
+# Backends.
+MARIADB = "mariadb"
+SQLITE = "sqlite"
+
+BACKENDS = [MARIADB, SQLITE]
+
 #-------------------------------------------------------------------------------
 
 def make_none_date_sql(item_none_date):
@@ -20,27 +33,113 @@ def make_none_date_sql(item_none_date):
 
 #-------------------------------------------------------------------------------
 
+class SldIdCache():
+
+    def __init__(self, total):
+        # Least recently used, as an sld id never changes once made. A total
+        # of 0 holds none.
+        self._total = total
+        self._sld_label_to_sld_id = collections.OrderedDict()
+        self._hit_total = 0
+        self._miss_total = 0
+
+    def get_hit_total(self):
+        return self._hit_total
+
+    def get_miss_total(self):
+        return self._miss_total
+
+    def find_none_sld_id(self, sld_label):
+        sld_id = self._sld_label_to_sld_id.get(sld_label)
+        if sld_id is None:
+            self._miss_total = self._miss_total + 1
+        else:
+            self._hit_total = self._hit_total + 1
+            self._sld_label_to_sld_id.move_to_end(sld_label)
+        return sld_id
+
+    def add(self, sld_label, sld_id):
+        if self._total > 0:
+            self._sld_label_to_sld_id[sld_label] = sld_id
+            self._sld_label_to_sld_id.move_to_end(sld_label)
+            if len(self._sld_label_to_sld_id) > self._total:
+                self._sld_label_to_sld_id.popitem(last=False)
+
+#-------------------------------------------------------------------------------
+
 class DomainsDB():
 
     # Sources
     ZONE_FILE="ZONE_FILE"
     RDAP="RDAP"
 
+    # As the order of the sources SET, as presented by MariaDB.
+    SOURCES = [ZONE_FILE, RDAP]
+
+    INSERT_IGNORE = "INSERT IGNORE"
+
+    # As the sld table, so staged labels compare as stored labels.
+    LABEL_TYPE = "VARCHAR(63)"
+
+    DATABASE_NAME = "domains"
+
+    # Bulk staging table, per connection.
+    SLD_STAGE = "sld_stage"
+
+    # Write batch.
+    BATCH_COMMIT_TOTAL = 1000
+    BATCH_COMMIT_FREQ_SECONDS = 5
+
+    # Most values within a single IN list.
+    SELECT_TOTAL = 1000
+
+    SLD_ID_CACHE_TOTAL = 1000000
+
+    # Slds staged per extend statement, each its own transaction.
+    EXTEND_SLD_TOTAL = 100000
+
     def __init__(self,
                  database_user,
-                 database_password):
+                 database_password,
+                 sld_id_cache_total=SLD_ID_CACHE_TOTAL,
+                 upsert=False,
+                 database_name=DATABASE_NAME):
+        self._database_user = database_user
+        self._database_password = database_password
+        self._database_name = database_name
+        self._con = None
+        self._connect()
+        self._cur = self._con.cursor()
+        self._tld_label_to_tld_id = {}
+        self._tld_id_to_captures = {}
+        self._sld_stage = False
+        self._sld_id_cache_total = sld_id_cache_total
+        self._sld_id_cache = SldIdCache(self._sld_id_cache_total)
+        self._sld_dictionary = None
+        self._upsert = upsert
+        self._batch_updates = None
+        self._batch_commit_total = None
+        self._batch_commit_freq_seconds = None
+        self._batch_seconds = None
+        self._update_tld_label_to_tld_id()
+
+    def _connect(self):
+        if mariadb is None:
+            msg = f"Backend {MARIADB} requires the mariadb package\n"
+            util.stop(msg)
         try:
-            self._con = mariadb.connect(user=database_user,
-                                        password=database_password,
-                                        database="domains")
+            self._con = mariadb.connect(user=self._database_user,
+                                        password=self._database_password,
+                                        database=self._database_name)
         except mariadb.Error as e:
             msg=f"Error connecting to database: {e}\n"
             util.stop(msg)
         self._con.autocommit = False
-        self._cur = self._con.cursor()
-        self._tld_label_to_tld_id = {}
-        self._tld_id_to_captures = {}
-        self._update_tld_label_to_tld_id()
+
+    def _make_sources(self, sources_sql):
+        # In the order of SOURCES, whatever the order written.
+        sources = sources_sql.split(",")
+        return [source for source in DomainsDB.SOURCES if source in sources]
 
     def _update_tld_label_to_tld_id(self):
         self._tld_label_to_tld_id = {}
@@ -48,10 +147,11 @@ class DomainsDB():
                           "FROM tld;")
         self._con.commit()
         result_tuples = list(self._cur)
+        # Keyed lower cased, as labels compare ignoring case.
         for result_tuple in result_tuples:
             tld_label = result_tuple[0]
             tld_id = result_tuple[1]
-            self._tld_label_to_tld_id[tld_label] = tld_id 
+            self._tld_label_to_tld_id[tld_label.lower()] = tld_id 
 
     def _update_tld_id_to_captures(self):
         self._tld_id_to_captures = {}
@@ -62,56 +162,113 @@ class DomainsDB():
         for result_tuple in result_tuples:
             tld_id = result_tuple[0]
             capture_date = result_tuple[1]
-            if 
+            if tld_id not in self._tld_id_to_captures.keys():
+                self._tld_id_to_captures[tld_id] = set()
+            self._tld_id_to_captures[tld_id].add(capture_date)
+
+    def find_captures(self, req_tld_label):
+        # As the capture dates recorded for the tld, sorted, as read afresh,
+        # since another load may have recorded one meanwhile.
+        self._update_tld_id_to_captures()
+        tld_id = self._find_tld_id(req_tld_label)
+        if tld_id in self._tld_id_to_captures.keys():
+            captures = sorted(self._tld_id_to_captures[tld_id])
+        else:
+            captures = []
+        return captures
 
-            self._tld_label_to_tld_id[tld_label] = tld_id 
+    def add_capture(self, req_tld_label, req_capture_date):
+        # Recorded once every sld of the capture is loaded, as a single
+        # committed insert, so a capture is only ever recorded whole.
+        # Ignored, should another load record the same capture meanwhile.
+        tld_id = self._make_tld_id(req_tld_label)
+        self._cur.execute(f"{self.INSERT_IGNORE} INTO zone_file (tld_id, capture) "
+                          "VALUES (?, ?);",
+                          (tld_id, make_none_date_sql(req_capture_date)))
+        self._con.commit()
 
+    def get_sld_id_cache(self):
+        return self._sld_id_cache
 
-    def _find_none_sld_id(self, req_sld_label):
-        self._cur.execute("SELECT sld.sld_id "
+    def get_sld_dictionary(self):
+        return self._sld_dictionary
+
+    def set_sld_dictionary(self, sld_dictionary):
+        # Consulted first, as made before the load, so most slds need
+        # neither a select nor an insert.
+        self._sld_dictionary = sld_dictionary
+
+    def warm_sld_ids(self, req_first_sld_label, req_last_sld_label):
+        # As a single range select over the slds of a sorted part, bounded
+        # by the cache total.
+        self._cur.execute("SELECT sld.sld_label, sld.sld_id "
                           "FROM sld "
-                          "WHERE sld.sld_label=?;",
-                          (req_sld_label,))
+                          "WHERE sld.sld_label BETWEEN ? AND ? "
+                          "ORDER BY sld.sld_label "
+                          "LIMIT ?;",
+                          (req_first_sld_label, req_last_sld_label, self._sld_id_cache_total))
         self._con.commit()
-        result_tuples = list(self._cur)
-        if len(result_tuples) == 0:
-            sld_id = None
-        elif len(result_tuples) == 1:
-            sld_id = result_tuples[0][0]
-        else:
-            msg = f"SQL: Unexpected result: {result_tuples}\n"
-            util.stop(msg)
+        for result_tuple in self._cur:
+            self._sld_id_cache.add(result_tuple[0], result_tuple[1])
+
+    def _find_none_sld_id(self, req_sld_label):
+        sld_id = None
+        if self._sld_dictionary is not None:
+            sld_id = self._sld_dictionary.find_none_sld_id(req_sld_label)
+        if sld_id is None:
+            sld_id = self._sld_id_cache.find_none_sld_id(req_sld_label)
+        if sld_id is None:
+            self._cur.execute("SELECT sld.sld_id "
+                              "FROM sld "
+                              "WHERE sld.sld_label=?;",
+                              (req_sld_label,))
+            self._con.commit()
+            result_tuples = list(self._cur)
+            if len(result_tuples) == 0:
+                sld_id = None
+            elif len(result_tuples) == 1:
+                sld_id = result_tuples[0][0]
+                self._sld_id_cache.add(req_sld_label, sld_id)
+            else:
+                msg = f"SQL: Unexpected result: {result_tuples}\n"
+                util.stop(msg)
         return sld_id
 
     def _make_sld_id(self, req_sld_label):
         sld_id = self._find_none_sld_id(req_sld_label)
         if sld_id is None:
-            self._cur.execute("INSERT INTO sld (sld.sld_label) "
+            self._cur.execute("INSERT INTO sld (sld_label) "
                               "VALUES (?);",
                               (req_sld_label,))
             self._con.commit()
             sld_id = self._cur.lastrowid
+            self._sld_id_cache.add(req_sld_label, sld_id)
         return sld_id
 
     def _find_tld_id(self, req_tld_label):
-        if req_tld_label in self._tld_label_to_tld_id.keys():
-            tld_id = self._tld_label_to_tld_id[req_tld_label]
+        if req_tld_label.lower() in self._tld_label_to_tld_id.keys():
+            tld_id = self._tld_label_to_tld_id[req_tld_label.lower()]
         else:
             tld_id = None
         return tld_id
 
     def _make_tld_id(self, req_tld_label):
-        if req_tld_label not in self._tld_label_to_tld_id.keys():
-            self._cur.execute("INSERT INTO tld (tld.tld_label) "
+        if req_tld_label.lower() not in self._tld_label_to_tld_id.keys():
+            # Ignored, should another core insert the same tld meanwhile.
+            self._cur.execute(f"{self.INSERT_IGNORE} INTO tld (tld_label) "
                               "VALUES (?);",
                               (req_tld_label,))
             self._con.commit()
             self._update_tld_label_to_tld_id()
-        return self._tld_label_to_tld_id[req_tld_label]
+        return self._tld_label_to_tld_id[req_tld_label.lower()]
 
     def inspect_fqdn(self,
                      req_sld_label,
                      req_tld_label):
+        # Staged updates first, so as seen.
+        if self._batch_updates is not None:
+            self.flush_batch()
+
         tld_id = self._find_tld_id(req_tld_label)
         if tld_id is None:
             msg = f"No id for tld: {req_tld_label}\n"
@@ -129,13 +286,76 @@ class DomainsDB():
         if len(result_tuples) == 0:
             result = None
         elif len(result_tuples) == 1:
-            now_sources = result_tuples[0][0].split(",")
+            now_sources = self._make_sources(result_tuples[0][0])
             now_start_none_date = result_tuples[0][1]
             now_until_none_date = result_tuples[0][2]
             result = (now_sources, now_start_none_date, now_until_none_date)
         return result
 
-    def update_fqdn(self,
+    def inspect_fqdns(self, req_sld_tld_labels):
+        # As inspect_fqdn for each (sld label, tld label), as a list in the
+        # given order, though by a select per tld per SELECT_TOTAL slds, over
+        # an IN list, with a single commit. Labels are selected as given, and
+        # results mapped back lower cased, as labels compare ignoring case
+        # and the stored label is returned rather than the requested one.
+        if self._batch_updates is not None:
+            self.flush_batch()
+
+        lower_tld_label_to_sld_labels = {}
+        for (req_sld_label, req_tld_label) in req_sld_tld_labels:
+            if self._find_tld_id(req_tld_label) is None:
+                msg = f"No id for tld: {req_tld_label}\n"
+                util.stop(msg)
+            # Each sld once, in order, as the first label given.
+            lower_sld_label_to_sld_label = lower_tld_label_to_sld_labels.setdefault(req_tld_label.lower(), {})
+            lower_sld_label_to_sld_label.setdefault(req_sld_label.lower(), req_sld_label)
+
+        lower_sld_tld_label_to_result = {}
+        for (lower_tld_label, lower_sld_label_to_sld_label) in lower_tld_label_to_sld_labels.items():
+            tld_id = self._find_tld_id(lower_tld_label)
+            sld_labels = list(lower_sld_label_to_sld_label.values())
+            for index in range(0, len(sld_labels), DomainsDB.SELECT_TOTAL):
+                select_sld_labels = sld_labels[index:index + DomainsDB.SELECT_TOTAL]
+                self._cur.execute("SELECT sld.sld_label, fqdn.sources, fqdn.start, fqdn.until "
+                                  "FROM fqdn "
+                                  "INNER JOIN sld "
+                                  "ON fqdn.sld_id = sld.sld_id "
+                                  f"WHERE fqdn.tld_id=? AND sld.sld_label IN ({', '.join(['?'] * len(select_sld_labels))});",
+                                  tuple([tld_id] + select_sld_labels))
+                for result_tuple in list(self._cur):
+                    lower_sld_tld_label_to_result[(result_tuple[0].lower(), lower_tld_label)] = (self._make_sources(result_tuple[1]),
+                                                                                                 result_tuple[2],
+                                                                                                 result_tuple[3])
+        self._con.commit()
+        return [lower_sld_tld_label_to_result.get((req_sld_label.lower(), req_tld_label.lower()))
+                for (req_sld_label, req_tld_label) in req_sld_tld_labels]
+
+    def _merge_fqdn(self,
+                    req_sources,
+                    req_none_dates,
+                    now_sources,
+                    now_start_none_date,
+                    now_until_none_date):
+        # As (update, sources, start_none_date, until_none_date)
+        update = False
+
+        # Assess: Sources.
+        sources = now_sources
+        for req_source in req_sources:
+            if req_source not in sources:
+                sources = sources + [req_source]
+                update = True
+
+        # Assess: Start to Until.
+        (start_none_date, until_none_date) = util.make_start_until_none_date_tuple(req_none_dates +
+                                                                                    [now_start_none_date,
+                                                                                     now_until_none_date])
+        if ((start_none_date != now_start_none_date) or
+            (until_none_date != now_until_none_date)):
+            update = True
+        return (update, sources, start_none_date, until_none_date)
+
+    def _write_fqdn(self,
                     req_source,
                     req_sld_label,
                     req_tld_label,
@@ -151,7 +371,7 @@ class DomainsDB():
         result_tuples = list(self._cur)
         if len(result_tuples) == 0:
             # Mandate: Update.
-            self._cur.execute("INSERT INTO fqdn (fqdn.sld_id, fqdn.tld_id, fqdn.sources, fqdn.start, fqdn.until) "
+            self._cur.execute("INSERT INTO fqdn (sld_id, tld_id, sources, start, `until`) "
                               "VALUES (?, ?, ?, ?, ?);",
                               (sld_id,
                                tld_id,
@@ -160,31 +380,20 @@ class DomainsDB():
                                make_none_date_sql(req_until_none_date)))
             self._con.commit()
         elif len(result_tuples) == 1:
-            now_sources = result_tuples[0][0].split(",")
+            now_sources = self._make_sources(result_tuples[0][0])
             now_start_none_date = result_tuples[0][1]
             now_until_none_date = result_tuples[0][2]
-            update = False
-
-            # Assess: Sources.
-            if req_source in now_sources:
-                sources = now_sources 
-            else:
-                sources = now_sources + [req_source]
-                update = True
-
-            # Assess: Start to Until.
-            (start_none_date, until_none_date) = util.make_start_until_none_date_tuple([req_start_none_date,
-                                                                                        req_until_none_date,
-                                                                                        now_start_none_date,
-                                                                                        now_until_none_date])
-            if ((start_none_date != now_start_none_date) or
-                (until_none_date != now_until_none_date)):
-                update = True
+            (update, sources, start_none_date, until_none_date) = self._merge_fqdn([req_source],
+                                                                                   [req_start_none_date,
+                                                                                    req_until_none_date],
+                                                                                   now_sources,
+                                                                                   now_start_none_date,
+                                                                                   now_until_none_date)
 
             # Potential: Update.
             if update:
                 self._cur.execute("UPDATE fqdn "
-                                  "SET fqdn.sources=?, fqdn.start=?, fqdn.until=? "
+                                  "SET sources=?, start=?, `until`=? "
                                   "WHERE fqdn.sld_id=? AND fqdn.tld_id=?;",
                                   (",".join(sources),
                                    make_none_date_sql(start_none_date),
@@ -195,3 +404,579 @@ class DomainsDB():
         else:
             msg = f"SQL: Unexpected result: {result_tuples}\n"
             util.stop(msg)
+
+    def _upsert_fqdns(self, upsert_tuples):
+        # As (sld_id, tld_id, source, start, until), each merged by a single
+        # statement, without a prior select: the source is added once, and
+        # start to until widened, as make_start_until_none_date_tuple. As
+        # dates are either both present, with start before until, or both
+        # absent, start and until each refer only to themselves, so the order
+        # the assignments are applied in is immaterial.
+        self._cur.executemany("INSERT INTO fqdn (fqdn.sld_id, fqdn.tld_id, fqdn.sources, fqdn.start, fqdn.until) "
+                              "VALUES (?, ?, ?, ?, ?) "
+                              "ON DUPLICATE KEY UPDATE "
+                              "fqdn.sources = IF(FIND_IN_SET(VALUES(fqdn.sources), fqdn.sources), fqdn.sources, CONCAT_WS(',', fqdn.sources, VALUES(fqdn.sources))), "
+                              "fqdn.start = LEAST(COALESCE(VALUES(fqdn.start), fqdn.start), COALESCE(fqdn.start, VALUES(fqdn.start))), "
+                              "fqdn.until = GREATEST(COALESCE(VALUES(fqdn.until), fqdn.until), COALESCE(fqdn.until, VALUES(fqdn.until)));",
+                              upsert_tuples)
+
+    def _upsert_fqdn(self,
+                     req_source,
+                     req_sld_label,
+                     req_tld_label,
+                     req_start_none_date,
+                     req_until_none_date):
+        sld_id = self._make_sld_id(req_sld_label)
+        tld_id = self._make_tld_id(req_tld_label)
+        self._upsert_fqdns([(sld_id,
+                             tld_id,
+                             req_source,
+                             make_none_date_sql(req_start_none_date),
+                             make_none_date_sql(req_until_none_date))])
+        self._con.commit()
+
+    def update_fqdn(self,
+                    req_source,
+                    req_sld_label,
+                    req_tld_label,
+                    req_start_none_date,
+                    req_until_none_date):
+        if self._batch_updates is None:
+            if self._upsert:
+                self._upsert_fqdn(req_source,
+                                  req_sld_label,
+                                  req_tld_label,
+                                  req_start_none_date,
+                                  req_until_none_date)
+            else:
+                self._write_fqdn(req_source,
+                                 req_sld_label,
+                                 req_tld_label,
+                                 req_start_none_date,
+                                 req_until_none_date)
+        else:
+            # Staged, within a write batch.
+            self._batch_updates.append((req_source,
+                                        req_sld_label,
+                                        req_tld_label,
+                                        req_start_none_date,
+                                        req_until_none_date))
+            if ((len(self._batch_updates) >= self._batch_commit_total) or
+                ((time.monotonic() - self._batch_seconds) >= self._batch_commit_freq_seconds)):
+                self.flush_batch()
+
+    def start_batch(self,
+                    commit_total=BATCH_COMMIT_TOTAL,
+                    commit_freq_seconds=BATCH_COMMIT_FREQ_SECONDS):
+        # Until finish_batch, update_fqdn is staged, then written as a batch
+        # through executemany, with a single commit, once commit_total are
+        # staged or commit_freq_seconds have passed, as checked per update.
+        self._batch_updates = []
+        self._batch_commit_total = commit_total
+        self._batch_commit_freq_seconds = commit_freq_seconds
+        self._batch_seconds = time.monotonic()
+
+    def finish_batch(self):
+        self.flush_batch()
+        self._batch_updates = None
+
+    def _find_sld_ids(self, req_sld_labels):
+        # Labels compare ignoring case, so each stored label is mapped back
+        # to the labels requested.
+        sld_label_to_sld_id = {}
+        select_sld_labels = []
+        lower_sld_label_to_sld_labels = {}
+        for req_sld_label in req_sld_labels:
+            sld_id = None
+            if self._sld_dictionary is not None:
+                sld_id = self._sld_dictionary.find_none_sld_id(req_sld_label)
+            if sld_id is None:
+                sld_id = self._sld_id_cache.find_none_sld_id(req_sld_label)
+            if sld_id is None:
+                select_sld_labels.append(req_sld_label)
+                lower_sld_label_to_sld_labels.setdefault(req_sld_label.lower(), []).append(req_sld_label)
+            else:
+                sld_label_to_sld_id[req_sld_label] = sld_id
+        for index in range(0, len(select_sld_labels), DomainsDB.SELECT_TOTAL):
+            sld_labels = select_sld_labels[index:index + DomainsDB.SELECT_TOTAL]
+            self._cur.execute("SELECT sld.sld_label, sld.sld_id "
+                              "FROM sld "
+                              f"WHERE sld.sld_label IN ({', '.join(['?'] * len(sld_labels))});",
+                              tuple(sld_labels))
+            for result_tuple in list(self._cur):
+                for sld_label in lower_sld_label_to_sld_labels.get(result_tuple[0].lower(), []):
+                    sld_label_to_sld_id[sld_label] = result_tuple[1]
+                self._sld_id_cache.add(result_tuple[0], result_tuple[1])
+        return sld_label_to_sld_id
+
+    def _make_sld_ids(self, req_sld_labels):
+        sld_label_to_sld_id = self._find_sld_ids(req_sld_labels)
+        absent_sld_labels = [sld_label for sld_label in req_sld_labels if sld_label not in sld_label_to_sld_id.keys()]
+        if len(absent_sld_labels) > 0:
+            # Ignored, should another connection insert the same sld
+            # meanwhile, then committed, so such is seen.
+            self._cur.executemany(f"{self.INSERT_IGNORE} INTO sld (sld_label) "
+                                  "VALUES (?);",
+                                  [(sld_label,) for sld_label in absent_sld_labels])
+            self._con.commit()
+            sld_label_to_sld_id.update(self._find_sld_ids(absent_sld_labels))
+        for sld_label in req_sld_labels:
+            if sld_label not in sld_label_to_sld_id.keys():
+                msg = f"SQL: No id for sld: {sld_label}\n"
+                util.stop(msg)
+        return sld_label_to_sld_id
+
+    def find_sld_ids(self, req_sld_labels):
+        # As sld label to sld id, of those present only.
+        return self._find_sld_ids(req_sld_labels)
+
+    def make_sld_ids(self, req_sld_labels):
+        # As sld label to sld id, where those absent are inserted in the
+        # given order, as a batch.
+        return self._make_sld_ids(req_sld_labels)
+
+    def _find_fqdns(self, sld_ids, tld_id):
+        # As sld_id to (sources, start, until)
+        sld_id_to_fqdn = {}
+        for index in range(0, len(sld_ids), DomainsDB.SELECT_TOTAL):
+            select_sld_ids = sld_ids[index:index + DomainsDB.SELECT_TOTAL]
+            self._cur.execute("SELECT fqdn.sld_id, fqdn.sources, fqdn.start, fqdn.until "
+                              "FROM fqdn "
+                              f"WHERE fqdn.tld_id=? AND fqdn.sld_id IN ({', '.join(['?'] * len(select_sld_ids))});",
+                              tuple([tld_id] + select_sld_ids))
+            for result_tuple in list(self._cur):
+                sld_id_to_fqdn[result_tuple[0]] = (self._make_sources(result_tuple[1]), result_tuple[2], result_tuple[3])
+        return sld_id_to_fqdn
+
+    def _write_batch(self, batch_updates):
+        # Repeats within the batch are combined first, as the first label
+        # given, as labels compare ignoring case.
+        tld_label_to_sld_label_to_req = {}
+        lower_tld_label_to_tld_label = {}
+        lower_sld_label_to_sld_label = {}
+        for (req_source, req_sld_label, req_tld_label, req_start_none_date, req_until_none_date) in batch_updates:
+            tld_label = lower_tld_label_to_tld_label.setdefault(req_tld_label.lower(), req_tld_label)
+            sld_label = lower_sld_label_to_sld_label.setdefault(req_sld_label.lower(), req_sld_label)
+            sld_label_to_req = tld_label_to_sld_label_to_req.setdefault(tld_label, {})
+            (req_sources, req_none_dates) = sld_label_to_req.setdefault(sld_label, ([], []))
+            if req_source not in req_sources:
+                req_sources.append(req_source)
+            req_none_dates.extend([req_start_none_date, req_until_none_date])
+
+        insert_tuples = []
+        update_tuples = []
+        upsert_tuples = []
+        for (req_tld_label, sld_label_to_req) in tld_label_to_sld_label_to_req.items():
+            tld_id = self._make_tld_id(req_tld_label)
+            sld_label_to_sld_id = self._make_sld_ids(list(sld_label_to_req.keys()))
+            if self._upsert:
+                sld_id_to_fqdn = {}
+            else:
+                sld_id_to_fqdn = self._find_fqdns(list(sld_label_to_sld_id.values()), tld_id)
+            for (req_sld_label, (req_sources, req_none_dates)) in sld_label_to_req.items():
+                sld_id = sld_label_to_sld_id[req_sld_label]
+                if self._upsert:
+                    # A statement per source, as each is added once.
+                    (start_none_date, until_none_date) = util.make_start_until_none_date_tuple(req_none_dates)
+                    for req_source in req_sources:
+                        upsert_tuples.append((sld_id,
+                                              tld_id,
+                                              req_source,
+                                              make_none_date_sql(start_none_date),
+                                              make_none_date_sql(until_none_date)))
+                elif sld_id not in sld_id_to_fqdn.keys():
+                    # Mandate: Update.
+                    (start_none_date, until_none_date) = util.make_start_until_none_date_tuple(req_none_dates)
+                    insert_tuples.append((sld_id,
+                                          tld_id,
+                                          ",".join(req_sources),
+                                          make_none_date_sql(start_none_date),
+                                          make_none_date_sql(until_none_date)))
+                else:
+                    (now_sources, now_start_none_date, now_until_none_date) = sld_id_to_fqdn[sld_id]
+                    (update, sources, start_none_date, until_none_date) = self._merge_fqdn(req_sources,
+                                                                                           req_none_dates,
+                                                                                           now_sources,
+                                                                                           now_start_none_date,
+                                                                                           now_until_none_date)
+                    # Potential: Update.
+                    if update:
+                        update_tuples.append((",".join(sources),
+                                              make_none_date_sql(start_none_date),
+                                              make_none_date_sql(until_none_date),
+                                              sld_id,
+                                              tld_id))
+        if len(insert_tuples) > 0:
+            self._cur.executemany("INSERT INTO fqdn (sld_id, tld_id, sources, start, `until`) "
+                                  "VALUES (?, ?, ?, ?, ?);",
+                                  insert_tuples)
+        if len(update_tuples) > 0:
+            self._cur.executemany("UPDATE fqdn "
+                                  "SET sources=?, start=?, `until`=? "
+                                  "WHERE fqdn.sld_id=? AND fqdn.tld_id=?;",
+                                  update_tuples)
+        if len(upsert_tuples) > 0:
+            self._upsert_fqdns(upsert_tuples)
+        self._con.commit()
+
+    def flush_batch(self):
+        batch_updates = self._batch_updates
+        self._batch_updates = []
+        self._batch_seconds = time.monotonic()
+        if len(batch_updates) > 0:
+            self._write_batch(batch_updates)
+
+    def _make_sld_stage(self):
+        # Temporary, so private to the connection, and without privilege
+        # checks once created.
+        if not self._sld_stage:
+            self._cur.execute(f"CREATE TEMPORARY TABLE {DomainsDB.SLD_STAGE} ("
+                              f"sld_label {self.LABEL_TYPE} NOT NULL, "
+                              "PRIMARY KEY (sld_label)"
+                              ");")
+            self._sld_stage = True
+
+    def bulk_update_fqdns(self,
+                          req_source,
+                          req_sld_labels,
+                          req_tld_label,
+                          req_start_date,
+                          req_until_date):
+        # As update_fqdn for each sld, though set based: the slds are staged,
+        # then merged into sld and fqdn by a few statements, as a single
+        # transaction. The dates are mandatory.
+        if ((req_start_date is None) or (req_until_date is None)):
+            msg = "Bulk update requires start and until dates\n"
+            util.stop(msg)
+        tld_id = self._make_tld_id(req_tld_label)
+        start_date_sql = make_none_date_sql(req_start_date)
+        until_date_sql = make_none_date_sql(req_until_date)
+        self._make_sld_stage()
+        self._cur.execute(f"DELETE FROM {DomainsDB.SLD_STAGE};")
+        self._cur.executemany(f"{self.INSERT_IGNORE} INTO {DomainsDB.SLD_STAGE} (sld_label) "
+                              "VALUES (?);",
+                              [(sld_label,) for sld_label in req_sld_labels])
+
+        # Mandate: sld, where absent. Ignored, should another connection
+        # insert the same sld meanwhile.
+        self._cur.execute(f"{self.INSERT_IGNORE} INTO sld (sld_label) "
+                          f"SELECT {DomainsDB.SLD_STAGE}.sld_label "
+                          f"FROM {DomainsDB.SLD_STAGE} "
+                          "LEFT JOIN sld "
+                          f"ON {DomainsDB.SLD_STAGE}.sld_label = sld.sld_label "
+                          "WHERE sld.sld_id IS NULL;")
+
+        # Mandate: fqdn, where absent.
+        self._cur.execute(f"{self.INSERT_IGNORE} INTO fqdn (sld_id, tld_id, sources, start, `until`) "
+                          "SELECT sld.sld_id, ?, ?, ?, ? "
+                          f"FROM {DomainsDB.SLD_STAGE} "
+                          "INNER JOIN sld "
+                          f"ON {DomainsDB.SLD_STAGE}.sld_label = sld.sld_label "
+                          "LEFT JOIN fqdn "
+                          "ON fqdn.sld_id = sld.sld_id AND fqdn.tld_id = ? "
+                          "WHERE fqdn.sld_id IS NULL;",
+                          (tld_id,
+                           req_source,
+                           start_date_sql,
+                           until_date_sql,
+                           tld_id))
+
+        # Potential: Update, as sources and start to until combined, as by
+        # make_start_until_none_date_tuple. Inserted just before, these are
+        # unchanged, as are those holding the source and covering start to
+        # until already, so only rows changing a boundary are written.
+        self._update_staged_fqdns(req_source, tld_id, start_date_sql, until_date_sql)
+        self._con.commit()
+
+    def _update_staged_fqdns(self,
+                             req_source,
+                             tld_id,
+                             start_date_sql,
+                             until_date_sql):
+        # The fqdns of the staged slds, within the tld.
+        self._cur.execute("UPDATE fqdn "
+                          "INNER JOIN sld "
+                          "ON fqdn.sld_id = sld.sld_id "
+                          f"INNER JOIN {DomainsDB.SLD_STAGE} "
+                          f"ON {DomainsDB.SLD_STAGE}.sld_label = sld.sld_label "
+                          "SET fqdn.sources = IF(FIND_IN_SET(?, fqdn.sources), fqdn.sources, CONCAT_WS(',', fqdn.sources, ?)), "
+                          "fqdn.until = GREATEST(?, ?, COALESCE(fqdn.start, ?), COALESCE(fqdn.until, ?)), "
+                          "fqdn.start = LEAST(?, ?, COALESCE(fqdn.start, ?), COALESCE(fqdn.until, ?)) "
+                          "WHERE fqdn.tld_id = ? "
+                          "AND (NOT FIND_IN_SET(?, fqdn.sources) "
+                          "OR fqdn.start IS NULL OR fqdn.until IS NULL "
+                          "OR fqdn.start > ? OR fqdn.until < ?);",
+                          (req_source,
+                           req_source,
+                           start_date_sql,
+                           until_date_sql,
+                           until_date_sql,
+                           until_date_sql,
+                           start_date_sql,
+                           until_date_sql,
+                           start_date_sql,
+                           start_date_sql,
+                           tld_id,
+                           req_source,
+                           start_date_sql,
+                           until_date_sql))
+
+    def extend_fqdns(self,
+                     req_source,
+                     req_tld_label,
+                     req_from_date,
+                     req_until_date,
+                     req_sld_labels):
+        # For a daily delta, where the from capture is the latest loaded:
+        # each fqdn of the slds given, as unchanged since, of the source
+        # within the tld until the from date is extended until the until
+        # date. The slds are staged EXTEND_SLD_TOTAL at a time, each merged
+        # by a single statement, without a round trip per sld, each
+        # committed, so an interrupted extend is simply repeated. As the
+        # extended total.
+        tld_id = self._find_tld_id(req_tld_label)
+        if tld_id is None:
+            msg = f"No id for tld: {req_tld_label}\n"
+            util.stop(msg)
+        self._make_sld_stage()
+        extend_total = 0
+        sld_labels = []
+        for req_sld_label in req_sld_labels:
+            sld_labels.append(req_sld_label)
+            if len(sld_labels) == DomainsDB.EXTEND_SLD_TOTAL:
+                extend_total = extend_total + self._extend_staged_fqdns(req_source, tld_id, req_from_date, req_until_date, sld_labels)
+                sld_labels = []
+        if len(sld_labels) > 0:
+            extend_total = extend_total + self._extend_staged_fqdns(req_source, tld_id, req_from_date, req_until_date, sld_labels)
+        return extend_total
+
+    def _extend_staged_fqdns(self,
+                             req_source,
+                             tld_id,
+                             req_from_date,
+                             req_until_date,
+                             sld_labels):
+        self._cur.execute(f"DELETE FROM {DomainsDB.SLD_STAGE};")
+        self._cur.executemany(f"{self.INSERT_IGNORE} INTO {DomainsDB.SLD_STAGE} (sld_label) "
+                              "VALUES (?);",
+                              [(sld_label,) for sld_label in sld_labels])
+        self._cur.execute("UPDATE fqdn "
+                          "SET `until` = ? "
+                          "WHERE fqdn.tld_id = ? "
+                          "AND fqdn.until = ? "
+                          "AND FIND_IN_SET(?, fqdn.sources) "
+                          "AND fqdn.sld_id IN ("
+                          "SELECT sld.sld_id "
+                          "FROM sld "
+                          f"INNER JOIN {DomainsDB.SLD_STAGE} "
+                          f"ON {DomainsDB.SLD_STAGE}.sld_label = sld.sld_label"
+                          ");",
+                          (make_none_date_sql(req_until_date),
+                           tld_id,
+                           make_none_date_sql(req_from_date),
+                           req_source))
+        extend_total = self._cur.rowcount
+        self._con.commit()
+        return extend_total
+
+#-------------------------------------------------------------------------------
+
+class SqliteDomainsDB(DomainsDB):
+
+    INSERT_IGNORE = "INSERT OR IGNORE"
+
+    LABEL_TYPE = "VARCHAR(63) COLLATE NOCASE"
+
+    SCHEMA_FILE_NAME = "domains_sqlite.sql"
+
+    # Seconds a core waits on another core writing, as writes are serialised.
+    BUSY_TIMEOUT_SECONDS = 60
+
+    # Page cache per connection, as kibibytes.
+    CACHE_SIZE = 262144
+
+    def __init__(self,
+                 database_path_file,
+                 sld_id_cache_total=DomainsDB.SLD_ID_CACHE_TOTAL,
+                 upsert=False):
+        # Embedded, within a single file, so without a server or user. As
+        # DomainsDB, where the few statements beyond common SQL are
+        # overridden, and the MariaDB functions they use are provided.
+        self._database_path_file = database_path_file
+        DomainsDB.__init__(self,
+                           None,
+                           None,
+                           sld_id_cache_total=sld_id_cache_total,
+                           upsert=upsert)
+
+    @staticmethod
+    def _find_in_set(item, items):
+        result = None
+        if ((item is not None) and (items is not None)):
+            parts = items.split(",")
+            if item in parts:
+                result = parts.index(item) + 1
+            else:
+                result = 0
+        return result
+
+    @staticmethod
+    def _concat_ws(separator, *items):
+        result = None
+        if separator is not None:
+            result = separator.join([item for item in items if item is not None])
+        return result
+
+    @staticmethod
+    def _if(condition, true_item, false_item):
+        if condition:
+            result = true_item
+        else:
+            result = false_item
+        return result
+
+    @staticmethod
+    def _greatest(*items):
+        result = None
+        if None not in items:
+            result = max(items)
+        return result
+
+    @staticmethod
+    def _least(*items):
+        result = None
+        if None not in items:
+            result = min(items)
+        return result
+
+    @staticmethod
+    def _make_date(octets):
+        return datetime.date.fromisoformat(octets.decode())
+
+    def _connect(self):
+        # Write ahead logged, so readers do not block the writer, and cores
+        # wait on one another to write, rather than fail. Dates are held as
+        # ISO text, so compare as dates, and are read as dates.
+        sqlite3.register_converter("DATE", SqliteDomainsDB._make_date)
+        try:
+            self._con = sqlite3.connect(self._database_path_file,
+                                        timeout=SqliteDomainsDB.BUSY_TIMEOUT_SECONDS,
+                                        detect_types=sqlite3.PARSE_DECLTYPES)
+            self._con.execute("PRAGMA journal_mode = WAL;")
+            self._con.execute("PRAGMA synchronous = NORMAL;")
+            self._con.execute(f"PRAGMA cache_size = -{SqliteDomainsDB.CACHE_SIZE};")
+            self._con.execute("PRAGMA temp_store = MEMORY;")
+            schema_path_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), SqliteDomainsDB.SCHEMA_FILE_NAME)
+            schema_handle = open(schema_path_file, "r")
+            self._con.executescript(schema_handle.read())
+            schema_handle.close()
+        except sqlite3.Error as e:
+            msg=f"Error connecting to database: {self._database_path_file}: {e}\n"
+            util.stop(msg)
+        self._con.create_function("FIND_IN_SET", 2, SqliteDomainsDB._find_in_set, deterministic=True)
+        self._con.create_function("CONCAT_WS", -1, SqliteDomainsDB._concat_ws, deterministic=True)
+        self._con.create_function("IF", 3, SqliteDomainsDB._if, deterministic=True)
+        self._con.create_function("GREATEST", -1, SqliteDomainsDB._greatest, deterministic=True)
+        self._con.create_function("LEAST", -1, SqliteDomainsDB._least, deterministic=True)
+
+    def _upsert_fqdns(self, upsert_tuples):
+        # As DomainsDB, where the inserted row is excluded.
+        self._cur.executemany("INSERT INTO fqdn (sld_id, tld_id, sources, start, `until`) "
+                              "VALUES (?, ?, ?, ?, ?) "
+                              "ON CONFLICT (sld_id, tld_id) DO UPDATE SET "
+                              "sources = IF(FIND_IN_SET(excluded.sources, fqdn.sources), fqdn.sources, CONCAT_WS(',', fqdn.sources, excluded.sources)), "
+                              "start = LEAST(COALESCE(excluded.start, fqdn.start), COALESCE(fqdn.start, excluded.start)), "
+                              "`until` = GREATEST(COALESCE(excluded.`until`, fqdn.`until`), COALESCE(fqdn.`until`, excluded.`until`));",
+                              upsert_tuples)
+
+    def _update_staged_fqdns(self,
+                             req_source,
+                             tld_id,
+                             start_date_sql,
+                             until_date_sql):
+        # As DomainsDB, where the joined tables follow FROM, and each
+        # assignment reads the row as before the update.
+        self._cur.execute("UPDATE fqdn "
+                          "SET sources = IF(FIND_IN_SET(?, fqdn.sources), fqdn.sources, CONCAT_WS(',', fqdn.sources, ?)), "
+                          "`until` = GREATEST(?, ?, COALESCE(fqdn.start, ?), COALESCE(fqdn.`until`, ?)), "
+                          "start = LEAST(?, ?, COALESCE(fqdn.start, ?), COALESCE(fqdn.`until`, ?)) "
+                          "FROM sld "
+                          f"INNER JOIN {DomainsDB.SLD_STAGE} "
+                          f"ON {DomainsDB.SLD_STAGE}.sld_label = sld.sld_label "
+                          "WHERE fqdn.sld_id = sld.sld_id "
+                          "AND fqdn.tld_id = ? "
+                          "AND (NOT FIND_IN_SET(?, fqdn.sources) "
+                          "OR fqdn.start IS NULL OR fqdn.`until` IS NULL "
+                          "OR fqdn.start > ? OR fqdn.`until` < ?);",
+                          (req_source,
+                           req_source,
+                           start_date_sql,
+                           until_date_sql,
+                           until_date_sql,
+                           until_date_sql,
+                           start_date_sql,
+                           until_date_sql,
+                           start_date_sql,
+                           start_date_sql,
+                           tld_id,
+                           req_source,
+                           start_date_sql,
+                           until_date_sql))
+
+#-------------------------------------------------------------------------------
+
+def make_domains_db(database_backend,
+                    database_user,
+                    database_password,
+                    database_path_file,
+                    sld_id_cache_total=DomainsDB.SLD_ID_CACHE_TOTAL,
+                    upsert=False,
+                    database_name=DomainsDB.DATABASE_NAME):
+    # As the backend given, where MariaDB uses the user, password and
+    # database name, and sqlite the path file.
+    domains_db = None
+    if database_backend == MARIADB:
+        domains_db = DomainsDB(database_user,
+                               database_password,
+                               sld_id_cache_total=sld_id_cache_total,
+                               upsert=upsert,
+                               database_name=database_name)
+    elif database_backend == SQLITE:
+        if database_path_file is None:
+            msg = f"Backend {SQLITE} requires a database path file\n"
+            util.stop(msg)
+        domains_db = SqliteDomainsDB(database_path_file,
+                                     sld_id_cache_total=sld_id_cache_total,
+                                     upsert=upsert)
+    else:
+        msg = f"Unexpected backend: {database_backend}\n"
+        util.stop(msg)
+    return domains_db
+
+#-------------------------------------------------------------------------------
+
+class PoolDomainsDB():
+
+    # Each pool process retains its own Domains Database per user, so
+    # successive parts avoid a fresh connection and tld load, and keep the
+    # sld id cache warm.
+    _key_to_domains_db = {}
+
+    @staticmethod
+    def get(database_backend,
+            database_user,
+            database_password,
+            database_path_file,
+            sld_id_cache_total=DomainsDB.SLD_ID_CACHE_TOTAL,
+            upsert=False):
+        key = (database_backend, database_user, database_password, database_path_file, sld_id_cache_total, upsert)
+        if key not in PoolDomainsDB._key_to_domains_db:
+            PoolDomainsDB._key_to_domains_db[key] = make_domains_db(database_backend,
+                                                                    database_user,
+                                                                    database_password,
+                                                                    database_path_file,
+                                                                    sld_id_cache_total=sld_id_cache_total,
+                                                                    upsert=upsert)
+        return PoolDomainsDB._key_to_domains_db[key]
+
+#-------------------------------------------------------------------------------
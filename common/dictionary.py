@@ -0,0 +1,128 @@
+# Internal
+import mmap
+import os
+import struct
+
+# Local
+import util
+
+#-------------------------------------------------------------------------------
+
+# Sld dictionary format, as sorted fixed width records, so found by a binary
+# search over a memory map:
+# <MAGIC><record>...
+# Where each record is:
+# <sld label, padded with zero octets to 63 octets><sld id, as 4 octets little endian>
+# Zero octets sort first, so records sort as their sld labels.
+
+MAGIC = b"SLDDIC01"
+
+SLD_LABEL_SIZE = 63
+
+SLD_ID_STRUCT = struct.Struct("<I")
+
+RECORD_SIZE = SLD_LABEL_SIZE + SLD_ID_STRUCT.size
+
+#-------------------------------------------------------------------------------
+
+def _make_sld_key(sld_label):
+    sld_key = sld_label.encode()
+    if len(sld_key) > SLD_LABEL_SIZE:
+        sld_key = None
+    else:
+        sld_key = sld_key.ljust(SLD_LABEL_SIZE, b"\x00")
+    return sld_key
+
+#-------------------------------------------------------------------------------
+
+class SldDictionaryWriter():
+
+    def __init__(self, sld_dictionary_path_file):
+        # Written aside, then renamed, so a dictionary is only ever whole.
+        self._sld_dictionary_path_file = sld_dictionary_path_file
+        self._tmp_path_file = f"{sld_dictionary_path_file}.tmp"
+        self._handle = open(self._tmp_path_file, "wb")
+        self._handle.write(MAGIC)
+        self._last_sld_key = None
+
+    def write(self, sld_label, sld_id):
+        # In sorted order.
+        sld_key = _make_sld_key(sld_label)
+        if sld_key is None:
+            msg = f"Unexpected sld label length: {sld_label}\n"
+            util.stop(msg)
+        if ((self._last_sld_key is not None) and (sld_key <= self._last_sld_key)):
+            msg = f"Unexpected sld label order: {sld_label}\n"
+            util.stop(msg)
+        self._handle.write(sld_key)
+        self._handle.write(SLD_ID_STRUCT.pack(sld_id))
+        self._last_sld_key = sld_key
+
+    def close(self):
+        self._handle.close()
+        os.replace(self._tmp_path_file, self._sld_dictionary_path_file)
+
+#-------------------------------------------------------------------------------
+
+class SldDictionary():
+
+    def __init__(self, sld_dictionary_path_file):
+        # Read only, and shared between cores by the page cache.
+        self._sld_dictionary_path_file = sld_dictionary_path_file
+        self._handle = open(self._sld_dictionary_path_file, "rb")
+        octet_total = os.fstat(self._handle.fileno()).st_size
+        if ((self._handle.read(len(MAGIC)) != MAGIC) or
+            (((octet_total - len(MAGIC)) % RECORD_SIZE) != 0)):
+            msg = f"Unexpected sld dictionary format: {self._sld_dictionary_path_file}\n"
+            util.stop(msg)
+        self._record_total = (octet_total - len(MAGIC)) // RECORD_SIZE
+        if self._record_total == 0:
+            self._mmap = None
+        else:
+            self._mmap = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get_sld_dictionary_path_file(self):
+        return self._sld_dictionary_path_file
+
+    def get_record_total(self):
+        return self._record_total
+
+    def make_sample(self, sample_total):
+        # As (sld label, sld id), evenly spaced, including the first and last.
+        sample = []
+        if self._record_total > 0:
+            indexes = {}
+            for sample_count in range(min(sample_total, self._record_total)):
+                indexes[(sample_count * (self._record_total - 1)) // max(1, sample_total - 1)] = None
+            for record_index in indexes:
+                index = len(MAGIC) + (record_index * RECORD_SIZE)
+                sld_label = self._mmap[index:index + SLD_LABEL_SIZE].rstrip(b"\x00").decode()
+                (sld_id,) = SLD_ID_STRUCT.unpack_from(self._mmap, index + SLD_LABEL_SIZE)
+                sample.append((sld_label, sld_id))
+        return sample
+
+    def find_none_sld_id(self, sld_label):
+        sld_id = None
+        sld_key = _make_sld_key(sld_label)
+        if sld_key is not None:
+            head = 0
+            tail = self._record_total
+            while head < tail:
+                middle = (head + tail) // 2
+                index = len(MAGIC) + (middle * RECORD_SIZE)
+                middle_sld_key = self._mmap[index:index + SLD_LABEL_SIZE]
+                if middle_sld_key < sld_key:
+                    head = middle + 1
+                elif middle_sld_key > sld_key:
+                    tail = middle
+                else:
+                    (sld_id,) = SLD_ID_STRUCT.unpack_from(self._mmap, index + SLD_LABEL_SIZE)
+                    head = tail
+        return sld_id
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._handle.close()
+
+#-------------------------------------------------------------------------------
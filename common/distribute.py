@@ -1,9 +1,13 @@
 # Internal
+import concurrent.futures
 import datetime
+import io
 import os
 import shlex
 import subprocess
+import sys
 import time
+import traceback
 
 # Local
 import util
@@ -31,10 +35,14 @@ class Task():
         self._popen_stdout = None
         self._popen_stderr = None
         self._popen = None
+        self._future = None
 
     def get_level(self):
         return self._level 
 
+    def get_future(self):
+        return self._future
+
     def get_popen_command(self):
         return self._popen_command 
 
@@ -86,30 +94,54 @@ class Task():
                 else:
                     self._level = Task.WAIT
         elif self._level == Task.BUSY:
-            popen_code = self._popen.poll()
-            if popen_code is not None:
-                self._level = Task.DONE
-                self._popen_code = popen_code
-                self._popen_stdout = self._popen.stdout.read().decode(encoding="latin1")
-                self._popen_stderr = self._popen.stderr.read().decode(encoding="latin1")
-                self._popen = None
-                self._process_log_path_file()
-                if self.make_result():
-                    self.make_outcome()
-                    self._process_did_path_file()
+            if self._popen is not None:
+                finish = self._finish_popen()
+            else:
+                finish = self._finish_future()
+            if finish:
+                if self.make_resume():
+                    self._level = Task.WAIT
                 else:
-                    msg = ""
-                    msg = msg + "Unexpected Failure:"
-                    msg = msg + f" Command: {self.present_popen_command()}"
-                    msg = msg + f" Code: {self._popen_code}"
-                    if self._log_path_file is not None:
-                        msg = msg + f" Log: {self._log_path_file}"
-                    msg = msg + "\n"
-                    util.stop(msg)
-
-    def launch(self):
+                    self._level = Task.DONE
+                    self._process_log_path_file()
+                    if self.make_result():
+                        self.make_outcome()
+                        self._process_did_path_file()
+                    else:
+                        msg = ""
+                        msg = msg + "Unexpected Failure:"
+                        msg = msg + f" Command: {self.present_popen_command()}"
+                        msg = msg + f" Code: {self._popen_code}"
+                        if self._log_path_file is not None:
+                            msg = msg + f" Log: {self._log_path_file}"
+                        msg = msg + "\n"
+                        util.stop(msg)
+
+    def _finish_popen(self):
+        popen_code = self._popen.poll()
+        if popen_code is not None:
+            self._popen_code = popen_code
+            if self._popen.stdout is None:
+                self._popen_stdout = ""
+            else:
+                self._popen_stdout = self._popen.stdout.read().decode(encoding="latin1")
+            self._popen_stderr = self._popen.stderr.read().decode(encoding="latin1")
+            self._popen = None
+        return popen_code is not None
+
+    def _finish_future(self):
+        finish = self._future.done()
+        if finish:
+            (self._popen_code, self._popen_stdout, self._popen_stderr) = self._future.result()
+            self._future = None
+        return finish
+
+    def launch(self, executor=None):
         self._popen_command = self.make_command()
-        self._popen = subprocess.Popen(self._popen_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if executor is None:
+            self._popen = subprocess.Popen(self._popen_command, stdout=self.make_stdout(), stderr=subprocess.PIPE)
+        else:
+            self._future = executor.submit(*self.make_call())
         self._level = Task.BUSY
 
     # Override as required:
@@ -117,6 +149,21 @@ class Task():
     def make_command(self):
         raise NotImplementedError
 
+    def make_stdout(self):
+        return subprocess.PIPE
+
+    # Only required when launched with an executor. Provide as:
+    # (function, argument, ...)
+    # Where the function returns as:
+    # (code, stdout, stderr)
+    def make_call(self):
+        raise NotImplementedError
+
+    # Once finished, whether to wait to be launched again, as for a task
+    # which may resume from where it was cut short.
+    def make_resume(self):
+        return False
+
     def make_result(self):
         return self._popen_code == 0
 
@@ -125,6 +172,29 @@ class Task():
 
 #-------------------------------------------------------------------------------
 
+def call_main(start, arguments):
+    # As make_call, where a Task is launched within a long lived pool
+    # process rather than as a command. The start function, module level so
+    # as to be pickled, takes the command arguments, and output and exit are
+    # returned as the command would have.
+    stdout_handle = sys.stdout
+    sys.stdout = io.StringIO()
+    code = 0
+    stderr = ""
+    try:
+        start(arguments)
+    except SystemExit as e:
+        if e.code is not None:
+            code = e.code
+    except Exception:
+        code = 1
+        stderr = traceback.format_exc()
+    stdout = sys.stdout.getvalue()
+    sys.stdout = stdout_handle
+    return (code, stdout, stderr)
+
+#-------------------------------------------------------------------------------
+
 class Snapshot():
 
     def __init__(self, tasks):
@@ -156,7 +226,12 @@ class Snapshot():
         return (self.get_left_task_total() + self.get_done_task_total())
 
     def get_percent(self):
-        return (100 - int((self.get_left_task_total() / self.get_full_task_total()) * 100))
+        # Without tasks, as complete.
+        if self.get_full_task_total() == 0:
+            percent = 100
+        else:
+            percent = (100 - int((self.get_left_task_total() / self.get_full_task_total()) * 100))
+        return percent
 
 #-------------------------------------------------------------------------------
 
@@ -212,16 +287,24 @@ class TaskManager():
                  label=None,
                  core_total=1,
                  idle_freq_seconds=1,
-                 track_freq_seconds=None):
+                 track_freq_seconds=None,
+                 executor=None):
         self._label = label
         self._core_total = core_total
         self._idle_freq_seconds = idle_freq_seconds
         self._track_freq_seconds = track_freq_seconds
+        self._executor = executor
         self._tasks = []
 
     def add_task(self, task):
         self._tasks.append(task)
 
+    def get_core_total(self):
+        return self._core_total
+
+    def set_core_total(self, core_total):
+        self._core_total = core_total
+
     def get_tasks(self):
         return self._tasks 
 
@@ -232,7 +315,7 @@ class TaskManager():
                 wait_tasks.append(task)
         if len(wait_tasks) > 0:
             wait_task = wait_tasks[0]
-            wait_task.launch()
+            wait_task.launch(self._executor)
         else:
             msg = "Unable to launch as no waiting task\n"
             util.stop(msg)
@@ -241,6 +324,25 @@ class TaskManager():
         for task in self._tasks:
             task.update()
 
+    def idle(self):
+        # With an executor, only until a busy task finishes, so a core is
+        # reused at once, as matters for many short tasks.
+        futures = []
+        for task in self._tasks:
+            if task.get_future() is not None:
+                futures.append(task.get_future())
+        if len(futures) > 0:
+            concurrent.futures.wait(futures,
+                                    timeout=self._idle_freq_seconds,
+                                    return_when=concurrent.futures.FIRST_COMPLETED)
+        else:
+            time.sleep(self._idle_freq_seconds)
+
+    # Override as required, to adjust core total or add tasks while
+    # executing.
+    def adapt(self):
+        pass
+
     def execute(self):
         if self._label is not None:
             util.info(f"Start: {self._label}\n")
@@ -255,16 +357,20 @@ class TaskManager():
         remain = True
         while remain:
             self.update()
+            self.adapt()
             tail_snapshot = Snapshot(self._tasks)
 
             # Complete when no left tasks.
             if tail_snapshot.get_left_task_total() == 0:
                 remain = False
  
-            # Launch if core available and task waiting.
-            if tail_snapshot.get_busy_task_total() < self._core_total:
-                if tail_snapshot.get_wait_task_total() > 0:
-                    self.launch_task()
+            # Launch while core available and task waiting.
+            busy_task_total = tail_snapshot.get_busy_task_total()
+            wait_task_total = tail_snapshot.get_wait_task_total()
+            while ((busy_task_total < self._core_total) and (wait_task_total > 0)):
+                self.launch_task()
+                busy_task_total = busy_task_total + 1
+                wait_task_total = wait_task_total - 1
        
             # Track as requested.
             if track_duration is not None:
@@ -283,6 +389,6 @@ class TaskManager():
 
             # Idle.
             if remain:
-                time.sleep(self._idle_freq_seconds)
+                self.idle()
         if self._label is not None:
             util.info(f"Finish: {self._label}\n")
@@ -21,14 +21,14 @@ CREATE TABLE tld (
     UNIQUE KEY (tld_id)
 );
 
-# oldest: Earliest observed registered date. May be NULL.
-# newest: Latest observed registered date. May be NULL.
+# start: Earliest observed registered date. May be NULL.
+# until: Latest observed registered date. May be NULL. Quoted, as reserved.
 CREATE TABLE fqdn (
     sld_id INT UNSIGNED NOT NULL,
     tld_id TINYINT UNSIGNED NOT NULL,
     sources SET('ZONE_FILE', 'RDAP') NOT NULL,
-    oldest DATE NULL,
-    newest DATE NULL,
+    start DATE NULL,
+    `until` DATE NULL,
     PRIMARY KEY (sld_id, tld_id)
 );
 
@@ -0,0 +1,30 @@
+-- As domains.sql, for the sqlite backend, as made by the first connection.
+-- Sources are held as text, as the sources SET, and dates as ISO text. Labels
+-- compare ignoring case, as by the MariaDB default collation.
+
+CREATE TABLE IF NOT EXISTS zone_file (
+    tld_id INTEGER NOT NULL,
+    capture DATE NOT NULL,
+    PRIMARY KEY (tld_id, capture)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sld (
+    sld_id INTEGER PRIMARY KEY,
+    sld_label VARCHAR(63) COLLATE NOCASE NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS tld (
+    tld_id INTEGER PRIMARY KEY,
+    tld_label VARCHAR(63) COLLATE NOCASE NOT NULL UNIQUE
+);
+
+-- start: Earliest observed registered date. May be NULL.
+-- until: Latest observed registered date. May be NULL. Quoted, as reserved by MariaDB.
+CREATE TABLE IF NOT EXISTS fqdn (
+    sld_id INTEGER NOT NULL,
+    tld_id INTEGER NOT NULL,
+    sources TEXT NOT NULL,
+    start DATE NULL,
+    `until` DATE NULL,
+    PRIMARY KEY (sld_id, tld_id)
+) WITHOUT ROWID;
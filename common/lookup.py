@@ -108,6 +108,10 @@ class RDAP():
     TLD_LABEL_TO_EXPIRATION_DAYS = {}
     TLD_LABEL_TO_EXPIRATION_DAYS["com"] = 30 + 30 + 5
 
+    # Write batch, as about a minute of requests.
+    BATCH_COMMIT_TOTAL = REQUEST_PER_MIN
+    BATCH_COMMIT_FREQ_SECONDS = 60
+
     def __init__(self,
                  domains_database_user,
                  domains_database_password):
@@ -115,6 +119,8 @@ class RDAP():
         self._domains_database_password = domains_database_password
         self._domains_db = database.DomainsDB(self._domains_database_user,
                                               self._domains_database_password)
+        self._domains_db.start_batch(commit_total=RDAP.BATCH_COMMIT_TOTAL,
+                                     commit_freq_seconds=RDAP.BATCH_COMMIT_FREQ_SECONDS)
         self._lock_path_file = os.path.join(RDAP.TMP_PATH, RDAP.LOCK_FILE_NAME)
         self._lock_handle = None
 
@@ -216,10 +222,17 @@ class RDAP():
                                      tld_label,
                                      start_none_date,
                                      until_none_date)
+        return (start_none_date, until_none_date)
+
+    def finish(self):
+        self._domains_db.finish_batch()
 
     def request(self, sld_label, tld_label):
+        # Updates are batched, written once about a minute of requests are
+        # staged, so the dates are returned, rather than read back.
         self._init_lock()
         self._wait_lock()
         self._wait_rate()
-        self._action(sld_label, tld_label)
+        (start_none_date, until_none_date) = self._action(sld_label, tld_label)
         self._cede_lock()
+        return (start_none_date, until_none_date)
@@ -0,0 +1,237 @@
+# Internal
+import os
+
+# Local
+import util
+
+#-------------------------------------------------------------------------------
+
+SLD_TEXT_SUFFIX = ".sld.txt"
+SLD_BINARY_SUFFIX = ".sld.bin"
+
+SLD_SUFFIXES = [SLD_TEXT_SUFFIX, SLD_BINARY_SUFFIX]
+
+# Within a delta load zone file pack, whose own parts are the slds added since
+# the earlier capture.
+DELTA_REMOVED_PATH = "removed"
+DELTA_UNCHANGED_PATH = "unchanged"
+
+#-------------------------------------------------------------------------------
+
+# Binary part format, where each uint is as LEB128 (7 bits per octet, least
+# significant first, high bit set while more follow):
+# <MAGIC><uint sld total><uint block total><uint length><first sld><uint length><last sld>
+# Then per block:
+# <uint sld total><uint body length><body>
+# Where the body holds a shared prefix length per sld, as an octet, against
+# the sld before it within the block, then the remaining suffix per sld,
+# joined by newlines:
+# <shared prefix length>...<suffix><newline>...<suffix>
+# Blocks may be skipped by body length, and any block decoded alone, where
+# the suffixes are split at once rather than per octet.
+
+MAGIC = b"SLDBIN02"
+
+SHARED_PREFIX_LENGTH_LIMIT = 0xff
+
+#-------------------------------------------------------------------------------
+
+def _encode_uint(value):
+    octets = bytearray()
+    while value >= 0x80:
+        octets.append((value & 0x7f) | 0x80)
+        value = value >> 7
+    octets.append(value)
+    return octets
+
+#-------------------------------------------------------------------------------
+
+def _decode_uint(octets, index):
+    value = 0
+    shift = 0
+    while True:
+        if index >= len(octets):
+            msg = "Unexpected end of uint\n"
+            util.stop(msg)
+        octet = octets[index]
+        index = index + 1
+        value = value | ((octet & 0x7f) << shift)
+        if octet < 0x80:
+            break
+        shift = shift + 7
+    return (value, index)
+
+#-------------------------------------------------------------------------------
+
+class SldWriter():
+
+    BLOCK_SLD_TOTAL = 128
+
+    def __init__(self, sld_path_file):
+        # A part is held encoded in memory until closed, as the header leads
+        # with its totals, and a part is bounded by the part size.
+        self._sld_path_file = sld_path_file
+        self._blocks = bytearray()
+        self._block_total = 0
+        self._shared_lengths = bytearray()
+        self._suffixes = []
+        self._sld_total = 0
+        self._first_sld = b""
+        self._last_sld = b""
+
+    def write(self, sld):
+        # As octets, without the newline.
+        shared_length = 0
+        if len(self._suffixes) > 0:
+            shared_limit = min(len(sld), len(self._last_sld), SHARED_PREFIX_LENGTH_LIMIT)
+            while ((shared_length < shared_limit) and (sld[shared_length] == self._last_sld[shared_length])):
+                shared_length = shared_length + 1
+        self._shared_lengths.append(shared_length)
+        self._suffixes.append(sld[shared_length:])
+        if self._sld_total == 0:
+            self._first_sld = sld
+        self._last_sld = sld
+        self._sld_total = self._sld_total + 1
+        if len(self._suffixes) == SldWriter.BLOCK_SLD_TOTAL:
+            self._flush_block()
+
+    def _flush_block(self):
+        if len(self._suffixes) > 0:
+            body = self._shared_lengths + b"\n".join(self._suffixes)
+            self._blocks += _encode_uint(len(self._suffixes))
+            self._blocks += _encode_uint(len(body))
+            self._blocks += body
+            self._block_total = self._block_total + 1
+            self._shared_lengths = bytearray()
+            self._suffixes = []
+
+    def close(self):
+        self._flush_block()
+        sld_handle = open(self._sld_path_file, "wb")
+        sld_handle.write(MAGIC)
+        sld_handle.write(_encode_uint(self._sld_total))
+        sld_handle.write(_encode_uint(self._block_total))
+        sld_handle.write(_encode_uint(len(self._first_sld)))
+        sld_handle.write(self._first_sld)
+        sld_handle.write(_encode_uint(len(self._last_sld)))
+        sld_handle.write(self._last_sld)
+        sld_handle.write(self._blocks)
+        sld_handle.close()
+
+#-------------------------------------------------------------------------------
+
+def _read_binary_header(octets, sld_path_file):
+    if octets[:len(MAGIC)] != MAGIC:
+        msg = f"Unexpected SLD binary format: {sld_path_file}\n"
+        util.stop(msg)
+    index = len(MAGIC)
+    (sld_total, index) = _decode_uint(octets, index)
+    (block_total, index) = _decode_uint(octets, index)
+    (length, index) = _decode_uint(octets, index)
+    first_sld = bytes(octets[index:index + length])
+    index = index + length
+    (length, index) = _decode_uint(octets, index)
+    last_sld = bytes(octets[index:index + length])
+    index = index + length
+    return (sld_total, block_total, first_sld, last_sld, index)
+
+#-------------------------------------------------------------------------------
+
+def read_sld_header(sld_path_file):
+    # As (sld total, first sld, last sld). For the binary format, without
+    # reading the blocks, as the header is small, as an sld is at most 63
+    # octets. For the text format, as read throughout.
+    if sld_path_file.endswith(SLD_BINARY_SUFFIX):
+        sld_handle = open(sld_path_file, "rb")
+        octets = sld_handle.read(1024)
+        sld_handle.close()
+        (sld_total, _, first_sld, last_sld, _) = _read_binary_header(octets, sld_path_file)
+        result = (sld_total, first_sld.decode(), last_sld.decode())
+    else:
+        sld_total = 0
+        first_sld = ""
+        last_sld = ""
+        for sld in _generate_text_slds(sld_path_file):
+            if sld_total == 0:
+                first_sld = sld
+            last_sld = sld
+            sld_total = sld_total + 1
+        result = (sld_total, first_sld, last_sld)
+    return result
+
+#-------------------------------------------------------------------------------
+
+def read_sld_bounds(sld_path_file):
+    # As (first sld, last sld), without reading the slds between: for the
+    # binary format, from the header, and for the text format, from the
+    # first line and the tail, as an sld is at most 63 octets.
+    sld_handle = open(sld_path_file, "rb")
+    if sld_path_file.endswith(SLD_BINARY_SUFFIX):
+        octets = sld_handle.read(1024)
+        (_, _, first_sld, last_sld, _) = _read_binary_header(octets, sld_path_file)
+    else:
+        first_sld = sld_handle.readline().strip()
+        octet_total = os.fstat(sld_handle.fileno()).st_size
+        sld_handle.seek(max(0, octet_total - 1024))
+        lines = sld_handle.read().split()
+        if len(lines) == 0:
+            last_sld = b""
+        else:
+            last_sld = lines[-1]
+    sld_handle.close()
+    return (first_sld.decode(), last_sld.decode())
+
+#-------------------------------------------------------------------------------
+
+def _generate_binary_slds(sld_path_file):
+    sld_handle = open(sld_path_file, "rb")
+    octets = sld_handle.read()
+    sld_handle.close()
+    (sld_total, block_total, _, _, index) = _read_binary_header(octets, sld_path_file)
+    sld_count = 0
+    for _ in range(block_total):
+        (block_sld_total, index) = _decode_uint(octets, index)
+        (body_length, index) = _decode_uint(octets, index)
+        shared_lengths = octets[index:index + block_sld_total]
+        suffixes = octets[index + block_sld_total:index + body_length].split(b"\n")
+        index = index + body_length
+        if len(suffixes) != block_sld_total:
+            msg = f"Unexpected SLD binary block: {sld_path_file}\n"
+            util.stop(msg)
+        # Shared prefix lengths are in octets, so decoded only once whole.
+        sld = b""
+        for (shared_length, suffix) in zip(shared_lengths, suffixes):
+            sld = sld[:shared_length] + suffix
+            yield sld.decode()
+        sld_count = sld_count + block_sld_total
+    if ((sld_count != sld_total) or (index != len(octets))):
+        msg = f"Unexpected SLD binary total: {sld_path_file}\n"
+        util.stop(msg)
+
+#-------------------------------------------------------------------------------
+
+def _generate_text_slds(sld_path_file):
+    sld_handle = open(sld_path_file, "r")
+    for line in sld_handle:
+        yield line.strip()
+    sld_handle.close()
+
+#-------------------------------------------------------------------------------
+
+def generate_slds(sld_path_file):
+    # Either part format, by suffix.
+    if sld_path_file.endswith(SLD_BINARY_SUFFIX):
+        yield from _generate_binary_slds(sld_path_file)
+    else:
+        yield from _generate_text_slds(sld_path_file)
+
+#-------------------------------------------------------------------------------
+
+def make_sld_prefix(sld_file_name):
+    # As NNNNNN, from either NNNNNN.sld.txt or NNNNNN.sld.bin
+    for sld_suffix in SLD_SUFFIXES:
+        if sld_file_name.endswith(sld_suffix):
+            sld_file_name = sld_file_name[:-len(sld_suffix)]
+    return sld_file_name
+
+#-------------------------------------------------------------------------------
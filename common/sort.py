@@ -0,0 +1,101 @@
+# Internal
+import heapq
+import os
+
+# Local
+import util
+
+#-------------------------------------------------------------------------------
+
+class Sorter():
+
+    # Approximate octets held per line beyond its own octets, as the bytes
+    # object and its set entry.
+    LINE_OVERHEAD_SIZE = 96
+
+    # Most runs merged at once, so open files are bounded.
+    MERGE_TOTAL = 64
+
+    def __init__(self, spill_path, memory_size):
+        # External merge sort of lines, as octets without the newline, where
+        # each line is yielded once. Lines are held in memory up to the
+        # memory size, then spilled as a sorted run within the spill path.
+        self._spill_path = spill_path
+        self._memory_size = memory_size
+        self._lines = set()
+        self._lines_size = 0
+        self._run_path_files = []
+        self._run_count = 0
+
+    def get_run_total(self):
+        return self._run_count
+
+    def add(self, line):
+        if line not in self._lines:
+            self._lines.add(line)
+            self._lines_size = self._lines_size + len(line) + Sorter.LINE_OVERHEAD_SIZE
+            if self._lines_size >= self._memory_size:
+                self._spill()
+
+    def _make_run_path_file(self):
+        self._run_count = self._run_count + 1
+        return os.path.join(self._spill_path, f"{self._run_count:06}.spill.txt")
+
+    def _write_run(self, lines):
+        run_path_file = self._make_run_path_file()
+        run_handle = open(run_path_file, "wb")
+        for line in lines:
+            run_handle.write(line + b"\n")
+        run_handle.close()
+        self._run_path_files.append(run_path_file)
+
+    def _spill(self):
+        util.info(f"Spill: {self._run_count + 1:06} Lines: {len(self._lines)}\n")
+        self._write_run(sorted(self._lines))
+        self._lines = set()
+        self._lines_size = 0
+
+    def _read_run(self, run_handle):
+        for line in run_handle:
+            yield line[:-1]
+
+    def _merge(self, run_path_files):
+        # Each run is sorted and unique, so a repeat is only ever consecutive
+        # once merged.
+        run_handles = [open(run_path_file, "rb") for run_path_file in run_path_files]
+        last_line = None
+        for line in heapq.merge(*[self._read_run(run_handle) for run_handle in run_handles]):
+            if line != last_line:
+                yield line
+                last_line = line
+        for run_handle in run_handles:
+            run_handle.close()
+        for run_path_file in run_path_files:
+            os.remove(run_path_file)
+
+    def generate(self):
+        # Sorted, and each line once.
+        if len(self._run_path_files) == 0:
+            lines = sorted(self._lines)
+            self._lines = set()
+            self._lines_size = 0
+            yield from lines
+        else:
+            if len(self._lines) > 0:
+                self._spill()
+            while len(self._run_path_files) > Sorter.MERGE_TOTAL:
+                run_path_files = self._run_path_files[:Sorter.MERGE_TOTAL]
+                self._run_path_files = self._run_path_files[Sorter.MERGE_TOTAL:]
+                self._write_run(self._merge(run_path_files))
+            run_path_files = self._run_path_files
+            self._run_path_files = []
+            yield from self._merge(run_path_files)
+
+    def tidy(self):
+        # Any runs remaining, when not wholly generated.
+        for run_path_file in self._run_path_files:
+            if os.path.isfile(run_path_file):
+                os.remove(run_path_file)
+        self._run_path_files = []
+
+#-------------------------------------------------------------------------------
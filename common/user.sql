@@ -3,5 +3,6 @@ GRANT CREATE ON *.* TO "jd"@"localhost";
 GRANT INSERT ON *.* TO "jd"@"localhost";
 GRANT SELECT ON *.* TO "jd"@"localhost";
 GRANT UPDATE ON *.* TO "jd"@"localhost";
+GRANT CREATE TEMPORARY TABLES ON *.* TO "jd"@"localhost";
 FLUSH PRIVILEGES;
 EXIT;
@@ -3,9 +3,6 @@ import os
 import sys
 import datetime
 
-# External
-import mariadb
-
 #-------------------------------------------------------------------------------
 
 def stop(msg):
@@ -158,6 +155,14 @@ class Config():
             stop(msg)
         return self._key_to_value[key]
 
+    def find_none_value(self, key):
+        # As get_value, though None for a key not known, as for an optional
+        # entry.
+        value = None
+        if key in self._key_to_value.keys():
+            value = self._key_to_value[key]
+        return value
+
     def read(self):
         self._key_to_value_type = {}
         self._key_to_value = {}
@@ -213,3 +218,62 @@ class Config():
         handle.close()
 
 #-------------------------------------------------------------------------------
+
+class Record():
+
+    # Format, as one entry per line, where a key may repeat:
+    # <Key>: <Value>
+
+    def __init__(self, record_path_file):
+        self._record_path_file = record_path_file
+        self._entries = []
+
+    def get_value(self, key):
+        values = self.get_values(key)
+        if len(values) == 1:
+            value = values[0]
+        else:
+            value = None
+        return value
+
+    def get_values(self, key):
+        values = []
+        for (entry_key, entry_value) in self._entries:
+            if entry_key == key:
+                values.append(entry_value)
+        return values
+
+    def add_entry(self, key, value):
+        self._entries.append((key, value))
+
+    def read(self):
+        self._entries = []
+        if os.path.isfile(self._record_path_file):
+            handle = open(self._record_path_file, "r")
+            for line in handle:
+                parts = line.rstrip("\n").split(": ", 1)
+                if len(parts) == 2:
+                    self._entries.append((parts[0], parts[1]))
+            handle.close()
+
+    def write(self):
+        # Private, as may hold an access token. Replaced whole, so never
+        # observed as partially written.
+        tmp_path_file = f"{self._record_path_file}.tmp"
+        handle = os.fdopen(os.open(tmp_path_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w")
+        for (key, value) in self._entries:
+            handle.write(f"{key}: {value}\n")
+        handle.close()
+        os.replace(tmp_path_file, self._record_path_file)
+
+    def make_fresh(self, now_datetime):
+        fresh = False
+        expiry = self.get_value("Expiry")
+        if expiry is not None:
+            try:
+                fresh = now_datetime < datetime.datetime.fromisoformat(expiry)
+            except ValueError as e:
+                fresh = False
+        return fresh
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,86 @@
+# Internal
+import re
+
+# Local
+import util
+
+#-------------------------------------------------------------------------------
+
+IGNORE_RECORD_TYPES = ["nsec3",
+                       "nsec3param",
+                       "rrsig",
+                       "dnskey"]
+
+IGNORE_RECORD_TYPE_OCTETS = frozenset([record_type.encode() for record_type in IGNORE_RECORD_TYPES])
+
+_IGNORE_RECORD_TYPE_PATTERN = b"|".join([re.escape(record_type) for record_type in sorted(IGNORE_RECORD_TYPE_OCTETS, key=len, reverse=True)])
+
+# A line of at least five fields, as either:
+# An sld host label, of a record type not ignored, where "sld." is captured.
+# Any other host label with a dot, as not an sld, or of a record type ignored.
+# A host label without a dot, of a record type ignored.
+# Any other line does not match, and is reported by make_line_sld.
+_BLOCK_LINE_PATTERN = re.compile(rb"^([^.\t\n]*\.)[^.\t\n]*\.[^.\t\n]*\t[^\t\n]*\t[^\t\n]*\t(?!(?:" + _IGNORE_RECORD_TYPE_PATTERN + rb")\t)[^\t\n]*\t[^\n]*\n"
+                                 rb"|^[^\t\n]*\.[^\t\n]*\t(?:[^\t\n]*\t){3}[^\n]*\n"
+                                 rb"|^[^.\t\n]*\t[^\t\n]*\t[^\t\n]*\t(?:" + _IGNORE_RECORD_TYPE_PATTERN + rb")\t[^\n]*\n",
+                                 re.MULTILINE)
+
+#-------------------------------------------------------------------------------
+
+def make_line_sld(line):
+    # Line format:
+    # <Host Label><tab><TTL><tab><Record Class><tab><Record Type><tab><Record Data>[<tab><Extra>...]
+    # The Extra content is expected on the first and last lines.
+    sld = None
+    line_parts = line.split(sep="\t")
+    if len(line_parts) < 5:
+        msg = f"Unexpected Line format: {line}\n"
+        util.stop(msg)
+    host_label = line_parts[0]
+    record_type = line_parts[3]
+    if record_type not in IGNORE_RECORD_TYPES:
+        host_label_parts = host_label.split(sep=".")
+        # Entries without an sld have form:
+        # "tld." ==> ['tld', ''] ==> length as 2
+        #
+        # Entries with a sld have form:
+        # "sld.tld." ==> ['sld', 'tld', ''] ==> length as 3
+        #
+        # Entries with a subdomain have form:
+        # "subdomain.tld.com." ==> ['subdomain', 'sld', 'tld', ''] ==> length as 4
+        # The sld always occurs without the subdomain, thus these
+        # may be ignored.
+        if len(host_label_parts) < 2:
+            msg = f"Unexpected Host Label format: {host_label}\n"
+            util.stop(msg)
+        if len(host_label_parts) == 3:
+            sld = host_label_parts[-3]
+    return sld
+
+#-------------------------------------------------------------------------------
+
+def make_block_slds(block_octets, last_sld):
+    # As make_line_sld, over a block of whole lines, as a single pass of
+    # _BLOCK_LINE_PATTERN without a decode or split per line. Returns the slds
+    # with consecutive repeats removed, including of the last sld of the
+    # prior block, as:
+    # (slds, last_sld)
+    if ((len(block_octets) > 0) and (not block_octets.endswith(b"\n"))):
+        block_octets = block_octets + b"\n"
+    sld_dots = _BLOCK_LINE_PATTERN.findall(block_octets)
+    if len(sld_dots) != block_octets.count(b"\n"):
+        # A line did not match, so make_line_sld reports it.
+        for line in block_octets.decode().splitlines(keepends=True):
+            make_line_sld(line)
+        msg = "Unexpected Block format\n"
+        util.stop(msg)
+    slds = []
+    for sld_dot in sld_dots:
+        if len(sld_dot) > 0:
+            sld = sld_dot[:-1]
+            if sld != last_sld:
+                slds.append(sld)
+                last_sld = sld
+    return (slds, last_sld)
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,193 @@
+# Setup
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
+# Internal
+import argparse
+import shutil
+import subprocess
+import time
+
+# Local
+import util
+
+#-------------------------------------------------------------------------------
+
+class Main():
+
+    DOWNLOAD_PATH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "download_zone_file_to_zone_files_pack.py")
+
+    ENGINES = ["curl", "native"]
+
+    # Megabytes, as decimal.
+    MB = 1000 * 1000
+
+    def __init__(self):
+        # Arguments.
+        self._icann_user = None
+        self._icann_password = None
+        self._url = None
+        self._tlds = None
+        self._benchmark_pack_path = None
+        self._part_sizes = None
+        self._core_totals = None
+        self._engines = None
+        self._adaptive = None
+        self._repeat_total = None
+
+        # State.
+        self._results = []
+
+    def process_arguments(self):
+        argument_parser = argparse.ArgumentParser()
+        argument_parser.add_argument("--icann_user",
+                                     type=str,
+                                     required=True,
+                                     help="ICANN user, as accepted by the stand-in server. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--icann_password",
+                                     type=str,
+                                     required=True,
+                                     help="ICANN password, as accepted by the stand-in server. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--url",
+                                     type=str,
+                                     required=True,
+                                     help="Stand-in server URL. Perhaps: http://127.0.0.1:8080 "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--tld",
+                                     type=str,
+                                     nargs="+",
+                                     required=True,
+                                     help="TLD, or list of TLDs, as served by the stand-in server. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--benchmark_pack_path",
+                                     type=str,
+                                     required=True,
+                                     help="Benchmark pack path, to hold each run. "
+                                          "Must exist and must be empty. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--part_size",
+                                     type=int,
+                                     nargs="+",
+                                     required=True,
+                                     help="Part size, or list of part sizes. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--core_total",
+                                     type=int,
+                                     nargs="+",
+                                     required=True,
+                                     help="Number of cores, or list of numbers of cores. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--engine",
+                                     type=str,
+                                     nargs="+",
+                                     choices=Main.ENGINES,
+                                     default=["curl"],
+                                     help="Part download engine, or list of engines. "
+                                          "Default: curl. "
+                                          "(Optional)")
+        argument_parser.add_argument("--adaptive",
+                                     default=False,
+                                     action="store_true",
+                                     help="Download adaptively. "
+                                          "(Optional)")
+        argument_parser.add_argument("--repeat_total",
+                                     type=int,
+                                     default=1,
+                                     help="Number of runs of each combination. "
+                                          "Default: 1. "
+                                          "(Optional)")
+
+        namespace = argument_parser.parse_args()
+        self._icann_user = namespace.icann_user
+        self._icann_password = namespace.icann_password
+        self._url = namespace.url
+        self._tlds = namespace.tld
+        self._benchmark_pack_path = util.make_item_path_exist_empty(namespace.benchmark_pack_path)
+        self._part_sizes = [util.make_int_ge(part_size, 1) for part_size in namespace.part_size]
+        self._core_totals = [util.make_int_ge(core_total, 1) for core_total in namespace.core_total]
+        self._engines = namespace.engine
+        self._adaptive = namespace.adaptive
+        self._repeat_total = util.make_int_ge(namespace.repeat_total, 1)
+
+    def run(self, run_count, engine, part_size, core_total):
+        # Each run downloads afresh into its own zone files pack, retained
+        # only while the run is measured.
+        zone_files_pack_path = os.path.join(self._benchmark_pack_path, f"{run_count:06}.pack")
+        log_path_file = os.path.join(self._benchmark_pack_path, f"{run_count:06}.log.txt")
+        os.mkdir(zone_files_pack_path)
+        command = [sys.executable,
+                   Main.DOWNLOAD_PATH_FILE,
+                   "--icann_user", self._icann_user,
+                   "--icann_password", self._icann_password,
+                   "--account_url", self._url,
+                   "--czds_url", self._url,
+                   "--tld"] + self._tlds + [
+                   "--zone_files_pack_path", zone_files_pack_path,
+                   "--part_size", str(part_size),
+                   "--core_total", str(core_total),
+                   "--engine", engine]
+        if self._adaptive:
+            command = command + ["--adaptive"]
+        log_handle = open(log_path_file, "w")
+        start_seconds = time.monotonic()
+        completed_process = subprocess.run(command, stdout=log_handle, stderr=subprocess.STDOUT)
+        seconds = time.monotonic() - start_seconds
+        log_handle.close()
+        if completed_process.returncode != 0:
+            msg = f"Unexpected Failure: Run: {run_count:06} Log: {log_path_file}\n"
+            util.stop(msg)
+
+        octet_total = 0
+        for file_name in os.listdir(zone_files_pack_path):
+            if file_name.endswith("#full.txt.gz"):
+                octet_total = octet_total + os.path.getsize(os.path.join(zone_files_pack_path, file_name))
+        shutil.rmtree(zone_files_pack_path)
+        rate = (octet_total / Main.MB) / seconds
+        util.info(f"Run: {run_count:06} "
+                  f"Engine: {engine} "
+                  f"Part size: {part_size} "
+                  f"Core: {core_total} "
+                  f"Octets: {octet_total} "
+                  f"Seconds: {seconds:.2f} "
+                  f"Rate: {rate:.1f} MB/s\n")
+        self._results.append((engine, part_size, core_total, seconds, rate))
+
+    def benchmark(self):
+        run_count = 0
+        for engine in self._engines:
+            for part_size in self._part_sizes:
+                for core_total in self._core_totals:
+                    for _ in range(self._repeat_total):
+                        run_count = run_count + 1
+                        self.run(run_count, engine, part_size, core_total)
+
+    def summary(self):
+        # Mean over repeats, fastest first.
+        key_to_results = {}
+        for (engine, part_size, core_total, seconds, rate) in self._results:
+            key = (engine, part_size, core_total)
+            key_to_results.setdefault(key, []).append((seconds, rate))
+        lines = []
+        for (key, results) in key_to_results.items():
+            seconds = sum([result[0] for result in results]) / len(results)
+            rate = sum([result[1] for result in results]) / len(results)
+            lines.append((rate, key, seconds))
+        util.info("Summary:\n")
+        for (rate, (engine, part_size, core_total), seconds) in sorted(lines, reverse=True):
+            util.info(f"Engine: {engine} "
+                      f"Part size: {part_size} "
+                      f"Core: {core_total} "
+                      f"Seconds: {seconds:.2f} "
+                      f"Rate: {rate:.1f} MB/s\n")
+
+    def start(self):
+        self.process_arguments()
+        self.benchmark()
+        self.summary()
+
+if __name__ == '__main__':
+    main = Main()
+    main.start()
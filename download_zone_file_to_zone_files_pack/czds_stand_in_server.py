@@ -0,0 +1,419 @@
+# Setup
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
+# Internal
+import argparse
+import datetime
+import hashlib
+import http.server
+import json
+import random
+import secrets
+import time
+import zlib
+
+# Local
+import util
+
+#-------------------------------------------------------------------------------
+
+class Zone():
+
+    LINE_BATCH_TOTAL = 10000
+
+    # Gzip, rather than zlib or raw deflate.
+    GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+    def __init__(self,
+                 tld,
+                 zone_size,
+                 seed):
+        self._tld = tld
+        self._zone_size = zone_size
+        self._seed = seed
+        self._octets = None
+        self._etag = None
+
+    def get_tld(self):
+        return self._tld
+
+    def get_octets(self):
+        return self._octets
+
+    def get_etag(self):
+        return self._etag
+
+    def _make_label(self, number):
+        label = chr(ord("a") + (number % 26))
+        number = number // 26
+        while number > 0:
+            label = chr(ord("a") + (number % 26)) + label
+            number = number // 26
+        return label
+
+    def generate(self):
+        # Line format, as within a zone file:
+        # <Host Label><tab><TTL><tab><Record Class><tab><Record Type><tab><Record Data>
+        # Slds ascend, so that each sld occurs as a contiguous run of lines.
+        prng = random.Random(f"{self._seed}#{self._tld}")
+        compress = zlib.compressobj(wbits=Zone.GZIP_WBITS)
+        blocks = []
+        compress_size = 0
+        soa_line = f"{self._tld}.\t86400\tin\tsoa\tns0.nic.{self._tld}. hostmaster.nic.{self._tld}. 1 1800 900 604800 86400\n"
+        blocks.append(compress.compress(soa_line.encode()))
+        number = 26 * 26
+        while compress_size < self._zone_size:
+            lines = []
+            for _ in range(Zone.LINE_BATCH_TOTAL):
+                number = number + prng.randint(1, 64)
+                sld = self._make_label(number)
+                for ns_count in range(prng.randint(1, 3)):
+                    lines.append(f"{sld}.{self._tld}.\t86400\tin\tns\tns{ns_count}.host{prng.randint(1, 9999)}.net.\n")
+                if prng.random() < 0.1:
+                    lines.append(f"{sld}.{self._tld}.\t86400\tin\tds\t{prng.randint(1, 65535)} 13 2 {prng.getrandbits(256):064x}\n")
+                    lines.append(f"{sld}.{self._tld}.\t86400\tin\trrsig\tDS 13 2 86400 {prng.getrandbits(128):032x}\n")
+            block = compress.compress("".join(lines).encode())
+            blocks.append(block)
+            compress_size = compress_size + len(block)
+        blocks.append(compress.compress(soa_line.encode()))
+        blocks.append(compress.flush())
+        self._octets = b"".join(blocks)
+        self._etag = f'"{hashlib.sha256(self._octets).hexdigest()[:16]}"'
+        util.info(f"Zone: {self._tld} Content length: {len(self._octets)}\n")
+
+#-------------------------------------------------------------------------------
+
+class Handler(http.server.BaseHTTPRequestHandler):
+
+    # Keep-alive, as expected of the ICANN CZDS.
+    protocol_version = "HTTP/1.1"
+
+    BLOCK_SIZE = 64 * 1024
+
+    LAST_MODIFIED_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
+
+    def log_message(self, format, *args):
+        # Quiet, as each part is a request.
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _make_authorized(self):
+        authorized = (self.headers.get("Authorization") == f"Bearer {self.server.get_access_token()}")
+        if not authorized:
+            self._send_json(401, {"message": "Unauthorized"})
+        return authorized
+
+    def _make_zone(self):
+        # Path format:
+        # /czds/downloads/<TLD>.zone
+        zone = None
+        path = self.path.split("?")[0]
+        prefix = "/czds/downloads/"
+        if path.startswith(prefix) and path.endswith(".zone"):
+            zone = self.server.get_tld_to_zone().get(path[len(prefix):-len(".zone")])
+        if zone is None:
+            self._send_json(404, {"message": "Not Found"})
+        return zone
+
+    def _make_range(self, content_length):
+        # Range format, as a single range only:
+        # bytes=<head>-<tail>
+        head_index = 0
+        tail_index = content_length - 1
+        value = self.headers.get("Range")
+        if value is not None:
+            head_index = None
+            if value.startswith("bytes=") and (value.count("-") == 1):
+                (head, tail) = value[len("bytes="):].split("-")
+                if head.isdigit() and (tail.isdigit() or (tail == "")):
+                    head_index = int(head)
+                    if tail != "":
+                        tail_index = min(int(tail), content_length - 1)
+            if ((head_index is None) or (head_index > tail_index)):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{content_length}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                head_index = None
+        return (head_index, tail_index)
+
+    def _send_zone_headers(self, zone, status, content_length):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(content_length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Last-Modified", self.server.get_last_modified())
+        self.send_header("ETag", zone.get_etag())
+
+    def _make_not_modified(self, zone):
+        not_modified = False
+        if self.headers.get("If-None-Match") is not None:
+            not_modified = (self.headers.get("If-None-Match") == zone.get_etag())
+        elif self.headers.get("If-Modified-Since") is not None:
+            not_modified = (self.headers.get("If-Modified-Since") == self.server.get_last_modified())
+        if not_modified:
+            self.send_response(304)
+            self.send_header("Last-Modified", self.server.get_last_modified())
+            self.send_header("ETag", zone.get_etag())
+            self.end_headers()
+        return not_modified
+
+    def _send_octets(self, octets):
+        # Throttled per connection, as requested.
+        rate = self.server.get_rate()
+        start_seconds = time.monotonic()
+        sent = 0
+        while sent < len(octets):
+            block = octets[sent:sent + Handler.BLOCK_SIZE]
+            self.wfile.write(block)
+            sent = sent + len(block)
+            if rate > 0:
+                delay_seconds = (sent / rate) - (time.monotonic() - start_seconds)
+                if delay_seconds > 0:
+                    time.sleep(delay_seconds)
+
+    def do_POST(self):
+        self.server.delay()
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        if self.path != "/api/authenticate":
+            self._send_json(404, {"message": "Not Found"})
+        else:
+            data = json.loads(body)
+            if ((data.get("username") == self.server.get_icann_user()) and
+                (data.get("password") == self.server.get_icann_password())):
+                self._send_json(200, {"accessToken": self.server.get_access_token(),
+                                      "message": "Authentication Successful"})
+            else:
+                self._send_json(401, {"message": "Invalid username or password"})
+
+    def do_HEAD(self):
+        self.server.delay()
+        if self._make_authorized():
+            zone = self._make_zone()
+            if zone is not None:
+                if not self._make_not_modified(zone):
+                    self._send_zone_headers(zone, 200, len(zone.get_octets()))
+                    self.end_headers()
+
+    def do_GET(self):
+        self.server.delay()
+        if self._make_authorized():
+            if self.path == "/czds/downloads/links":
+                host = self.headers.get("Host")
+                links = [f"http://{host}/czds/downloads/{tld}.zone" for tld in sorted(self.server.get_tld_to_zone().keys())]
+                self._send_json(200, links)
+            else:
+                zone = self._make_zone()
+                if zone is not None:
+                    # Sliced without copying.
+                    octets = memoryview(zone.get_octets())
+                    (head_index, tail_index) = self._make_range(len(octets))
+                    if head_index is not None:
+                        if self.headers.get("Range") is None:
+                            status = 200
+                        else:
+                            status = 206
+                        fault = self.server.make_fault()
+                        if fault == Server.FAULT_STATUS:
+                            self._send_json(503, {"message": "Service Unavailable"})
+                        else:
+                            self._send_zone_headers(zone, status, (tail_index - head_index) + 1)
+                            if status == 206:
+                                self.send_header("Content-Range", f"bytes {head_index}-{tail_index}/{len(octets)}")
+                            self.end_headers()
+                            if fault == Server.FAULT_CUT:
+                                # Part way through, then the connection is lost.
+                                cut_index = head_index + ((tail_index - head_index) // 2)
+                                self._send_octets(octets[head_index:cut_index])
+                                self.close_connection = True
+                            else:
+                                self._send_octets(octets[head_index:tail_index + 1])
+
+#-------------------------------------------------------------------------------
+
+class Server(http.server.ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    # Fault.
+    FAULT_STATUS = "status"
+    FAULT_CUT = "cut"
+
+    def __init__(self,
+                 port,
+                 icann_user,
+                 icann_password,
+                 tld_to_zone,
+                 latency_seconds,
+                 rate,
+                 fault_ratio,
+                 seed):
+        self._icann_user = icann_user
+        self._icann_password = icann_password
+        self._tld_to_zone = tld_to_zone
+        self._latency_seconds = latency_seconds
+        self._rate = rate
+        self._fault_ratio = fault_ratio
+        self._prng = random.Random(seed)
+        self._access_token = secrets.token_hex(32)
+        now_datetime = datetime.datetime.now(datetime.timezone.utc)
+        self._last_modified = now_datetime.strftime(Handler.LAST_MODIFIED_FORMAT)
+        http.server.ThreadingHTTPServer.__init__(self, ("127.0.0.1", port), Handler)
+
+    def get_icann_user(self):
+        return self._icann_user
+
+    def get_icann_password(self):
+        return self._icann_password
+
+    def get_access_token(self):
+        return self._access_token
+
+    def get_tld_to_zone(self):
+        return self._tld_to_zone
+
+    def get_last_modified(self):
+        return self._last_modified
+
+    def get_rate(self):
+        return self._rate
+
+    def delay(self):
+        if self._latency_seconds > 0:
+            time.sleep(self._latency_seconds)
+
+    def make_fault(self):
+        # Either an error status, or a body cut short.
+        fault = None
+        if self._prng.random() < self._fault_ratio:
+            fault = self._prng.choice([Server.FAULT_STATUS, Server.FAULT_CUT])
+        return fault
+
+#-------------------------------------------------------------------------------
+
+class Main():
+
+    def __init__(self):
+        # Arguments.
+        self._port = None
+        self._icann_user = None
+        self._icann_password = None
+        self._tlds = None
+        self._zone_size = None
+        self._latency_seconds = None
+        self._rate = None
+        self._fault_ratio = None
+        self._seed = None
+
+        # State.
+        self._tld_to_zone = None
+
+    def process_arguments(self):
+        argument_parser = argparse.ArgumentParser()
+        argument_parser.add_argument("--port",
+                                     type=int,
+                                     required=True,
+                                     help="Port, on 127.0.0.1. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--icann_user",
+                                     type=str,
+                                     required=True,
+                                     help="ICANN user, as accepted. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--icann_password",
+                                     type=str,
+                                     required=True,
+                                     help="ICANN password, as accepted. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--tld",
+                                     type=str,
+                                     nargs="+",
+                                     required=True,
+                                     help="TLD, or list of TLDs, each served with a synthetic zone file. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--zone_size",
+                                     type=int,
+                                     required=True,
+                                     help="Approximate size of each synthetic zone file archive. Perhaps: 104857600 (100 MiB). "
+                                          "Must be 1 or more. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--latency_seconds",
+                                     type=float,
+                                     default=0.0,
+                                     help="Latency added to every request. "
+                                          "Default: 0.0. "
+                                          "(Optional)")
+        argument_parser.add_argument("--rate",
+                                     type=int,
+                                     default=0,
+                                     help="Largest octets per second, per connection. "
+                                          "Default: 0, as unlimited. "
+                                          "(Optional)")
+        argument_parser.add_argument("--fault_ratio",
+                                     type=float,
+                                     default=0.0,
+                                     help="Ratio of zone file downloads which fault, "
+                                          "either as an error status, or as a body cut short. "
+                                          "Default: 0.0. "
+                                          "(Optional)")
+        argument_parser.add_argument("--seed",
+                                     type=int,
+                                     default=0,
+                                     help="Seed, for both the synthetic zone files and the faults. "
+                                          "Default: 0. "
+                                          "(Optional)")
+
+        namespace = argument_parser.parse_args()
+        self._port = util.make_int_ge(namespace.port, 1)
+        self._icann_user = namespace.icann_user
+        self._icann_password = namespace.icann_password
+        self._tlds = namespace.tld
+        self._zone_size = util.make_int_ge(namespace.zone_size, 1)
+        self._latency_seconds = namespace.latency_seconds
+        self._rate = util.make_int_ge(namespace.rate, 0)
+        self._fault_ratio = namespace.fault_ratio
+        if not (0.0 <= self._fault_ratio <= 1.0):
+            msg = f"Value: {self._fault_ratio} must be between: 0.0 and: 1.0\n"
+            util.stop(msg)
+        self._seed = namespace.seed
+
+    def generate(self):
+        self._tld_to_zone = {}
+        for tld in self._tlds:
+            zone = Zone(tld, self._zone_size, self._seed)
+            zone.generate()
+            self._tld_to_zone[tld] = zone
+
+    def serve(self):
+        server = Server(self._port,
+                        self._icann_user,
+                        self._icann_password,
+                        self._tld_to_zone,
+                        self._latency_seconds,
+                        self._rate,
+                        self._fault_ratio,
+                        self._seed)
+        util.info(f"Serve: http://127.0.0.1:{self._port}\n")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+
+    def start(self):
+        self.process_arguments()
+        self.generate()
+        self.serve()
+
+if __name__ == '__main__':
+    main = Main()
+    main.start()
@@ -5,8 +5,15 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__f
 
 # Internal
 import argparse
+import concurrent.futures
 import datetime
+import hashlib
+import http.client
 import json
+import threading
+import time
+import urllib.parse
+import zlib
 
 # Local
 import distribute
@@ -17,8 +24,10 @@ import util
 class TaskAuthentication(distribute.Task):
 
     def __init__(self, 
+                 account_url,
                  icann_user,
                  icann_password):
+        self._account_url = account_url
         self._icann_user = icann_user 
         self._icann_password = icann_password
         self._access_token = None
@@ -34,7 +43,7 @@ class TaskAuthentication(distribute.Task):
                    "--header", "Accept: application/json",
                    "--header", "Content-Type: application/json",
                    "--data", data,
-                   "https://account-api.icann.org/api/authenticate"]
+                   f"{self._account_url}/api/authenticate"]
         return command
 
     def make_outcome(self):
@@ -50,15 +59,15 @@ class TaskAuthentication(distribute.Task):
 class TaskLink(distribute.Task):
 
     def __init__(self, 
-                 access_token,
-                 tld):
+                 czds_url,
+                 access_token):
+        self._czds_url = czds_url
         self._access_token = access_token 
-        self._tld = tld 
-        self._link = None
+        self._tld_to_link = {}
         distribute.Task.__init__(self) 
 
-    def get_link(self):
-        return self._link
+    def get_tld_to_link(self):
+        return self._tld_to_link
 
     def make_command(self):
         command = ["curl",
@@ -66,35 +75,54 @@ class TaskLink(distribute.Task):
                    "--header", "Accept: application/json",
                    "--header", "Content-Type: application/json",
                    "--header", f"Authorization: Bearer {self._access_token}",
-                   "https://czds-api.icann.org/czds/downloads/links"]
+                   f"{self._czds_url}/czds/downloads/links"]
         return command
 
     def make_outcome(self):
+        # Link format:
+        # https://czds-api.icann.org/czds/downloads/<TLD>.zone
         data = json.loads(self.get_popen_stdout())
         for link in data:
-            if link.endswith(f"{self._tld}.zone"):
-                if self._link is None:
-                    self._link = link
-                else:
-                    msg = "Unexpected duplicate links for: {self._tld}\n"
-                    util.stop(msg)
-        if self._link is None:
-            msg = "Unexpected no link for: {self._tld}\n"
-            util.stop(msg)
+            link_file_name = link.split("/")[-1]
+            if not link_file_name.endswith(".zone"):
+                msg = f"Unexpected link format: {link}\n"
+                util.stop(msg)
+            tld = link_file_name[:-len(".zone")]
+            if tld in self._tld_to_link.keys():
+                msg = f"Unexpected duplicate links for: {tld}\n"
+                util.stop(msg)
+            self._tld_to_link[tld] = link
 
 #-------------------------------------------------------------------------------
 
 class TaskProbe(distribute.Task):
 
+    LAST_MODIFIED_FORMAT = "%a, %d %b %Y %H:%M:%S %Z"
+
     def __init__(self, 
                  access_token,
-                 link):
+                 link,
+                 probe_cache):
         self._access_token = access_token 
         self._link = link 
+        # As recorded by the prior probe, to permit a conditional request.
+        self._probe_cache = probe_cache
+        self._status = None
+        self._last_modified = None
+        self._etag = None
         self._last_modified_date = None
         self._content_length = None
         distribute.Task.__init__(self) 
 
+    def get_status(self):
+        return self._status
+
+    def get_last_modified(self):
+        return self._last_modified
+
+    def get_etag(self):
+        return self._etag
+
     def get_last_modified_date(self):
         return self._last_modified_date
 
@@ -104,20 +132,42 @@ class TaskProbe(distribute.Task):
     def make_command(self):
         command = ["curl",
                    "--head",
-                   "--header", f"Authorization: Bearer {self._access_token}",
-                   self._link]
+                   "--header", f"Authorization: Bearer {self._access_token}"]
+        if self._probe_cache.get_value("Last-Modified") is not None:
+            command = command + ["--header", f"If-Modified-Since: {self._probe_cache.get_value('Last-Modified')}"]
+        if self._probe_cache.get_value("ETag") is not None:
+            command = command + ["--header", f"If-None-Match: {self._probe_cache.get_value('ETag')}"]
+        command = command + [self._link]
         return command
 
     def make_outcome(self):
+        # Header names are case insensitive, and lower case over HTTP/2.
         lines = self.get_popen_stdout().split("\n")
         for line in lines:
             line = line.strip()
-            key = "Last-Modified: "
-            if line.startswith(key):
-                self._last_modified_date = datetime.datetime.strptime(line.replace(key,""), "%a, %d %b %Y %H:%M:%S %Z").date()
-            key = "Content-Length: "
-            if line.startswith(key):
-                self._content_length = int(line.replace(key,""))
+            if line.startswith("HTTP/"):
+                self._status = int(line.split(" ")[1])
+            parts = line.split(": ", 1)
+            if len(parts) == 2:
+                key = parts[0].lower()
+                value = parts[1]
+                if key == "last-modified":
+                    self._last_modified = value
+                if key == "etag":
+                    self._etag = value
+                if key == "content-length":
+                    self._content_length = int(value)
+
+        # Not Modified, so as recorded by the prior probe.
+        if self._status == 304:
+            self._last_modified = self._probe_cache.get_value("Last-Modified")
+            self._etag = self._probe_cache.get_value("ETag")
+            content_length = self._probe_cache.get_value("Content-Length")
+            if content_length is not None:
+                self._content_length = int(content_length)
+
+        if self._last_modified is not None:
+            self._last_modified_date = datetime.datetime.strptime(self._last_modified, TaskProbe.LAST_MODIFIED_FORMAT).date()
         if self._last_modified_date is None:
             msg = "Absent: last_modified_date\n"
             util.stop(msg)
@@ -127,11 +177,58 @@ class TaskProbe(distribute.Task):
 
 #-------------------------------------------------------------------------------
 
+class NativeConnection():
+
+    TIMEOUT_SECONDS = 60
+
+    # Each worker thread retains its own keep-alive connection per host, so
+    # successive parts avoid a fresh process and TLS handshake.
+    _local = threading.local()
+
+    @staticmethod
+    def _make_key(link):
+        url = urllib.parse.urlsplit(link)
+        return (url.scheme, url.netloc)
+
+    @staticmethod
+    def get(link):
+        connections = NativeConnection._local.__dict__.setdefault("connections", {})
+        key = NativeConnection._make_key(link)
+        if key not in connections:
+            (scheme, netloc) = key
+            if scheme == "https":
+                connection = http.client.HTTPSConnection(netloc, timeout=NativeConnection.TIMEOUT_SECONDS)
+            elif scheme == "http":
+                connection = http.client.HTTPConnection(netloc, timeout=NativeConnection.TIMEOUT_SECONDS)
+            else:
+                msg = f"Unexpected link scheme: {link}\n"
+                util.stop(msg)
+            connections[key] = connection
+        return connections[key]
+
+    @staticmethod
+    def drop(link):
+        connections = NativeConnection._local.__dict__.setdefault("connections", {})
+        key = NativeConnection._make_key(link)
+        if key in connections:
+            connections[key].close()
+            del connections[key]
+
+#-------------------------------------------------------------------------------
+
 class TaskPart(distribute.Task):
 
     RETRY_TOTAL = 3
+    BLOCK_SIZE = 1024 * 1024
+
+    # Engine.
+    CURL = "curl"
+    NATIVE = "native"
+
+    ENGINES = [CURL, NATIVE]
 
     def __init__(self, 
+                 engine,
                  access_token,
                  link,
                  tld,
@@ -139,7 +236,9 @@ class TaskPart(distribute.Task):
                  part_count,
                  head_index,
                  tail_index,
-                 zone_files_pack_path):
+                 zone_files_pack_path,
+                 dat_path_file):
+        self._engine = engine
         self._access_token = access_token 
         self._link = link 
         self._tld = tld
@@ -148,33 +247,279 @@ class TaskPart(distribute.Task):
         self._head_index = head_index
         self._tail_index = tail_index
         self._zone_files_pack_path = zone_files_pack_path 
+        # Shared preallocated archive, within which each part lands at its
+        # own offset.
+        self._dat_path_file = dat_path_file
         part_prefix = f"{self._tld}#{self._last_modified_date.isoformat()}#{self._part_count:06}"
-        dat_file_name = f"{part_prefix}#part.dat.bin"
         did_file_name = f"{part_prefix}#part.did.txt"
         log_file_name = f"{part_prefix}#part.log.txt"
-        self._dat_path_file = os.path.join(self._zone_files_pack_path, dat_file_name)
+        got_file_name = f"{part_prefix}#part.got.txt"
+        fetch_file_name = f"{part_prefix}#part.fetch.bin"
         did_path_file = os.path.join(self._zone_files_pack_path, did_file_name)
         log_path_file = os.path.join(self._zone_files_pack_path, log_file_name)
+        self._got_path_file = os.path.join(self._zone_files_pack_path, got_file_name)
+        # The curl engine fetches into its own file, only then landed within
+        # the archive, so a response beyond the range never reaches other
+        # parts.
+        self._fetch_path_file = os.path.join(self._zone_files_pack_path, fetch_file_name)
+        # Octets landed contiguously from the head, as retained by an
+        # interrupted run, alongside the SHA-256 of a did part.
+        (self._got, self._digest) = self._read_got()
+        self._recorded_got = (self._got, self._digest)
+        self._from_index = None
+        self._fetch_sha256 = None
+        # Measures, for adaptive control.
+        self._launch_seconds = None
+        self._finish_seconds = None
+        self._fetch_total = None
+        self._retry_total = 0
+        self._resume_total = 0
         distribute.Task.__init__(self, did_path_file=did_path_file, log_path_file=log_path_file) 
 
-    def get_dat_path_file(self):
-        return self._dat_path_file
+    def get_head_index(self):
+        return self._head_index
+
+    def get_tail_index(self):
+        return self._tail_index
+
+    def get_size(self):
+        return (self._tail_index - self._head_index) + 1
+
+    def get_part_count(self):
+        return self._part_count
+
+    def get_digest(self):
+        return self._digest
+
+    def get_got(self):
+        return self._got
+
+    def get_fetch_total(self):
+        return self._fetch_total
+
+    def get_fetch_seconds(self):
+        return self._finish_seconds - self._launch_seconds
+
+    def get_finish_seconds(self):
+        return self._finish_seconds
+
+    def get_retry_total(self):
+        return self._retry_total
+
+    def _read_got(self):
+        got = 0
+        digest = None
+        got_record = util.Record(self._got_path_file)
+        got_record.read()
+        value = got_record.get_value("Got")
+        if ((value is not None) and value.isdigit()):
+            got = int(value)
+        digest = got_record.get_value("Sha256")
+        if got > self.get_size():
+            got = 0
+        if got != self.get_size():
+            digest = None
+        return (got, digest)
+
+    def _record_got(self):
+        got = self._got
+        if got > self.get_size():
+            got = 0
+        if (got, self._digest) != self._recorded_got:
+            # The range is retained, so a later run may recover the part
+            # whatever its part size.
+            got_record = util.Record(self._got_path_file)
+            got_record.add_entry("Head", str(self._head_index))
+            got_record.add_entry("Tail", str(self._tail_index))
+            got_record.add_entry("Got", str(got))
+            if self._digest is not None:
+                got_record.add_entry("Sha256", self._digest)
+            got_record.write()
+            self._recorded_got = (got, self._digest)
+
+    def _make_sha256(self, head_index, tail_index):
+        # Read back from the archive, expected as still within page cache.
+        sha256 = hashlib.sha256()
+        dat_handle = open(self._dat_path_file, "rb")
+        dat_handle.seek(head_index)
+        remain = (tail_index - head_index) + 1
+        while remain > 0:
+            block_octets = dat_handle.read(min(remain, TaskPart.BLOCK_SIZE))
+            if len(block_octets) == 0:
+                msg = f"Unexpected end of: {self._dat_path_file}\n"
+                util.stop(msg)
+            sha256.update(block_octets)
+            remain = remain - len(block_octets)
+        dat_handle.close()
+        return sha256
+
+    def _make_from_index(self):
+        # At least the tail octet is always requested, so a part found
+        # complete yet not did is still confirmed against the server.
+        from_index = self._head_index + self._got
+        if from_index > self._tail_index:
+            from_index = self._tail_index
+        self._got = from_index - self._head_index
+        return from_index
+
+    def _land(self):
+        # Only a partial content response, within the range, as from the
+        # from index, whether whole or cut short.
+        if os.path.isfile(self._fetch_path_file):
+            fetch_total = os.path.getsize(self._fetch_path_file)
+            status = self.get_popen_stdout().strip()
+            if ((status == "206") and (fetch_total <= (self._tail_index - self._from_index) + 1)):
+                dat_fd = os.open(self._dat_path_file, os.O_WRONLY)
+                fetch_handle = open(self._fetch_path_file, "rb")
+                index = self._from_index
+                remain = True
+                while remain:
+                    block_octets = fetch_handle.read(TaskPart.BLOCK_SIZE)
+                    if len(block_octets) == 0:
+                        remain = False
+                    else:
+                        os.pwrite(dat_fd, block_octets, index)
+                        index = index + len(block_octets)
+                fetch_handle.close()
+                os.close(dat_fd)
+                self._got = index - self._head_index
+            os.remove(self._fetch_path_file)
+
+    def update(self):
+        distribute.Task.update(self)
+        if self.get_level() == distribute.Task.BUSY:
+            self._record_got()
+        if self.get_level() == distribute.Task.DONE:
+            # The curl engine, or a part did without a recorded digest.
+            if self._digest is None:
+                self._digest = self._make_sha256(self._head_index, self._tail_index).hexdigest()
+                self._record_got()
 
     def make_command(self):
-        command = ["curl",
-                   "--no-progress-meter",
-                   "--retry", str(TaskPart.RETRY_TOTAL),
-                   "--request", "GET",
-                   "--header", f"Authorization: Bearer {self._access_token}",
-                   "--range", f"{self._head_index}-{self._tail_index}",
-                   "--output", self._dat_path_file,
-                   self._link]
+        self._from_index = self._make_from_index()
+        self._launch_seconds = time.monotonic()
+        if self._engine == TaskPart.CURL:
+            # Output is to the fetch file, rewritten on each retry, while the
+            # status is to stdout.
+            command = ["curl",
+                       "--no-progress-meter",
+                       "--fail",
+                       "--retry", str(TaskPart.RETRY_TOTAL),
+                       "--request", "GET",
+                       "--header", f"Authorization: Bearer {self._access_token}",
+                       "--range", f"{self._from_index}-{self._tail_index}",
+                       "--output", self._fetch_path_file,
+                       "--write-out", "%{http_code}",
+                       self._link]
+        else:
+            # Presented within the log only, as executed by fetch.
+            command = ["native",
+                       "--retry", str(TaskPart.RETRY_TOTAL),
+                       "--request", "GET",
+                       "--range", f"{self._from_index}-{self._tail_index}",
+                       self._link]
         return command
 
+    def make_resume(self):
+        # The curl engine retries only transient errors, not a body cut
+        # short, so the part waits to resume from the octets landed, as the
+        # native engine does within fetch.
+        resume = False
+        if self._engine == TaskPart.CURL:
+            self._land()
+            self._record_got()
+            self._retry_total = self._retry_total + self.get_popen_stderr().count("Will retry")
+            if ((self._got < self.get_size()) and (self._resume_total < TaskPart.RETRY_TOTAL)):
+                self._resume_total = self._resume_total + 1
+                self._retry_total = self._retry_total + 1
+                resume = True
+        return resume
+
+    def make_result(self):
+        if self._finish_seconds is None:
+            self._finish_seconds = time.monotonic()
+            self._fetch_total = (self._head_index + self._got) - self._from_index
+        self._record_got()
+        result = False
+        if distribute.Task.make_result(self):
+            result = (self._got == self.get_size())
+        return result
+
+    def make_outcome(self):
+        # Native digests are made as the octets arrive.
+        if self._fetch_sha256 is not None:
+            self._digest = self._fetch_sha256.hexdigest()
+            self._record_got()
+
+    def make_call(self):
+        return (self.fetch,)
+
+    def fetch(self):
+        url = urllib.parse.urlsplit(self._link)
+        target = url.path
+        if url.query != "":
+            target = target + "?" + url.query
+        block = bytearray(TaskPart.BLOCK_SIZE)
+        block_view = memoryview(block)
+        dat_fd = os.open(self._dat_path_file, os.O_WRONLY)
+        index = self._from_index
+        if index > self._head_index:
+            sha256 = self._make_sha256(self._head_index, index - 1)
+        else:
+            sha256 = hashlib.sha256()
+        code = 1
+        stdout = ""
+        stderr = ""
+        attempt = 0
+        while ((code != 0) and (attempt <= TaskPart.RETRY_TOTAL)):
+            if attempt > 0:
+                time.sleep(attempt)
+            attempt = attempt + 1
+            self._retry_total = attempt - 1
+            # Each attempt resumes from the octets already landed.
+            headers = {"Authorization": f"Bearer {self._access_token}",
+                       "Range": f"bytes={index}-{self._tail_index}"}
+            connection = NativeConnection.get(self._link)
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                if response.status == 206:
+                    remain = True
+                    while remain:
+                        size = response.readinto(block)
+                        if size == 0:
+                            remain = False
+                        else:
+                            os.pwrite(dat_fd, block_view[:size], index)
+                            sha256.update(block_view[:size])
+                            index = index + size
+                            self._got = index - self._head_index
+                    # A body cut short simply ends, without an error.
+                    if index == (self._tail_index + 1):
+                        code = 0
+                    else:
+                        NativeConnection.drop(self._link)
+                        stderr = stderr + f"Attempt: {attempt} Incomplete: {index - 1} of: {self._tail_index}\n"
+                else:
+                    response.read()
+                    stderr = stderr + f"Attempt: {attempt} Status: {response.status} {response.reason}\n"
+            except (OSError, http.client.HTTPException) as e:
+                NativeConnection.drop(self._link)
+                stderr = stderr + f"Attempt: {attempt} Error: {e}\n"
+        os.close(dat_fd)
+        self._finish_seconds = time.monotonic()
+        self._fetch_total = index - self._from_index
+        if code == 0:
+            self._fetch_sha256 = sha256
+        return (code, stdout, stderr)
+
     def tidy(self):
-        os.remove(self._dat_path_file)
         os.remove(self._did_path_file)
         os.remove(self._log_path_file)
+        if os.path.isfile(self._fetch_path_file):
+            os.remove(self._fetch_path_file)
+        if os.path.isfile(self._got_path_file):
+            os.remove(self._got_path_file)
 
 #-------------------------------------------------------------------------------
 
@@ -192,29 +537,462 @@ class TaskCheck(distribute.Task):
 
 #-------------------------------------------------------------------------------
 
+class Verify():
+
+    BLOCK_SIZE = 1024 * 1024
+    INFLATE_SIZE = 1024 * 1024 * 4
+    IDLE_FREQ_SECONDS = 1
+
+    # Gzip, rather than zlib or raw deflate.
+    GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+    def __init__(self,
+                 dat_path_file,
+                 frontier_path_file,
+                 content_length,
+                 head_to_part_task):
+        self._dat_path_file = dat_path_file
+        self._frontier_path_file = frontier_path_file
+        self._content_length = content_length
+        # Parts may be added while verifying, as they are carved.
+        self._head_to_part_task = head_to_part_task
+        self._sha256 = hashlib.sha256()
+        self._decompress = zlib.decompressobj(wbits=Verify.GZIP_WBITS)
+        self._index = 0
+        self._error = None
+        self._thread = None
+
+    def get_index(self):
+        return self._index
+
+    def get_digest(self):
+        return self._sha256.hexdigest()
+
+    def get_error(self):
+        return self._error
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def join(self):
+        self._thread.join()
+        return self._error is None
+
+    def _inflate(self, block_octets):
+        # Gzip permits concatenated members. Output is bounded per call, so
+        # memory is bounded whatever the compression ratio.
+        octets = block_octets
+        remain = True
+        while remain:
+            if self._decompress.eof:
+                self._decompress = zlib.decompressobj(wbits=Verify.GZIP_WBITS)
+            inflate_octets = self._decompress.decompress(octets, Verify.INFLATE_SIZE)
+            if self._decompress.eof:
+                octets = self._decompress.unused_data
+                remain = (len(octets) > 0)
+            else:
+                octets = self._decompress.unconsumed_tail
+                remain = ((len(octets) > 0) or (len(inflate_octets) == Verify.INFLATE_SIZE))
+
+    def _publish(self):
+        # So a parse may follow the archive while later parts still arrive.
+        frontier_record = util.Record(self._frontier_path_file)
+        frontier_record.add_entry("Length", str(self._content_length))
+        frontier_record.add_entry("Index", str(self._index))
+        if self._error is not None:
+            frontier_record.add_entry("Error", self._error)
+        frontier_record.write()
+
+    def _run(self):
+        # Follow the frontier of contiguous did parts, while later parts are
+        # still arriving, so the archive is never read again once complete.
+        # Unbuffered, as a buffered read ahead would retain octets of parts
+        # yet to arrive.
+        dat_handle = open(self._dat_path_file, "rb", buffering=0)
+        try:
+            while self._index < self._content_length:
+                part_task = self._head_to_part_task.get(self._index)
+                while ((part_task is None) or (part_task.get_digest() is None)):
+                    time.sleep(Verify.IDLE_FREQ_SECONDS)
+                    part_task = self._head_to_part_task.get(self._index)
+                dat_handle.seek(part_task.get_head_index())
+                remain = part_task.get_size()
+                while remain > 0:
+                    block_octets = dat_handle.read(min(remain, Verify.BLOCK_SIZE))
+                    if len(block_octets) == 0:
+                        raise EOFError("Unexpected end of archive")
+                    self._sha256.update(block_octets)
+                    self._inflate(block_octets)
+                    remain = remain - len(block_octets)
+                    self._index = self._index + len(block_octets)
+                self._publish()
+            if self._index != self._content_length:
+                raise EOFError("Unexpected archive length")
+            if not self._decompress.eof:
+                raise EOFError("Unexpected end of gzip stream")
+        except (OSError, EOFError, zlib.error) as e:
+            self._error = f"{e}"
+            self._publish()
+        dat_handle.close()
+
+#-------------------------------------------------------------------------------
+
+class Zone():
+
+    def __init__(self,
+                 tld,
+                 link,
+                 zone_files_pack_path):
+        self._tld = tld
+        self._link = link
+        self._zone_files_pack_path = zone_files_pack_path
+        self._last_modified_date = None
+        self._content_length = None
+        self._full_path_file = None
+        self._dat_path_file = None
+        self._sum_path_file = None
+        self._frontier_path_file = None
+        self._probe_cache_path_file = os.path.join(self._zone_files_pack_path, f"{self._tld}#probe.cache.txt")
+        self._probe_cache = util.Record(self._probe_cache_path_file)
+        self._engine = None
+        self._access_token = None
+        self._part_count = None
+        self._part_tasks = []
+        self._head_to_part_task = {}
+        self._gaps = []
+        self._verify = None
+
+    def get_tld(self):
+        return self._tld
+
+    def get_link(self):
+        return self._link
+
+    def get_content_length(self):
+        return self._content_length
+
+    def get_full_path_file(self):
+        return self._full_path_file
+
+    def get_dat_path_file(self):
+        return self._dat_path_file
+
+    def get_part_tasks(self):
+        return self._part_tasks
+
+    def get_probe_cache(self):
+        return self._probe_cache
+
+    def make_present(self):
+        return os.path.isfile(self._full_path_file)
+
+    def _make_path_files(self):
+        zone_prefix = f"{self._tld}#{self._last_modified_date.isoformat()}"
+        self._full_path_file = os.path.join(self._zone_files_pack_path, f"{zone_prefix}#full.txt.gz")
+        self._dat_path_file = os.path.join(self._zone_files_pack_path, f"{zone_prefix}#full.dat.bin")
+        self._sum_path_file = os.path.join(self._zone_files_pack_path, f"{zone_prefix}#full.sum.txt")
+        self._frontier_path_file = os.path.join(self._zone_files_pack_path, f"{zone_prefix}#full.frontier.txt")
+
+    def make_fresh(self, today_date, refresh):
+        # Zone files are published at most daily, so once an archive exists
+        # for today there is no need to probe.
+        fresh = False
+        if not refresh:
+            self._last_modified_date = today_date
+            self._make_path_files()
+            fresh = self.make_present()
+        if fresh:
+            util.info(f"Zone: {self._tld} Fresh: {today_date.isoformat()}\n")
+        else:
+            self._last_modified_date = None
+            if not refresh:
+                self._probe_cache.read()
+        return fresh
+
+    def probe(self, task_probe):
+        self._last_modified_date = task_probe.get_last_modified_date()
+        self._content_length = task_probe.get_content_length()
+        self._make_path_files()
+        self._probe_cache = util.Record(self._probe_cache_path_file)
+        self._probe_cache.add_entry("Last-Modified", task_probe.get_last_modified())
+        if task_probe.get_etag() is not None:
+            self._probe_cache.add_entry("ETag", task_probe.get_etag())
+        self._probe_cache.add_entry("Content-Length", str(self._content_length))
+        self._probe_cache.write()
+        util.info(f"Zone: {self._tld} "
+                  f"Last modified date: {self._last_modified_date.isoformat()} "
+                  f"Content length: {self._content_length} "
+                  f"Status: {task_probe.get_status()}\n")
+
+    def allocate(self):
+        # Retained across an interrupted run, so parts already did or got
+        # remain.
+        if os.path.isfile(self._dat_path_file):
+            if os.path.getsize(self._dat_path_file) != self._content_length:
+                msg = f"Unexpected size for: {self._dat_path_file}\n"
+                util.stop(msg)
+        else:
+            # Part files without the archive are stale.
+            part_prefix = f"{self._tld}#{self._last_modified_date.isoformat()}#"
+            for file_name in os.listdir(self._zone_files_pack_path):
+                if file_name.startswith(part_prefix) and file_name.endswith("#part.did.txt"):
+                    os.remove(os.path.join(self._zone_files_pack_path, file_name))
+                if file_name.startswith(part_prefix) and file_name.endswith("#part.got.txt"):
+                    os.remove(os.path.join(self._zone_files_pack_path, file_name))
+                if file_name.startswith(part_prefix) and file_name.endswith("#part.fetch.bin"):
+                    os.remove(os.path.join(self._zone_files_pack_path, file_name))
+            if os.path.isfile(self._frontier_path_file):
+                os.remove(self._frontier_path_file)
+            dat_fd = os.open(self._dat_path_file, os.O_WRONLY | os.O_CREAT, 0o644)
+            os.posix_fallocate(dat_fd, 0, self._content_length)
+            os.close(dat_fd)
+
+    def _make_part_task(self, part_count, head_index, tail_index):
+        task_part = TaskPart(self._engine,
+                             self._access_token,
+                             self._link,
+                             self._tld,
+                             self._last_modified_date,
+                             part_count,
+                             head_index,
+                             tail_index,
+                             self._zone_files_pack_path,
+                             self._dat_path_file)
+        self._part_tasks.append(task_part)
+        self._head_to_part_task[head_index] = task_part
+
+        # Remove from the gap that holds the part.
+        found = False
+        gaps = []
+        for (gap_head_index, gap_tail_index) in self._gaps:
+            if ((gap_head_index <= head_index) and (tail_index <= gap_tail_index)):
+                found = True
+                if gap_head_index < head_index:
+                    gaps.append((gap_head_index, head_index - 1))
+                if tail_index < gap_tail_index:
+                    gaps.append((tail_index + 1, gap_tail_index))
+            else:
+                gaps.append((gap_head_index, gap_tail_index))
+        if not found:
+            msg = f"Unexpected overlapping part: {task_part.get_part_count():06} for: {self._dat_path_file}\n"
+            util.stop(msg)
+        self._gaps = gaps
+        return task_part
+
+    def plan(self, engine, access_token):
+        self._engine = engine
+        self._access_token = access_token
+        self._part_tasks = []
+        self._head_to_part_task = {}
+        self._gaps = [(0, self._content_length - 1)]
+
+        # Recover every part got by an earlier run, whatever its part size,
+        # and never reuse a part count.
+        part_prefix = f"{self._tld}#{self._last_modified_date.isoformat()}#"
+        part_suffixes = ["#part.did.txt", "#part.log.txt", "#part.got.txt", "#part.fetch.bin"]
+        recover_parts = []
+        self._part_count = 0
+        for file_name in sorted(os.listdir(self._zone_files_pack_path)):
+            if file_name.startswith(part_prefix):
+                for part_suffix in part_suffixes:
+                    if file_name.endswith(part_suffix):
+                        part_count = int(file_name[len(part_prefix):-len(part_suffix)])
+                        self._part_count = max(self._part_count, part_count)
+                if file_name.endswith("#part.got.txt"):
+                    got_record = util.Record(os.path.join(self._zone_files_pack_path, file_name))
+                    got_record.read()
+                    if ((got_record.get_value("Head") is not None) and
+                        (got_record.get_value("Tail") is not None)):
+                        recover_parts.append((int(got_record.get_value("Head")),
+                                              int(got_record.get_value("Tail")),
+                                              part_count))
+        for (head_index, tail_index, part_count) in sorted(recover_parts):
+            self._make_part_task(part_count, head_index, tail_index)
+
+        self._verify = Verify(self._dat_path_file, self._frontier_path_file, self._content_length, self._head_to_part_task)
+        self._verify.start()
+        return list(self._part_tasks)
+
+    def carve(self, part_size):
+        # Lowest first, so the verify frontier advances.
+        task_part = None
+        if len(self._gaps) > 0:
+            (gap_head_index, gap_tail_index) = self._gaps[0]
+            tail_index = min(gap_head_index + (part_size - 1), gap_tail_index)
+            self._part_count = self._part_count + 1
+            task_part = self._make_part_task(self._part_count, gap_head_index, tail_index)
+        return task_part
+
+    def verify(self):
+        if not self._verify.join():
+            msg = f"Unexpected Failure: Verify: {self._dat_path_file} Error: {self._verify.get_error()}\n"
+            util.stop(msg)
+
+    def finish(self):
+        # Recorded, so later stages may trust the archive without reading it
+        # again.
+        sum_handle = open(self._sum_path_file, "w")
+        sum_handle.write(f"Length: {self._content_length}\n")
+        sum_handle.write(f"Sha256: {self._verify.get_digest()}\n")
+        sum_handle.write(f"Gzip: Verified\n")
+        for part_task in sorted(self._part_tasks, key=lambda part_task: part_task.get_head_index()):
+            sum_handle.write(f"Part: {part_task.get_part_count():06} "
+                             f"{part_task.get_head_index()} "
+                             f"{part_task.get_tail_index()} "
+                             f"{part_task.get_digest()}\n")
+        sum_handle.close()
+        os.rename(self._dat_path_file, self._full_path_file)
+
+    def tidy(self):
+        for part_task in self._part_tasks:
+            part_task.tidy()
+        if os.path.isfile(self._frontier_path_file):
+            os.remove(self._frontier_path_file)
+
+#-------------------------------------------------------------------------------
+
+class TaskPartManager(distribute.TaskManager):
+
+    ADAPT_FREQ_SECONDS = 30
+    MIN_PART_SIZE = 1024 * 1024
+
+    # Throughput within this ratio of the prior window is deemed steady.
+    STEADY_RATIO = 0.9
+
+    def __init__(self,
+                 zones,
+                 part_size,
+                 core_total,
+                 core_ceiling,
+                 executor):
+        distribute.TaskManager.__init__(self,
+                                        label="Parts",
+                                        core_total=core_total,
+                                        idle_freq_seconds=1,
+                                        track_freq_seconds=30,
+                                        executor=executor)
+        self._zones = zones
+        self._part_size = part_size
+        self._max_part_size = part_size
+        self._core_ceiling = core_ceiling
+        self._adapt_seconds = None
+        self._adapt_got_total = None
+        self._adapt_retry_total = None
+        self._adapt_rate = None
+
+    def _make_totals(self):
+        got_total = 0
+        retry_total = 0
+        for task in self.get_tasks():
+            got_total = got_total + task.get_got()
+            retry_total = retry_total + task.get_retry_total()
+        return (got_total, retry_total)
+
+    def _measure(self):
+        # Over the window, all octets landed, every retry, and the rate of
+        # each part finished.
+        now_seconds = time.monotonic()
+        (got_total, retry_total) = self._make_totals()
+        rate = (got_total - self._adapt_got_total) / (now_seconds - self._adapt_seconds)
+        window_retry_total = retry_total - self._adapt_retry_total
+        part_rates = []
+        for task in self.get_tasks():
+            if task.get_level() == distribute.Task.DONE:
+                finish_seconds = task.get_finish_seconds()
+                if ((finish_seconds is not None) and (finish_seconds > self._adapt_seconds)):
+                    if task.get_fetch_seconds() > 0:
+                        part_rates.append(task.get_fetch_total() / task.get_fetch_seconds())
+        if len(part_rates) > 0:
+            part_rate = sum(part_rates) / len(part_rates)
+        else:
+            part_rate = None
+        self._adapt_seconds = now_seconds
+        self._adapt_got_total = got_total
+        self._adapt_retry_total = retry_total
+        return (rate, part_rate, window_retry_total)
+
+    def _control(self, rate, retry_total):
+        # AIMD: retries halve both concurrency and part size, while steady
+        # throughput adds a core and grows the part size.
+        core_total = self.get_core_total()
+        if retry_total > 0:
+            core_total = max(1, core_total // 2)
+            self._part_size = max(TaskPartManager.MIN_PART_SIZE, self._part_size // 2)
+        elif self._adapt_rate is not None:
+            if rate >= (self._adapt_rate * TaskPartManager.STEADY_RATIO):
+                core_total = min(self._core_ceiling, core_total + 1)
+                part_size_step = max(TaskPartManager.MIN_PART_SIZE, self._max_part_size // 8)
+                self._part_size = min(self._max_part_size, self._part_size + part_size_step)
+        self.set_core_total(core_total)
+        self._adapt_rate = rate
+
+    def _carve(self):
+        # Carve only as required to occupy every core, largest zone first.
+        wait_total = 0
+        for task in self.get_tasks():
+            if task.get_level() in [distribute.Task.INIT, distribute.Task.WAIT]:
+                wait_total = wait_total + 1
+        for zone in self._zones:
+            task_part = True
+            while ((wait_total < self.get_core_total()) and (task_part is not None)):
+                task_part = zone.carve(self._part_size)
+                if task_part is not None:
+                    self.add_task(task_part)
+                    wait_total = wait_total + 1
+
+    def adapt(self):
+        now_seconds = time.monotonic()
+        if self._adapt_seconds is None:
+            self._adapt_seconds = now_seconds
+            (self._adapt_got_total, self._adapt_retry_total) = self._make_totals()
+        if (now_seconds - self._adapt_seconds) >= TaskPartManager.ADAPT_FREQ_SECONDS:
+            (rate, part_rate, retry_total) = self._measure()
+            self._control(rate, retry_total)
+            if part_rate is None:
+                part_rate_present = "Calculating"
+            else:
+                part_rate_present = f"{part_rate / (1024 * 1024):.1f} MiB/s"
+            util.info(f"Adapt: Rate: {rate / (1024 * 1024):.1f} MiB/s "
+                      f"Part rate: {part_rate_present} "
+                      f"Retry: {retry_total} "
+                      f"Core: {self.get_core_total()} "
+                      f"Part size: {self._part_size}\n")
+        self._carve()
+
+#-------------------------------------------------------------------------------
+
 class Main():
 
-    BLOCK_SIZE = 1024 * 64
+    # An access token is valid for 24 hours, so retain a margin.
+    ACCESS_TOKEN_HOURS = 23
+
+    ACCESS_CACHE_FILE_NAME = "access.cache.txt"
+    LINK_CACHE_FILE_NAME = "link.cache.txt"
+
+    ACCOUNT_URL = "https://account-api.icann.org"
+    CZDS_URL = "https://czds-api.icann.org"
 
     def __init__(self):
         # Arguments.
         self._icann_user = None
         self._icann_password = None
-        self._tld = None
+        self._account_url = None
+        self._czds_url = None
+        self._tlds = None
+        self._all_approved = None
         self._zone_files_pack_path = None
+        self._part_size = None
         self._core_total = None
+        self._engine = None
+        self._adaptive = None
+        self._core_ceiling = None
+        self._gzip_test = None
+        self._refresh = None
 
         # State.
         self._access_token = None
-        self._link = None
-        self._last_modified_date = None
-        self._content_length = None
-        self._full_path_file = None
-        self._part_tasks = None
-
-    def stop(self, msg):
-        sys.stdout.write(msg)
-        sys.exit(1)
+        self._zones = None
 
     def process_arguments(self):
         argument_parser = argparse.ArgumentParser()
@@ -229,12 +1007,30 @@ class Main():
                             required=True,
                             help="ICANN password. "
                                  "(Mandatory)")
-        argument_parser.add_argument("--tld",
+        argument_parser.add_argument("--account_url",
                                      type=str,
-                                     required=True,
-                                     help="TLD. "
-                                          "Must be available in the ICANN account. "
-                                          "(Mandatory)")
+                                     default=Main.ACCOUNT_URL,
+                                     help="ICANN account API URL, as used for authentication. "
+                                          f"Default: {Main.ACCOUNT_URL}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--czds_url",
+                                     type=str,
+                                     default=Main.CZDS_URL,
+                                     help="ICANN CZDS API URL, as used for links. "
+                                          f"Default: {Main.CZDS_URL}. "
+                                          "(Optional)")
+        tld_group = argument_parser.add_mutually_exclusive_group(required=True)
+        tld_group.add_argument("--tld",
+                               type=str,
+                               nargs="+",
+                               help="TLD, or list of TLDs. "
+                                    "Each must be available in the ICANN account. "
+                                    "(Mandatory, unless --all_approved)")
+        tld_group.add_argument("--all_approved",
+                               default=False,
+                               action="store_true",
+                               help="Every TLD available in the ICANN account. "
+                                    "(Mandatory, unless --tld)")
         argument_parser.add_argument("--zone_files_pack_path",
                                      type=str,
                                      required=True,
@@ -250,110 +1046,215 @@ class Main():
                             type=int,
                             required=True,
                             help="Number of cores. "
+                                 "Shared across every TLD. "
                                  "(Mandatory)")
+        argument_parser.add_argument("--engine",
+                                     type=str,
+                                     choices=TaskPart.ENGINES,
+                                     default=TaskPart.CURL,
+                                     help="Part download engine. "
+                                          "Either curl, as a process per part, "
+                                          "or native, as worker threads retaining keep-alive connections. "
+                                          "Default: curl. "
+                                          "(Optional)")
+        argument_parser.add_argument("--adaptive",
+                                     default=False,
+                                     action="store_true",
+                                     help="Adapt the number of cores, and the size of parts yet to start, to the measured throughput and retries. "
+                                          "Begins from --core_total and --part_size, where --part_size is also the largest part. "
+                                          "(Optional)")
+        argument_parser.add_argument("--core_ceiling",
+                                     type=int,
+                                     default=None,
+                                     help="Largest number of cores, when adaptive. "
+                                          "Must be --core_total or more. "
+                                          "Default: --core_total. "
+                                          "(Optional)")
+        argument_parser.add_argument("--gzip_test",
+                                     default=False,
+                                     action="store_true",
+                                     help="Additionally test each archive via gunzip, once complete. "
+                                          "Each archive is always verified as its parts arrive. "
+                                          "(Optional)")
+        argument_parser.add_argument("--refresh",
+                                     default=False,
+                                     action="store_true",
+                                     help="Disregard the cached access token, links and probes. "
+                                          "(Optional)")
 
         namespace = argument_parser.parse_args()
         self._icann_user = namespace.icann_user 
         self._icann_password = namespace.icann_password 
-        self._tld = namespace.tld 
+        self._account_url = namespace.account_url.rstrip("/")
+        self._czds_url = namespace.czds_url.rstrip("/")
+        self._tlds = namespace.tld
+        self._all_approved = namespace.all_approved
         self._zone_files_pack_path = util.make_item_path_exist(namespace.zone_files_pack_path)
         self._part_size = util.make_int_ge(namespace.part_size, 1)
         self._core_total = util.make_int_ge(namespace.core_total, 1)
+        self._engine = namespace.engine
+        self._adaptive = namespace.adaptive
+        if namespace.core_ceiling is None:
+            self._core_ceiling = self._core_total
+        else:
+            self._core_ceiling = util.make_int_ge(namespace.core_ceiling, self._core_total)
+        self._gzip_test = namespace.gzip_test
+        self._refresh = namespace.refresh
 
     def authentication(self):
-        task_authentication = TaskAuthentication(self._icann_user, self._icann_password)
-        task_manager = distribute.TaskManager(label="Authentication",
-                                              core_total=self._core_total)
-        task_manager.add_task(task_authentication)
-        task_manager.execute()
-        self._access_token = task_authentication.get_access_token()
+        now_datetime = datetime.datetime.now(datetime.timezone.utc)
+        access_cache = util.Record(os.path.join(self._zone_files_pack_path, Main.ACCESS_CACHE_FILE_NAME))
+        access_cache.read()
+        if ((not self._refresh) and
+            access_cache.make_fresh(now_datetime) and
+            (access_cache.get_value("User") == self._icann_user) and
+            (access_cache.get_value("Url") == self._account_url)):
+            self._access_token = access_cache.get_value("Token")
+        if self._access_token is None:
+            task_authentication = TaskAuthentication(self._account_url, self._icann_user, self._icann_password)
+            task_manager = distribute.TaskManager(label="Authentication",
+                                                  core_total=self._core_total)
+            task_manager.add_task(task_authentication)
+            task_manager.execute()
+            self._access_token = task_authentication.get_access_token()
+            expiry_datetime = now_datetime + datetime.timedelta(hours=Main.ACCESS_TOKEN_HOURS)
+            access_cache = util.Record(os.path.join(self._zone_files_pack_path, Main.ACCESS_CACHE_FILE_NAME))
+            access_cache.add_entry("User", self._icann_user)
+            access_cache.add_entry("Url", self._account_url)
+            access_cache.add_entry("Expiry", expiry_datetime.isoformat())
+            access_cache.add_entry("Token", self._access_token)
+            access_cache.write()
+        else:
+            util.info("Authentication: Cached\n")
 
     def link(self):
-        task_link = TaskLink(self._access_token, self._tld)
-        task_manager = distribute.TaskManager(label="Link",
-                                              core_total=self._core_total)
-        task_manager.add_task(task_link)
-        task_manager.execute()
-        self._link = task_link.get_link()
-        sys.stdout.write(f"Link: {self._link}\n")
-        sys.stdout.flush()
+        # The links list only changes as TLD approvals change, so is retained
+        # for as long as the access token used to fetch it.
+        now_datetime = datetime.datetime.now(datetime.timezone.utc)
+        link_cache = util.Record(os.path.join(self._zone_files_pack_path, Main.LINK_CACHE_FILE_NAME))
+        link_cache.read()
+        tld_to_link = None
+        if ((not self._refresh) and
+            link_cache.make_fresh(now_datetime) and
+            (link_cache.get_value("Token") == self._access_token)):
+            tld_to_link = {}
+            for link_tld_link in link_cache.get_values("Link"):
+                (link_tld, link) = link_tld_link.split(" ", 1)
+                tld_to_link[link_tld] = link
+            util.info("Link: Cached\n")
+        if tld_to_link is None:
+            task_link = TaskLink(self._czds_url, self._access_token)
+            task_manager = distribute.TaskManager(label="Link",
+                                                  core_total=self._core_total)
+            task_manager.add_task(task_link)
+            task_manager.execute()
+            tld_to_link = task_link.get_tld_to_link()
+            expiry_datetime = now_datetime + datetime.timedelta(hours=Main.ACCESS_TOKEN_HOURS)
+            link_cache = util.Record(os.path.join(self._zone_files_pack_path, Main.LINK_CACHE_FILE_NAME))
+            link_cache.add_entry("Token", self._access_token)
+            link_cache.add_entry("Expiry", expiry_datetime.isoformat())
+            for link_tld in sorted(tld_to_link.keys()):
+                link_cache.add_entry("Link", f"{link_tld} {tld_to_link[link_tld]}")
+            link_cache.write()
+        if self._all_approved:
+            self._tlds = sorted(tld_to_link.keys())
+        self._zones = []
+        for tld in self._tlds:
+            if tld not in tld_to_link.keys():
+                msg = f"Unexpected no link for: {tld}\n"
+                util.stop(msg)
+            zone = Zone(tld, tld_to_link[tld], self._zone_files_pack_path)
+            self._zones.append(zone)
+            util.info(f"Link: {zone.get_link()}\n")
 
     def probe(self):
-        task_probe = TaskProbe(self._access_token, self._link)
-        task_manager = distribute.TaskManager(label="Probe",
-                                              core_total=self._core_total)
-        task_manager.add_task(task_probe)
-        task_manager.execute()
-        self._last_modified_date = task_probe.get_last_modified_date()
-        self._content_length = task_probe.get_content_length()
-        full_file_name = f"{self._tld}#{self._last_modified_date.isoformat()}#full.txt.gz"
-        self._full_path_file = os.path.join(self._zone_files_pack_path, full_file_name)
-        sys.stdout.write(f"Last modified date: {self._last_modified_date.isoformat()}\n")
-        sys.stdout.write(f"Content length: {self._content_length}\n")
-        sys.stdout.flush()
+        today_date = datetime.datetime.now(datetime.timezone.utc).date()
+        probe_zones = []
+        for zone in self._zones:
+            if not zone.make_fresh(today_date, self._refresh):
+                probe_zones.append(zone)
+        if len(probe_zones) > 0:
+            task_manager = distribute.TaskManager(label="Probe",
+                                                  core_total=self._core_total)
+            for zone in probe_zones:
+                task_probe = TaskProbe(self._access_token, zone.get_link(), zone.get_probe_cache())
+                task_manager.add_task(task_probe)
+            task_manager.execute()
+            for (zone, task_probe) in zip(probe_zones, task_manager.get_tasks()):
+                zone.probe(task_probe)
+
+        # Largest first, so the smallest fill the final cores, and the run
+        # avoids a long tail.
+        zones = []
+        for zone in self._zones:
+            if zone.make_present():
+                util.info(f"Archive: {zone.get_full_path_file()}\n")
+            else:
+                zones.append(zone)
+        self._zones = sorted(zones, key=lambda zone: zone.get_content_length(), reverse=True)
+
+    def allocate(self):
+        for zone in self._zones:
+            zone.allocate()
 
     def acquire(self):
-        task_manager = distribute.TaskManager(label="Parts",
-                                              core_total=self._core_total,
-                                              idle_freq_seconds=5,
-                                              track_freq_seconds=30)
-        part_count = 1
-        head_index = 0
-        while head_index < self._content_length:
-            tail_index = head_index + (self._part_size - 1)
-            if tail_index >= self._content_length:
-                tail_index = self._content_length - 1
-            task_part = TaskPart(self._access_token,
-                                 self._link,
-                                 self._tld,
-                                 self._last_modified_date,
-                                 part_count,
-                                 head_index,
-                                 tail_index,
-                                 self._zone_files_pack_path)
-            task_manager.add_task(task_part)
-            head_index = tail_index + 1
-            part_count = part_count + 1
+        executor = None
+        if self._engine == TaskPart.NATIVE:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._core_ceiling)
+        if self._adaptive:
+            # Parts are carved as cores become available.
+            task_manager = TaskPartManager(self._zones,
+                                           self._part_size,
+                                           self._core_total,
+                                           self._core_ceiling,
+                                           executor)
+            for zone in self._zones:
+                for task_part in zone.plan(self._engine, self._access_token):
+                    task_manager.add_task(task_part)
+        else:
+            task_manager = distribute.TaskManager(label="Parts",
+                                                  core_total=self._core_total,
+                                                  idle_freq_seconds=1,
+                                                  track_freq_seconds=30,
+                                                  executor=executor)
+            for zone in self._zones:
+                for task_part in zone.plan(self._engine, self._access_token):
+                    task_manager.add_task(task_part)
+                task_part = zone.carve(self._part_size)
+                while task_part is not None:
+                    task_manager.add_task(task_part)
+                    task_part = zone.carve(self._part_size)
         task_manager.execute()
-        self._part_tasks = task_manager.get_tasks()
-
-    def assemble(self):
-        full_handle = open(self._full_path_file, "wb")
-        for part_task in self._part_tasks:
-            dat_handle = open(part_task.get_dat_path_file(), "rb")
-            remain = True
-            while remain:
-                block_octets = dat_handle.read(Main.BLOCK_SIZE)
-                if len(block_octets) == 0:
-                    remain = False
-                else:
-                    full_handle.write(block_octets)
-            dat_handle.close()
-        full_handle.close()
+        if executor is not None:
+            executor.shutdown()
 
     def check(self):
-        task_manager = distribute.TaskManager(label="Check",
-                                              core_total=self._core_total)
-        task_check = TaskCheck(self._full_path_file)
-        task_manager.add_task(task_check)
-        task_manager.execute()
+        for zone in self._zones:
+            zone.verify()
+        if self._gzip_test:
+            task_manager = distribute.TaskManager(label="Check",
+                                                  core_total=self._core_total)
+            for zone in self._zones:
+                task_check = TaskCheck(zone.get_dat_path_file())
+                task_manager.add_task(task_check)
+            task_manager.execute()
 
-    def tidy(self):
-        for part_task in self._part_tasks:
-            part_task.tidy()
+    def finish(self):
+        for zone in self._zones:
+            zone.finish()
+            zone.tidy()
+            util.info(f"Archive: {zone.get_full_path_file()}\n")
 
     def start(self):
         self.process_arguments()
         self.authentication()
         self.link()
         self.probe()
-        if not os.path.isfile(self._full_path_file):
+        if len(self._zones) > 0:
+            self.allocate()
             self.acquire()
-            self.assemble()
             self.check()
-            self.tidy()
-        sys.stdout.write(f"Archive: {self._full_path_file}\n")
-        sys.stdout.flush()
+            self.finish()
 
 if __name__ == '__main__':
     main = Main()
@@ -60,7 +60,7 @@ class Main():
         self._inspect_date = util.make_item_date(namespace.inspect_date)
         self._domains_db = database.DomainsDB(self._domains_database_user,
                                               self._domains_database_password)
-        self._rdap = lookup.RDAP("/tmp", self._domains_database_user, self._domains_database_password)
+        self._rdap = lookup.RDAP(self._domains_database_user, self._domains_database_password)
 
 
     def check(self, sld_label, tld_label):
@@ -77,10 +77,8 @@ class Main():
                     free = False
         return free
 
-    def check2(self, sld_label, tld_label):
+    def check2(self, start_none_date, until_none_date):
         free = True
-        result = self._domains_db.inspect_fqdn(sld_label, tld_label)
-        print(result)
         #time.sleep(random.uniform(1, 2))
         #result = self._domains_db.inspect_fqdn(sld_label, tld_label)
         #print(result)
@@ -93,11 +91,9 @@ class Main():
         #time.sleep(random.uniform(1, 2))
 
 
-        if result is not None:
-            (sources, start_none_date, until_none_date) = result
-            if ((start_none_date is not None) and (until_none_date is not None)):
-                if ((start_none_date <= self._inspect_date) and (self._inspect_date <= until_none_date)):
-                    free = False
+        if ((start_none_date is not None) and (until_none_date is not None)):
+            if ((start_none_date <= self._inspect_date) and (self._inspect_date <= until_none_date)):
+                free = False
         return free
 
     def search(self):
@@ -116,11 +112,11 @@ class Main():
 
             if free:
                 print("RDAPPING")
-                self._rdap.request(sld_label, tld_label)
+                (start_none_date, until_none_date) = self._rdap.request(sld_label, tld_label)
                 print("RDAPPING done")
 
                 print("eeeeeeeeeeeeeeeeeeeee")
-                free = self.check2(sld_label, tld_label)
+                free = self.check2(start_none_date, until_none_date)
                 print(free)
 
             # print(sld_label)
@@ -156,7 +152,10 @@ class Main():
 
     def start(self):
         self.process_arguments()
-        self.search()
+        try:
+            self.search()
+        finally:
+            self._rdap.finish()
 
 #-------------------------------------------------------------------------------
 
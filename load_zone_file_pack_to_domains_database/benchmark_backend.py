@@ -0,0 +1,195 @@
+# Setup
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
+# Internal
+import argparse
+import datetime
+import time
+
+# Local
+import database
+import pack
+import util
+
+#-------------------------------------------------------------------------------
+
+class Main():
+
+    # Phase.
+    LOAD = "load"
+    LOOKUP = "lookup"
+
+    PHASES = [LOAD, LOOKUP]
+
+    def __init__(self):
+        # Arguments.
+        self._domains_database_user = None
+        self._domains_database_password = None
+        self._domains_database_path_file = None
+        self._load_zone_file_pack_path = None
+        self._sld_total = None
+        self._tld_prefix = None
+        self._backends = None
+
+        # State.
+        self._backend_to_domains_db = {}
+        self._slds = None
+        self._results = {}
+
+    def process_arguments(self):
+        argument_parser = argparse.ArgumentParser()
+        argument_parser.add_argument("--domains_database_user",
+                                     type=str,
+                                     default=None,
+                                     help=f"Domains Database user, for the {database.MARIADB} backend. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_password",
+                                     type=str,
+                                     default=None,
+                                     help=f"Domains Database password, for the {database.MARIADB} backend. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_path_file",
+                                     type=str,
+                                     default=None,
+                                     help=f"Domains Database path file, for the {database.SQLITE} backend. "
+                                          "Made when absent. "
+                                          "(Optional)")
+        argument_parser.add_argument("--load_zone_file_pack_path",
+                                     type=str,
+                                     required=True,
+                                     help="Load Zone File pack path, as the source of slds. "
+                                          "Must exist. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--sld_total",
+                                     type=int,
+                                     default=100000,
+                                     help="Number of slds, from the first parts. "
+                                          "Default: 100000. "
+                                          "(Optional)")
+        argument_parser.add_argument("--tld_prefix",
+                                     type=str,
+                                     default="benchmark",
+                                     help="TLD prefix, where each backend loads into the TLD <prefix>-backend. "
+                                          "Default: benchmark. "
+                                          "(Optional)")
+        argument_parser.add_argument("--backend",
+                                     type=str,
+                                     nargs="+",
+                                     choices=database.BACKENDS,
+                                     default=database.BACKENDS,
+                                     help="Backend, or list of backends. "
+                                          f"Default: {' '.join(database.BACKENDS)}. "
+                                          "(Optional)")
+
+        namespace = argument_parser.parse_args()
+        self._domains_database_user = namespace.domains_database_user
+        self._domains_database_password = namespace.domains_database_password
+        if namespace.domains_database_path_file is not None:
+            self._domains_database_path_file = util.make_item_path_file_viable(namespace.domains_database_path_file)
+        self._load_zone_file_pack_path = util.make_item_path_exist(namespace.load_zone_file_pack_path)
+        self._sld_total = util.make_int_ge(namespace.sld_total, 1)
+        self._tld_prefix = namespace.tld_prefix
+        self._backends = [backend for backend in database.BACKENDS if backend in namespace.backend]
+        if ((database.MARIADB in self._backends) and
+            ((self._domains_database_user is None) or (self._domains_database_password is None))):
+            msg = f"Backend {database.MARIADB} requires --domains_database_user and --domains_database_password\n"
+            util.stop(msg)
+        for backend in self._backends:
+            self._backend_to_domains_db[backend] = database.make_domains_db(backend,
+                                                                            self._domains_database_user,
+                                                                            self._domains_database_password,
+                                                                            self._domains_database_path_file)
+
+    def read_slds(self):
+        self._slds = []
+        for file_name in sorted(os.listdir(self._load_zone_file_pack_path)):
+            if ((file_name.endswith(tuple(pack.SLD_SUFFIXES))) and (len(self._slds) < self._sld_total)):
+                sld_path_file = os.path.join(self._load_zone_file_pack_path, file_name)
+                for sld in pack.generate_slds(sld_path_file):
+                    if len(self._slds) < self._sld_total:
+                        self._slds.append(sld)
+        if len(self._slds) == 0:
+            msg = f"No slds within: {self._load_zone_file_pack_path}\n"
+            util.stop(msg)
+
+    def load(self, domains_db, tld_label, zone_file_date):
+        # As the loader, by the write batch.
+        domains_db.start_batch()
+        for sld in self._slds:
+            domains_db.update_fqdn(database.DomainsDB.ZONE_FILE,
+                                   sld,
+                                   tld_label,
+                                   zone_file_date,
+                                   zone_file_date)
+        domains_db.finish_batch()
+
+    def lookup(self, domains_db, tld_label, zone_file_date):
+        # As the checker, an fqdn at a time.
+        for sld in self._slds:
+            if domains_db.inspect_fqdn(sld, tld_label) is None:
+                msg = f"Unexpected absent fqdn: {sld}.{tld_label}\n"
+                util.stop(msg)
+
+    def check(self, backend):
+        # inspect_fqdns as inspect_fqdn for each, over the slds as loaded, in
+        # other cases, and absent.
+        domains_db = self._backend_to_domains_db[backend]
+        tld_label = f"{self._tld_prefix}-{backend}"
+        sld_tld_labels = []
+        for sld in self._slds[:database.DomainsDB.SELECT_TOTAL]:
+            sld_tld_labels += [(sld, tld_label),
+                               (sld.upper(), tld_label.upper()),
+                               (sld.swapcase(), tld_label),
+                               (f"{sld}-absent", tld_label)]
+        results = domains_db.inspect_fqdns(sld_tld_labels)
+        if results != [domains_db.inspect_fqdn(*sld_tld_label) for sld_tld_label in sld_tld_labels]:
+            msg = f"Backend: {backend} inspect_fqdns differs from inspect_fqdn\n"
+            util.stop(msg)
+        util.info(f"Backend: {backend} "
+                  f"Check: {len(sld_tld_labels)} fqdns as inspect_fqdn\n")
+
+    def measure(self, backend, phase, zone_file_date):
+        tld_label = f"{self._tld_prefix}-{backend}"
+        phase_to_call = {Main.LOAD: self.load,
+                         Main.LOOKUP: self.lookup}
+        start_seconds = time.perf_counter()
+        phase_to_call[phase](self._backend_to_domains_db[backend], tld_label, zone_file_date)
+        seconds = time.perf_counter() - start_seconds
+        rate = len(self._slds) / seconds
+        util.info(f"Backend: {backend} "
+                  f"Phase: {phase} "
+                  f"Slds: {len(self._slds)} "
+                  f"Seconds: {seconds:.2f} "
+                  f"Rate: {rate:.0f} slds/s\n")
+        self._results[(backend, phase)] = seconds
+
+    def benchmark(self):
+        # The load inserts, unless repeated, then every fqdn is looked up, then
+        # checked.
+        today_date = datetime.date.today()
+        for backend in self._backends:
+            for phase in Main.PHASES:
+                self.measure(backend, phase, today_date)
+            self.check(backend)
+
+    def summary(self):
+        if database.MARIADB in self._backends:
+            for backend in self._backends:
+                if backend != database.MARIADB:
+                    for phase in Main.PHASES:
+                        speedup = self._results[(database.MARIADB, phase)] / self._results[(backend, phase)]
+                        util.info(f"Backend: {backend} "
+                                  f"Phase: {phase} "
+                                  f"Speedup: {speedup:.1f}\n")
+
+    def start(self):
+        self.process_arguments()
+        self.read_slds()
+        self.benchmark()
+        self.summary()
+
+if __name__ == '__main__':
+    main = Main()
+    main.start()
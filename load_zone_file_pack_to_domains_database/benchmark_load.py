@@ -0,0 +1,255 @@
+# Setup
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
+# Internal
+import argparse
+import datetime
+import time
+
+# Local
+import database
+import pack
+import util
+
+#-------------------------------------------------------------------------------
+
+class Main():
+
+    # Method.
+    ROW = "row"
+    UPSERT = "upsert"
+    BATCH = "batch"
+    BATCH_UPSERT = "batch_upsert"
+    BULK = "bulk"
+
+    # Row last, so the slds are then present for row, as a conservative
+    # comparison.
+    METHODS = [BULK, BATCH_UPSERT, BATCH, UPSERT, ROW]
+
+    PASS_TOTAL = 2
+
+    # Scratch MariaDB database, as distinct from the Domains Database.
+    DATABASE_NAME = f"{database.DomainsDB.DATABASE_NAME}_benchmark"
+
+    # Sqlite files, beyond the database path file itself.
+    SQLITE_SUFFIXES = ["-wal", "-shm"]
+
+    def __init__(self):
+        # Arguments.
+        self._domains_database_backend = None
+        self._domains_database_user = None
+        self._domains_database_password = None
+        self._domains_database_name = None
+        self._domains_database_path_file = None
+        self._load_zone_file_pack_path = None
+        self._sld_total = None
+        self._tld_prefix = None
+        self._methods = None
+        self._bulk_sld_total = None
+
+        # State.
+        self._domains_db = None
+        self._upsert_domains_db = None
+        self._slds = None
+        self._results = {}
+
+    def process_arguments(self):
+        # Always into a scratch database, never the Domains Database, as the
+        # rows may not be removed by the Domains Database user.
+        argument_parser = argparse.ArgumentParser()
+        argument_parser.add_argument("--domains_database_backend",
+                                     type=str,
+                                     choices=database.BACKENDS,
+                                     default=database.SQLITE,
+                                     help="Domains Database backend, of the scratch database. "
+                                          f"Default: {database.SQLITE}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_user",
+                                     type=str,
+                                     default=None,
+                                     help=f"Domains Database user, for the {database.MARIADB} backend. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_password",
+                                     type=str,
+                                     default=None,
+                                     help=f"Domains Database password, for the {database.MARIADB} backend. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_name",
+                                     type=str,
+                                     default=Main.DATABASE_NAME,
+                                     help=f"Scratch database name, for the {database.MARIADB} backend, as made beforehand from domains.sql. "
+                                          f"Must not be {database.DomainsDB.DATABASE_NAME}. "
+                                          f"Default: {Main.DATABASE_NAME}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_path_file",
+                                     type=str,
+                                     default=None,
+                                     help=f"Scratch database path file, for the {database.SQLITE} backend, made for the run, then removed. "
+                                          "Must not exist. "
+                                          "(Optional)")
+        argument_parser.add_argument("--load_zone_file_pack_path",
+                                     type=str,
+                                     required=True,
+                                     help="Load Zone File pack path, as the source of slds. "
+                                          "Must exist. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--sld_total",
+                                     type=int,
+                                     default=100000,
+                                     help="Number of slds, from the first parts. "
+                                          "Default: 100000. "
+                                          "(Optional)")
+        argument_parser.add_argument("--tld_prefix",
+                                     type=str,
+                                     default="benchmark",
+                                     help="TLD prefix, where each method loads into its own TLD, as <prefix>-<method>. "
+                                          "Default: benchmark. "
+                                          "(Optional)")
+        argument_parser.add_argument("--method",
+                                     type=str,
+                                     nargs="+",
+                                     choices=Main.METHODS,
+                                     default=Main.METHODS,
+                                     help="Method, or list of methods. "
+                                          f"Default: {' '.join(Main.METHODS)}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--bulk_sld_total",
+                                     type=int,
+                                     default=10000,
+                                     help="Number of slds per bulk update. "
+                                          "Default: 10000. "
+                                          "(Optional)")
+
+        namespace = argument_parser.parse_args()
+        self._domains_database_backend = namespace.domains_database_backend
+        self._domains_database_user = namespace.domains_database_user
+        self._domains_database_password = namespace.domains_database_password
+        self._domains_database_name = namespace.domains_database_name
+        if self._domains_database_backend == database.MARIADB:
+            if ((self._domains_database_user is None) or (self._domains_database_password is None)):
+                msg = f"Backend {database.MARIADB} requires --domains_database_user and --domains_database_password\n"
+                util.stop(msg)
+            if self._domains_database_name == database.DomainsDB.DATABASE_NAME:
+                msg = f"Unexpected database name: {self._domains_database_name} as not a scratch database\n"
+                util.stop(msg)
+        if self._domains_database_backend == database.SQLITE:
+            if namespace.domains_database_path_file is None:
+                msg = f"Backend {database.SQLITE} requires --domains_database_path_file\n"
+                util.stop(msg)
+            self._domains_database_path_file = util.make_item_path_file_absent(namespace.domains_database_path_file)
+        self._load_zone_file_pack_path = util.make_item_path_exist(namespace.load_zone_file_pack_path)
+        self._sld_total = util.make_int_ge(namespace.sld_total, 1)
+        self._tld_prefix = namespace.tld_prefix
+        self._methods = [method for method in Main.METHODS if method in namespace.method]
+        self._bulk_sld_total = util.make_int_ge(namespace.bulk_sld_total, 1)
+        self._domains_db = database.make_domains_db(self._domains_database_backend,
+                                                    self._domains_database_user,
+                                                    self._domains_database_password,
+                                                    self._domains_database_path_file,
+                                                    database_name=self._domains_database_name)
+        self._upsert_domains_db = database.make_domains_db(self._domains_database_backend,
+                                                           self._domains_database_user,
+                                                           self._domains_database_password,
+                                                           self._domains_database_path_file,
+                                                           upsert=True,
+                                                           database_name=self._domains_database_name)
+
+    def read_slds(self):
+        self._slds = []
+        for file_name in sorted(os.listdir(self._load_zone_file_pack_path)):
+            if ((file_name.endswith(tuple(pack.SLD_SUFFIXES))) and (len(self._slds) < self._sld_total)):
+                sld_path_file = os.path.join(self._load_zone_file_pack_path, file_name)
+                for sld in pack.generate_slds(sld_path_file):
+                    if len(self._slds) < self._sld_total:
+                        self._slds.append(sld)
+        if len(self._slds) == 0:
+            msg = f"No slds within: {self._load_zone_file_pack_path}\n"
+            util.stop(msg)
+
+    def load_domains_db_row(self, domains_db, tld_label, zone_file_date):
+        for sld in self._slds:
+            domains_db.update_fqdn(database.DomainsDB.ZONE_FILE,
+                                   sld,
+                                   tld_label,
+                                   zone_file_date,
+                                   zone_file_date)
+
+    def load_domains_db_batch(self, domains_db, tld_label, zone_file_date):
+        domains_db.start_batch()
+        self.load_domains_db_row(domains_db, tld_label, zone_file_date)
+        domains_db.finish_batch()
+
+    def load_row(self, tld_label, zone_file_date):
+        self.load_domains_db_row(self._domains_db, tld_label, zone_file_date)
+
+    def load_upsert(self, tld_label, zone_file_date):
+        self.load_domains_db_row(self._upsert_domains_db, tld_label, zone_file_date)
+
+    def load_batch(self, tld_label, zone_file_date):
+        self.load_domains_db_batch(self._domains_db, tld_label, zone_file_date)
+
+    def load_batch_upsert(self, tld_label, zone_file_date):
+        self.load_domains_db_batch(self._upsert_domains_db, tld_label, zone_file_date)
+
+    def load_bulk(self, tld_label, zone_file_date):
+        for index in range(0, len(self._slds), self._bulk_sld_total):
+            self._domains_db.bulk_update_fqdns(database.DomainsDB.ZONE_FILE,
+                                               self._slds[index:index + self._bulk_sld_total],
+                                               tld_label,
+                                               zone_file_date,
+                                               zone_file_date)
+
+    def measure(self, method, pass_count, zone_file_date):
+        tld_label = f"{self._tld_prefix}-{method}"
+        method_to_load = {Main.ROW: self.load_row,
+                          Main.UPSERT: self.load_upsert,
+                          Main.BATCH: self.load_batch,
+                          Main.BATCH_UPSERT: self.load_batch_upsert,
+                          Main.BULK: self.load_bulk}
+        start_seconds = time.perf_counter()
+        method_to_load[method](tld_label, zone_file_date)
+        seconds = time.perf_counter() - start_seconds
+        rate = len(self._slds) / seconds
+        util.info(f"Method: {method} "
+                  f"Pass: {pass_count} "
+                  f"Slds: {len(self._slds)} "
+                  f"Seconds: {seconds:.2f} "
+                  f"Rate: {rate:.0f} slds/s\n")
+        self._results[(method, pass_count)] = seconds
+
+    def benchmark(self):
+        # The first pass inserts, unless repeated, and the second pass, a day
+        # on, updates every fqdn.
+        today_date = datetime.date.today()
+        for method in self._methods:
+            for pass_count in range(1, Main.PASS_TOTAL + 1):
+                self.measure(method, pass_count, today_date + datetime.timedelta(days=pass_count - 1))
+
+    def summary(self):
+        if Main.ROW in self._methods:
+            for method in self._methods:
+                if method != Main.ROW:
+                    for pass_count in range(1, Main.PASS_TOTAL + 1):
+                        speedup = self._results[(Main.ROW, pass_count)] / self._results[(method, pass_count)]
+                        util.info(f"Method: {method} "
+                                  f"Pass: {pass_count} "
+                                  f"Speedup: {speedup:.1f}\n")
+
+    def tidy(self):
+        if self._domains_database_path_file is not None:
+            for suffix in [""] + Main.SQLITE_SUFFIXES:
+                if os.path.isfile(self._domains_database_path_file + suffix):
+                    os.remove(self._domains_database_path_file + suffix)
+
+    def start(self):
+        self.process_arguments()
+        self.read_slds()
+        self.benchmark()
+        self.summary()
+        self.tidy()
+
+if __name__ == '__main__':
+    main = Main()
+    main.start()
@@ -5,10 +5,17 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__f
 
 # Internal
 import argparse
+import concurrent.futures
+import time
 
 # Local
+import database
+import dictionary
 import distribute
+import pack
+import sort
 import util
+import load_zone_file_pack_to_domains_database_sld
 
 #-------------------------------------------------------------------------------
 
@@ -17,22 +24,57 @@ class TaskSld(distribute.Task):
     def __init__(self, 
                  domains_database_user,
                  domains_database_password,
+                 domains_database_backend,
+                 domains_database_path_file,
                  zone_file_tld,
                  zone_file_date,
                  load_zone_file_pack_path,
-                 sld_file_name):
+                 sld_file_name,
+                 bulk,
+                 sort,
+                 sld_id_cache_total,
+                 sld_dictionary_path_file,
+                 upsert,
+                 partition_number,
+                 octet_total):
         self._domains_database_user = domains_database_user
         self._domains_database_password = domains_database_password
+        self._domains_database_backend = domains_database_backend
+        self._domains_database_path_file = domains_database_path_file
         self._zone_file_tld = zone_file_tld 
         self._zone_file_date = zone_file_date
+        self._bulk = bulk
+        self._sort = sort
+        self._sld_id_cache_total = sld_id_cache_total
+        self._sld_dictionary_path_file = sld_dictionary_path_file
+        self._upsert = upsert
         self._sld_path_file = os.path.join(load_zone_file_pack_path, sld_file_name)
-        log_path_file = os.path.join(load_zone_file_pack_path, sld_file_name.replace(".sld.txt", ".log.txt"))
-        did_path_file = os.path.join(load_zone_file_pack_path, sld_file_name.replace(".sld.txt", ".did.txt"))
+        self._partition_number = partition_number
+        self._octet_total = octet_total
+        # Measures, for partition throughput.
+        self._launch_seconds = None
+        self._finish_seconds = None
+        sld_prefix = pack.make_sld_prefix(sld_file_name)
+        log_path_file = os.path.join(load_zone_file_pack_path, f"{sld_prefix}.log.txt")
+        did_path_file = os.path.join(load_zone_file_pack_path, f"{sld_prefix}.did.txt")
         distribute.Task.__init__(self,
                                  log_path_file=log_path_file,
                                  did_path_file=did_path_file) 
 
+    def get_partition_number(self):
+        return self._partition_number
+
+    def get_octet_total(self):
+        return self._octet_total
+
+    def get_launch_seconds(self):
+        return self._launch_seconds
+
+    def get_finish_seconds(self):
+        return self._finish_seconds
+
     def make_command(self):
+        self._launch_seconds = time.monotonic()
         script_path_file = os.path.abspath(__file__)
         script_path = os.path.dirname(script_path_file)
         sld_py_path_file = os.path.join(script_path, "load_zone_file_pack_to_domains_database_sld.py")
@@ -40,26 +82,97 @@ class TaskSld(distribute.Task):
                    sld_py_path_file,
                    "--domains_database_user", self._domains_database_user,
                    "--domains_database_password", self._domains_database_password, 
+                   "--domains_database_backend", self._domains_database_backend,
                    "--zone_file_tld", self._zone_file_tld,
                    "--zone_file_date", self._zone_file_date.isoformat(),
-                   "--sld_path_file", self._sld_path_file]
+                   "--sld_path_file", self._sld_path_file,
+                   "--sld_id_cache_total", str(self._sld_id_cache_total)]
+        if self._domains_database_path_file is not None:
+            command = command + ["--domains_database_path_file", self._domains_database_path_file]
+        if self._bulk:
+            command = command + ["--bulk"]
+        if self._sort:
+            command = command + ["--sort"]
+        if self._sld_dictionary_path_file is not None:
+            command = command + ["--sld_dictionary_path_file", self._sld_dictionary_path_file]
+        if self._upsert:
+            command = command + ["--upsert"]
         return command
 
+    def make_call(self):
+        # As the command, without the interpreter and script.
+        return (distribute.call_main,
+                load_zone_file_pack_to_domains_database_sld.start_pool,
+                self.get_popen_command()[2:])
+
+    def make_result(self):
+        self._finish_seconds = time.monotonic()
+        return distribute.Task.make_result(self)
+
+#-------------------------------------------------------------------------------
+
+class TaskPartitionManager(distribute.TaskManager):
+
+    def __init__(self, core_total, executor):
+        distribute.TaskManager.__init__(self,
+                                        label="Slds",
+                                        core_total=core_total,
+                                        idle_freq_seconds=1,
+                                        track_freq_seconds=30,
+                                        executor=executor)
+
+    def launch_task(self):
+        # The first waiting task of a partition without a busy task, so each
+        # core owns a disjoint range of slds. Else none, so the cores wait
+        # for a partition to free, rather than contend for the same range.
+        busy_partition_numbers = set()
+        for task in self.get_tasks():
+            if task.get_level() == distribute.Task.BUSY:
+                busy_partition_numbers.add(task.get_partition_number())
+        free_wait_task = None
+        for task in self.get_tasks():
+            if ((free_wait_task is None) and
+                (task.get_level() == distribute.Task.WAIT) and
+                (task.get_partition_number() not in busy_partition_numbers)):
+                free_wait_task = task
+        if free_wait_task is not None:
+            free_wait_task.launch(self._executor)
+
 #-------------------------------------------------------------------------------
 
 class Main():
 
+    SLD_DICTIONARY_FILE_NAME = "sld.dictionary.bin"
+    SLD_DICTIONARY_MEMORY_SIZE = 1024 * 1024 * 256
+    SLD_DICTIONARY_SLD_TOTAL = 10000
+    SLD_DICTIONARY_SAMPLE_TOTAL = 1000
+
     def __init__(self):
         # Arguments.
         self._load_zone_file_pack_path = None
         self._core_total = None
+        self._bulk = None
+        self._sld_id_cache_total = None
+        self._dictionary = None
+        self._partition_total = None
+        self._pool = None
+        self._upsert = None
+        self._reload = None
 
         # State.
         self._config = None
         self._domains_database_user = None
         self._domains_database_password = None
+        self._domains_database_backend = None
+        self._domains_database_path_file = None
         self._zone_file_tld = None
         self._zone_file_date = None
+        self._delta_zone_file_date = None
+        self._sort = None
+        self._sld_dictionary_path_file = None
+        self._sld_file_name_to_octet_total = None
+        self._sld_file_name_to_partition_number = None
+        self._load = None
 
     def process_arguments(self):
         argument_parser = argparse.ArgumentParser()
@@ -75,41 +188,323 @@ class Main():
                             help="Number of cores. "
                                  "Must be 1 or more. "
                                  "(Mandatory)")
+        argument_parser.add_argument("--bulk",
+                                     default=False,
+                                     action="store_true",
+                                     help="Update the Domains Database in bulk, a batch of slds at a time, "
+                                          "rather than an sld at a time. "
+                                          "(Optional)")
+        argument_parser.add_argument("--sld_id_cache_total",
+                                     type=int,
+                                     default=database.DomainsDB.SLD_ID_CACHE_TOTAL,
+                                     help="Number of sld ids cached by each core, as least recently used. "
+                                          "Each part warms the cache with a single range select over its slds. "
+                                          f"Default: {database.DomainsDB.SLD_ID_CACHE_TOTAL}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--dictionary",
+                                     default=False,
+                                     action="store_true",
+                                     help="Make the sld ids of every sld of the pack in a single pass, before the cores start, "
+                                          f"held within the pack as {Main.SLD_DICTIONARY_FILE_NAME}, "
+                                          "so each core finds sld ids without the database. "
+                                          "(Optional)")
+        argument_parser.add_argument("--partition_total",
+                                     type=int,
+                                     default=1,
+                                     help="Number of partitions, as contiguous ranges of slds, over consecutive parts of about equal octets, "
+                                          "where a core is launched only for a partition without a busy core, else the cores wait. "
+                                          "Above 1, the pack must be made with --sort, so the ranges are disjoint. "
+                                          "Default: 1. "
+                                          "(Optional)")
+        argument_parser.add_argument("--pool",
+                                     default=False,
+                                     action="store_true",
+                                     help="Load parts within a pool of long lived processes, one per core, "
+                                          "each retaining its Domains Database connection and sld id cache across parts, "
+                                          "rather than a process per part. "
+                                          "(Optional)")
+        argument_parser.add_argument("--upsert",
+                                     default=False,
+                                     action="store_true",
+                                     help="Without --bulk, merge each fqdn by a single INSERT ... ON DUPLICATE KEY UPDATE, "
+                                          "rather than a select, then an insert or update. "
+                                          "(Optional)")
+        argument_parser.add_argument("--reload",
+                                     default=False,
+                                     action="store_true",
+                                     help="Load the capture even when already recorded as loaded within the Domains Database, "
+                                          "rather than skip it. "
+                                          "(Optional)")
 
         namespace = argument_parser.parse_args()
         self._load_zone_file_pack_path = util.make_item_path_exist(namespace.load_zone_file_pack_path)
         self._core_total = util.make_int_ge(namespace.core_total, 1)
+        self._bulk = namespace.bulk
+        self._sld_id_cache_total = util.make_int_ge(namespace.sld_id_cache_total, 0)
+        self._dictionary = namespace.dictionary
+        self._partition_total = util.make_int_ge(namespace.partition_total, 1)
+        self._pool = namespace.pool
+        self._upsert = namespace.upsert
+        self._reload = namespace.reload
 
     def process_config(self):
         self._config = util.Config(self._load_zone_file_pack_path)
         self._config.read()
         self._domains_database_user = self._config.get_value("domains_database_user")
         self._domains_database_password = self._config.get_value("domains_database_password")
+        # Optional, as packs made before the sqlite backend are of MariaDB.
+        self._domains_database_backend = self._config.find_none_value("domains_database_backend")
+        if self._domains_database_backend is None:
+            self._domains_database_backend = database.MARIADB
+        self._domains_database_path_file = self._config.find_none_value("domains_database_path_file")
         self._zone_file_tld = self._config.get_value("zone_file_tld")
         self._zone_file_date = self._config.get_value("zone_file_date")
+        self._delta_zone_file_date = self._config.find_none_value("delta_zone_file_date")
+        # Optional, as packs made before the flag are taken as unsorted.
+        self._sort = self._config.find_none_value("sort")
+        if self._sort is None:
+            self._sort = False
+
+    def make_domains_db(self):
+        # For the steps of the main process, without an sld id cache.
+        return database.make_domains_db(self._domains_database_backend,
+                                        self._domains_database_user,
+                                        self._domains_database_password,
+                                        self._domains_database_path_file,
+                                        sld_id_cache_total=0)
+
+    def process_capture(self):
+        # Each capture loaded is recorded within the zone_file table. A
+        # recorded capture is skipped. A capture within the range of those
+        # recorded changes only the rows of slds absent from an earlier
+        # capture, or from a later one, so is loaded by the write batch,
+        # which reads before it writes, and so writes only those.
+        domains_db = self.make_domains_db()
+        captures = domains_db.find_captures(self._zone_file_tld)
+        self._load = True
+        if self._zone_file_date in captures:
+            if self._reload:
+                util.info(f"Capture: Reload: {self._zone_file_tld} {self._zone_file_date.isoformat()}\n")
+            else:
+                util.info(f"Capture: Already loaded, so skipped: {self._zone_file_tld} {self._zone_file_date.isoformat()}\n")
+                self._load = False
+        elif ((len(captures) > 0) and (captures[0] < self._zone_file_date) and (self._zone_file_date < captures[-1])):
+            util.info(f"Capture: Within loaded range: {captures[0].isoformat()} to {captures[-1].isoformat()}, "
+                      f"so only boundary changing rows are written\n")
+            self._upsert = False
+        if ((self._load) and (self._delta_zone_file_date is not None)):
+            if ((len(captures) == 0) or (captures[-1] != self._delta_zone_file_date)):
+                msg = f"Delta requires the capture of {self._delta_zone_file_date.isoformat()} as the latest loaded, so load in full\n"
+                util.stop(msg)
+
+    def generate_path_slds(self, sld_path):
+        for file_name in sorted(os.listdir(sld_path)):
+            if file_name.endswith(tuple(pack.SLD_SUFFIXES)):
+                yield from pack.generate_slds(os.path.join(sld_path, file_name))
+
+    def count_path_slds(self, sld_path):
+        sld_total = 0
+        for file_name in os.listdir(sld_path):
+            if file_name.endswith(tuple(pack.SLD_SUFFIXES)):
+                sld_total = sld_total + pack.read_sld_header(os.path.join(sld_path, file_name))[0]
+        return sld_total
+
+    def process_delta(self):
+        # Of a delta load zone file pack, only the unchanged slds, as present
+        # in both captures, are extended until the capture, a staged batch at
+        # a time, the removed slds left until the earlier capture, and only
+        # the added slds, as the parts of the pack, are then loaded.
+        unchanged_path = os.path.join(self._load_zone_file_pack_path, pack.DELTA_UNCHANGED_PATH)
+        unchanged_sld_total = self.count_path_slds(unchanged_path)
+        removed_sld_total = self.count_path_slds(os.path.join(self._load_zone_file_pack_path, pack.DELTA_REMOVED_PATH))
+        domains_db = self.make_domains_db()
+        extend_total = domains_db.extend_fqdns(database.DomainsDB.ZONE_FILE,
+                                               self._zone_file_tld,
+                                               self._delta_zone_file_date,
+                                               self._zone_file_date,
+                                               self.generate_path_slds(unchanged_path))
+        util.info(f"Delta: "
+                  f"Extended: {extend_total} "
+                  f"Unchanged: {unchanged_sld_total} "
+                  f"Removed: {removed_sld_total}\n")
+
+    def record_capture(self):
+        domains_db = self.make_domains_db()
+        domains_db.add_capture(self._zone_file_tld, self._zone_file_date)
+        util.info(f"Capture: Recorded: {self._zone_file_tld} {self._zone_file_date.isoformat()}\n")
+        # Only for an interrupted load to resume, so never reused beyond.
+        if ((self._sld_dictionary_path_file is not None) and (os.path.isfile(self._sld_dictionary_path_file))):
+            os.remove(self._sld_dictionary_path_file)
+
+    def make_sld_file_names(self):
+        sld_file_names = []
+        for file_name in sorted(os.listdir(self._load_zone_file_pack_path)):
+            if file_name.endswith(tuple(pack.SLD_SUFFIXES)):
+                sld_file_names.append(file_name)
+        return sld_file_names
+
+    def write_sld_dictionary(self, domains_db, sld_dictionary_writer, sld_labels):
+        sld_label_to_sld_id = domains_db.make_sld_ids(sld_labels)
+        for sld_label in sld_labels:
+            sld_dictionary_writer.write(sld_label, sld_label_to_sld_id[sld_label])
+
+    def check_sld_dictionary(self):
+        # A dictionary retained by an interrupted load is of the database as
+        # it was then, so a sample of its sld ids must still be those of the
+        # database, else it is of another, or a remade, database.
+        sld_dictionary = dictionary.SldDictionary(self._sld_dictionary_path_file)
+        sample = sld_dictionary.make_sample(Main.SLD_DICTIONARY_SAMPLE_TOTAL)
+        sld_dictionary.close()
+        domains_db = self.make_domains_db()
+        sld_label_to_sld_id = domains_db.find_sld_ids([sld_label for (sld_label, _) in sample])
+        return sld_label_to_sld_id == dict(sample)
+
+    def process_sld_dictionary(self):
+        # Once per pack, where the slds of every part are sorted, each once,
+        # then those absent from the database inserted in sorted order, a
+        # batch at a time. Thereafter the cores only read sld ids.
+        self._sld_dictionary_path_file = os.path.join(self._load_zone_file_pack_path, Main.SLD_DICTIONARY_FILE_NAME)
+        if os.path.isfile(self._sld_dictionary_path_file):
+            if self.check_sld_dictionary():
+                util.info(f"Dictionary: Reuse: {self._sld_dictionary_path_file}\n")
+            else:
+                util.info(f"Dictionary: Not of this database, so remade: {self._sld_dictionary_path_file}\n")
+                os.remove(self._sld_dictionary_path_file)
+        if not os.path.isfile(self._sld_dictionary_path_file):
+            sorter = sort.Sorter(self._load_zone_file_pack_path, Main.SLD_DICTIONARY_MEMORY_SIZE)
+            for sld_file_name in self.make_sld_file_names():
+                for sld in pack.generate_slds(os.path.join(self._load_zone_file_pack_path, sld_file_name)):
+                    sorter.add(sld.encode())
+
+            domains_db = self.make_domains_db()
+            sld_dictionary_writer = dictionary.SldDictionaryWriter(self._sld_dictionary_path_file)
+            sld_labels = []
+            sld_total = 0
+            for sld in sorter.generate():
+                sld_labels.append(sld.decode())
+                if len(sld_labels) == Main.SLD_DICTIONARY_SLD_TOTAL:
+                    self.write_sld_dictionary(domains_db, sld_dictionary_writer, sld_labels)
+                    sld_total = sld_total + len(sld_labels)
+                    sld_labels = []
+            if len(sld_labels) > 0:
+                self.write_sld_dictionary(domains_db, sld_dictionary_writer, sld_labels)
+                sld_total = sld_total + len(sld_labels)
+            sld_dictionary_writer.close()
+            sorter.tidy()
+            util.info(f"Dictionary: Slds: {sld_total}\n")
+
+    def process_partitions(self):
+        # Consecutive parts, by the running total of octets, so each
+        # partition holds about equal slds. Parts of a sorted pack are each
+        # sorted and follow one another, so each partition is a disjoint
+        # range, as checked from the first and last sld of each part alone.
+        sld_file_names = self.make_sld_file_names()
+        self._sld_file_name_to_octet_total = {}
+        pack_octet_total = 0
+        last_sld = None
+        for sld_file_name in sld_file_names:
+            sld_path_file = os.path.join(self._load_zone_file_pack_path, sld_file_name)
+            (first_sld, part_last_sld) = pack.read_sld_bounds(sld_path_file)
+            if part_last_sld != "":
+                if ((last_sld is not None) and (first_sld <= last_sld)):
+                    msg = f"Unexpected unsorted part, as partitions require a pack made with --sort: {sld_file_name}\n"
+                    util.stop(msg)
+                last_sld = part_last_sld
+            octet_total = os.path.getsize(sld_path_file)
+            self._sld_file_name_to_octet_total[sld_file_name] = octet_total
+            pack_octet_total = pack_octet_total + octet_total
+        self._sld_file_name_to_partition_number = {}
+        octet_count = 0
+        for sld_file_name in sld_file_names:
+            partition_number = 0
+            if pack_octet_total > 0:
+                partition_number = min(self._partition_total - 1, (octet_count * self._partition_total) // pack_octet_total)
+            self._sld_file_name_to_partition_number[sld_file_name] = partition_number
+            octet_count = octet_count + self._sld_file_name_to_octet_total[sld_file_name]
+
+    def report_partitions(self, task_manager):
+        # Per partition, over the parts loaded by this run, from the first
+        # launch to the last finish.
+        partition_number_to_tasks = {}
+        for task in task_manager.get_tasks():
+            if task.get_launch_seconds() is not None:
+                partition_number = task.get_partition_number()
+                if partition_number not in partition_number_to_tasks:
+                    partition_number_to_tasks[partition_number] = []
+                partition_number_to_tasks[partition_number].append(task)
+        for partition_number in sorted(partition_number_to_tasks):
+            tasks = partition_number_to_tasks[partition_number]
+            octet_total = sum([task.get_octet_total() for task in tasks])
+            launch_seconds = min([task.get_launch_seconds() for task in tasks])
+            finish_seconds = max([task.get_finish_seconds() for task in tasks])
+            seconds = finish_seconds - launch_seconds
+            if seconds > 0:
+                rate_present = f"{octet_total / seconds / 1000000:.2f} MB/s"
+            else:
+                rate_present = "Immediate"
+            util.info(f"Partition: {partition_number + 1:06} "
+                      f"Parts: {len(tasks)} "
+                      f"Octets: {octet_total} "
+                      f"Seconds: {seconds:.2f} "
+                      f"Rate: {rate_present}\n")
 
     def process_slds(self):
-        task_manager = distribute.TaskManager(label="Slds",
-                                              core_total=self._core_total,
-                                              idle_freq_seconds=5,
-                                              track_freq_seconds=30)
-        file_names = os.listdir(self._load_zone_file_pack_path)
-        for file_name in sorted(file_names):
-            if file_name.endswith(".sld.txt"):
-                sld_path_file = os.path.join(self._load_zone_file_pack_path, file_name)
-                task_sld = TaskSld(self._domains_database_user,
-                                   self._domains_database_password,
-                                   self._zone_file_tld,
-                                   self._zone_file_date,
-                                   self._load_zone_file_pack_path,
-                                   file_name)
-                task_manager.add_task(task_sld)
+        executor = None
+        if self._pool:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=self._core_total)
+        if self._partition_total > 1:
+            task_manager = TaskPartitionManager(self._core_total, executor)
+        else:
+            task_manager = distribute.TaskManager(label="Slds",
+                                                  core_total=self._core_total,
+                                                  idle_freq_seconds=5,
+                                                  track_freq_seconds=30,
+                                                  executor=executor)
+        for file_name in self.make_sld_file_names():
+            partition_number = 0
+            octet_total = None
+            if self._partition_total > 1:
+                partition_number = self._sld_file_name_to_partition_number[file_name]
+                octet_total = self._sld_file_name_to_octet_total[file_name]
+            task_sld = TaskSld(self._domains_database_user,
+                               self._domains_database_password,
+                               self._domains_database_backend,
+                               self._domains_database_path_file,
+                               self._zone_file_tld,
+                               self._zone_file_date,
+                               self._load_zone_file_pack_path,
+                               file_name,
+                               self._bulk,
+                               self._sort,
+                               self._sld_id_cache_total,
+                               self._sld_dictionary_path_file,
+                               self._upsert,
+                               partition_number,
+                               octet_total)
+            task_manager.add_task(task_sld)
         task_manager.execute()
+        if executor is not None:
+            executor.shutdown()
+        if self._partition_total > 1:
+            self.report_partitions(task_manager)
 
     def start(self):
         self.process_arguments()
         self.process_config()
-        self.process_slds()
+        self.process_capture()
+        if self._load:
+            if self._delta_zone_file_date is not None:
+                self.process_delta()
+            # A delta of a quiet day may add no slds, so hold no parts.
+            if len(self.make_sld_file_names()) > 0:
+                if self._partition_total > 1:
+                    self.process_partitions()
+                if self._dictionary:
+                    self.process_sld_dictionary()
+                self.process_slds()
+            else:
+                util.info("Slds: No parts, so none loaded\n")
+            self.record_capture()
 
 #-------------------------------------------------------------------------------
 
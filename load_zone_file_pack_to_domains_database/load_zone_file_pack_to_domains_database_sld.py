@@ -9,23 +9,38 @@ import argparse
 # Local
 import util
 import database
+import dictionary
+import pack
 
 #-------------------------------------------------------------------------------
 
 class Main():
 
-    def __init__(self):
+    BULK_SLD_TOTAL = 10000
+
+    def __init__(self, pool=False):
+        # Within a pool process, the Domains Database is retained across
+        # parts.
+        self._pool = pool
+
         # Arguments.
         self._domains_database_user = None
         self._domains_database_password = None
+        self._domains_database_backend = None
+        self._domains_database_path_file = None
         self._zone_file_tld = None
         self._zone_file_date = None
         self._sld_path_file = None
+        self._bulk = None
+        self._sort = None
+        self._sld_id_cache_total = None
+        self._sld_dictionary_path_file = None
+        self._upsert = None
 
         # State.
         self._domains_db = None
 
-    def process_arguments(self):
+    def process_arguments(self, arguments):
         argument_parser = argparse.ArgumentParser()
         argument_parser.add_argument("--domains_database_user",
                                      type=str,
@@ -37,6 +52,18 @@ class Main():
                                      required=True,
                                      help="Domains Database password. "
                                           "(Mandatory)")
+        argument_parser.add_argument("--domains_database_backend",
+                                     type=str,
+                                     choices=database.BACKENDS,
+                                     default=database.MARIADB,
+                                     help="Domains Database backend. "
+                                          f"Default: {database.MARIADB}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_path_file",
+                                     type=str,
+                                     default=None,
+                                     help=f"Domains Database path file, for the {database.SQLITE} backend. "
+                                          "(Optional)")
         argument_parser.add_argument("--zone_file_tld",
                                      type=str,
                                      required=True,
@@ -52,22 +79,103 @@ class Main():
                                      type=str,
                                      required=True,
                                      help="SLD path file. "
+                                          "File name format: NNNNNN.sld.txt or NNNNNN.sld.bin "
                                           "Must exist. "
                                           "(Mandatory)")
+        argument_parser.add_argument("--bulk",
+                                     default=False,
+                                     action="store_true",
+                                     help="Update the Domains Database in bulk, a batch of slds at a time, "
+                                          "rather than an sld at a time. "
+                                          "(Optional)")
+        argument_parser.add_argument("--sort",
+                                     default=False,
+                                     action="store_true",
+                                     help="The part is sorted, as made with --sort, "
+                                          "so the sld id cache is warmed by a single range select over its slds. "
+                                          "(Optional)")
+        argument_parser.add_argument("--sld_id_cache_total",
+                                     type=int,
+                                     default=database.DomainsDB.SLD_ID_CACHE_TOTAL,
+                                     help="Number of sld ids cached, as least recently used. "
+                                          f"Default: {database.DomainsDB.SLD_ID_CACHE_TOTAL}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--sld_dictionary_path_file",
+                                     type=str,
+                                     default=None,
+                                     help="SLD dictionary path file, of the sld ids of every sld of the pack. "
+                                          "Must exist, when given. "
+                                          "(Optional)")
+        argument_parser.add_argument("--upsert",
+                                     default=False,
+                                     action="store_true",
+                                     help="Merge each fqdn by a single INSERT ... ON DUPLICATE KEY UPDATE, "
+                                          "rather than a select, then an insert or update. "
+                                          "(Optional)")
 
-        namespace = argument_parser.parse_args()
+        namespace = argument_parser.parse_args(arguments)
         self._domains_database_user = namespace.domains_database_user
         self._domains_database_password = namespace.domains_database_password
+        self._domains_database_backend = namespace.domains_database_backend
+        self._domains_database_path_file = namespace.domains_database_path_file
         self._zone_file_tld = namespace.zone_file_tld
         self._zone_file_date = util.make_item_date(namespace.zone_file_date)
         self._sld_path_file = util.make_item_path_file_exist(namespace.sld_path_file)
-        self._domains_db = database.DomainsDB(self._domains_database_user,
-                                              self._domains_database_password)
+        self._bulk = namespace.bulk
+        self._sort = namespace.sort
+        self._sld_id_cache_total = util.make_int_ge(namespace.sld_id_cache_total, 0)
+        if namespace.sld_dictionary_path_file is not None:
+            self._sld_dictionary_path_file = util.make_item_path_file_exist(namespace.sld_dictionary_path_file)
+        self._upsert = namespace.upsert
+        if self._pool:
+            self._domains_db = database.PoolDomainsDB.get(self._domains_database_backend,
+                                                          self._domains_database_user,
+                                                          self._domains_database_password,
+                                                          self._domains_database_path_file,
+                                                          sld_id_cache_total=self._sld_id_cache_total,
+                                                          upsert=self._upsert)
+        else:
+            self._domains_db = database.make_domains_db(self._domains_database_backend,
+                                                        self._domains_database_user,
+                                                        self._domains_database_password,
+                                                        self._domains_database_path_file,
+                                                        sld_id_cache_total=self._sld_id_cache_total,
+                                                        upsert=self._upsert)
+        self.process_sld_dictionary()
+
+    def process_sld_dictionary(self):
+        # Opened once per process, as a pooled Domains Database may hold the
+        # dictionary of an earlier part.
+        sld_dictionary = self._domains_db.get_sld_dictionary()
+        if sld_dictionary is None:
+            sld_dictionary_path_file = None
+        else:
+            sld_dictionary_path_file = sld_dictionary.get_sld_dictionary_path_file()
+        if sld_dictionary_path_file != self._sld_dictionary_path_file:
+            if sld_dictionary is not None:
+                sld_dictionary.close()
+            if self._sld_dictionary_path_file is None:
+                self._domains_db.set_sld_dictionary(None)
+            else:
+                self._domains_db.set_sld_dictionary(dictionary.SldDictionary(self._sld_dictionary_path_file))
+
+    def warm_slds(self):
+        # Only of a sorted part, as the first and last sld of an unsorted
+        # part bound an arbitrary range.
+        (sld_total, first_sld, last_sld) = pack.read_sld_header(self._sld_path_file)
+        if sld_total > 0:
+            self._domains_db.warm_sld_ids(first_sld, last_sld)
 
     def process_slds(self):
-        handle = open(self._sld_path_file, "r")
-        for line in handle:
-            sld = line.strip()
+        # Either part format, as a write batch. A dictionary holds every
+        # sld already.
+        sld_id_cache = self._domains_db.get_sld_id_cache()
+        hit_total = sld_id_cache.get_hit_total()
+        miss_total = sld_id_cache.get_miss_total()
+        if ((self._sld_dictionary_path_file is None) and (self._sort)):
+            self.warm_slds()
+        self._domains_db.start_batch()
+        for sld in pack.generate_slds(self._sld_path_file):
             req_source = database.DomainsDB.ZONE_FILE
             req_sld_label = sld 
             req_tld_label = self._zone_file_tld 
@@ -78,11 +186,48 @@ class Main():
                                          req_tld_label,
                                          req_start_none_date,
                                          req_until_none_date)
-        handle.close()
+        self._domains_db.finish_batch()
+        util.info(f"Sld id cache: "
+                  f"Hit: {sld_id_cache.get_hit_total() - hit_total} "
+                  f"Miss: {sld_id_cache.get_miss_total() - miss_total}\n")
 
-    def start(self):
-        self.process_arguments()
-        self.process_slds()
+    def update_bulk_slds(self, sld_labels):
+        req_source = database.DomainsDB.ZONE_FILE
+        req_tld_label = self._zone_file_tld
+        req_start_date = self._zone_file_date
+        req_until_date = self._zone_file_date
+        self._domains_db.bulk_update_fqdns(req_source,
+                                           sld_labels,
+                                           req_tld_label,
+                                           req_start_date,
+                                           req_until_date)
+
+    def process_bulk_slds(self):
+        # A batch at a time, so memory and each transaction are bounded.
+        sld_labels = []
+        for sld in pack.generate_slds(self._sld_path_file):
+            sld_labels.append(sld)
+            if len(sld_labels) == Main.BULK_SLD_TOTAL:
+                self.update_bulk_slds(sld_labels)
+                sld_labels = []
+        if len(sld_labels) > 0:
+            self.update_bulk_slds(sld_labels)
+
+    def start(self, arguments=None):
+        self.process_arguments(arguments)
+        if self._bulk:
+            self.process_bulk_slds()
+        else:
+            self.process_slds()
+
+#-------------------------------------------------------------------------------
+
+def start_pool(arguments):
+    # Within a pool process, through distribute.call_main.
+    main = Main(pool=True)
+    main.start(arguments)
+
+#-------------------------------------------------------------------------------
 
 if __name__ == '__main__':
     main = Main()
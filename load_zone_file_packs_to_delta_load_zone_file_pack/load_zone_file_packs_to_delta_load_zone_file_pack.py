@@ -0,0 +1,211 @@
+# Setup
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
+# Internal
+import argparse
+
+# Local
+import pack
+import util
+
+#-------------------------------------------------------------------------------
+
+class SldPartWriter():
+
+    def __init__(self, sld_path, part_size, pack_format):
+        # Numbered parts of part size slds each, as made by the parser, where
+        # a part is only made once an sld is written to it.
+        self._sld_path = sld_path
+        self._part_size = part_size
+        self._pack_format = pack_format
+        self._part_number = 0
+        self._part_sld_total = 0
+        self._sld_total = 0
+        self._sld_handle = None
+        self._sld_writer = None
+
+    def get_sld_total(self):
+        return self._sld_total
+
+    def _open_part(self):
+        self._part_number = self._part_number + 1
+        self._part_sld_total = 0
+        if self._pack_format == Main.BINARY:
+            sld_path_file = os.path.join(self._sld_path, f"{self._part_number:06}{pack.SLD_BINARY_SUFFIX}")
+            self._sld_writer = pack.SldWriter(sld_path_file)
+        else:
+            sld_path_file = os.path.join(self._sld_path, f"{self._part_number:06}{pack.SLD_TEXT_SUFFIX}")
+            self._sld_handle = open(sld_path_file, "w")
+
+    def _close_part(self):
+        if self._sld_writer is not None:
+            self._sld_writer.close()
+            self._sld_writer = None
+        if self._sld_handle is not None:
+            self._sld_handle.close()
+            self._sld_handle = None
+
+    def write(self, sld):
+        if ((self._sld_writer is None) and (self._sld_handle is None)):
+            self._open_part()
+        if self._sld_writer is not None:
+            self._sld_writer.write(sld.encode())
+        else:
+            self._sld_handle.write(sld + "\n")
+        self._part_sld_total = self._part_sld_total + 1
+        self._sld_total = self._sld_total + 1
+        if self._part_sld_total == self._part_size:
+            self._close_part()
+
+    def close(self):
+        self._close_part()
+
+#-------------------------------------------------------------------------------
+
+class Main():
+
+    # Pack format.
+    TEXT = "text"
+    BINARY = "binary"
+
+    PACK_FORMATS = [TEXT, BINARY]
+
+    def __init__(self):
+        # Arguments.
+        self._from_load_zone_file_pack_path = None
+        self._to_load_zone_file_pack_path = None
+        self._delta_load_zone_file_pack_path = None
+        self._part_size = None
+        self._pack_format = None
+
+        # State.
+        self._from_config = None
+        self._to_config = None
+
+    def process_arguments(self):
+        argument_parser = argparse.ArgumentParser()
+        argument_parser.add_argument("--from_load_zone_file_pack_path",
+                                     type=str,
+                                     required=True,
+                                     help="Load Zone File pack path, of the earlier capture, as made with --sort. "
+                                          "Must exist. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--to_load_zone_file_pack_path",
+                                     type=str,
+                                     required=True,
+                                     help="Load Zone File pack path, of the later capture of the same TLD, as made with --sort. "
+                                          "Must exist. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--delta_load_zone_file_pack_path",
+                                     type=str,
+                                     required=True,
+                                     help="Delta Load Zone File pack path. "
+                                          "Must exist and must be empty. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--part_size",
+                                     type=int,
+                                     required=True,
+                                     help="Part size, in slds. "
+                                          "Must be 1 or more. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--pack_format",
+                                     type=str,
+                                     choices=Main.PACK_FORMATS,
+                                     default=Main.TEXT,
+                                     help="Pack format of the sld parts. "
+                                          "Either text, as NNNNNN.sld.txt with an sld per line, "
+                                          "or binary, as NNNNNN.sld.bin with slds front coded in blocks. "
+                                          "Default: text. "
+                                          "(Optional)")
+
+        namespace = argument_parser.parse_args()
+        self._from_load_zone_file_pack_path = util.make_item_path_exist(namespace.from_load_zone_file_pack_path)
+        self._to_load_zone_file_pack_path = util.make_item_path_exist(namespace.to_load_zone_file_pack_path)
+        self._delta_load_zone_file_pack_path = util.make_item_path_exist_empty(namespace.delta_load_zone_file_pack_path)
+        self._part_size = util.make_int_ge(namespace.part_size, 1)
+        self._pack_format = namespace.pack_format
+
+    def process_config(self):
+        self._from_config = util.Config(self._from_load_zone_file_pack_path)
+        self._from_config.read()
+        self._to_config = util.Config(self._to_load_zone_file_pack_path)
+        self._to_config.read()
+        if self._from_config.get_value("zone_file_tld") != self._to_config.get_value("zone_file_tld"):
+            msg = "Unexpected Load Zone File packs of different TLDs\n"
+            util.stop(msg)
+        if self._from_config.get_value("zone_file_date") >= self._to_config.get_value("zone_file_date"):
+            msg = "Unexpected from Load Zone File pack not earlier than to Load Zone File pack\n"
+            util.stop(msg)
+
+    def generate_config(self):
+        # As the later capture, alongside the date of the earlier.
+        config = util.Config(self._delta_load_zone_file_pack_path)
+        config.add_entry_str("domains_database_user", self._to_config.get_value("domains_database_user"))
+        config.add_entry_str("domains_database_password", self._to_config.get_value("domains_database_password"))
+        for key in ["domains_database_backend", "domains_database_path_file"]:
+            if self._to_config.find_none_value(key) is not None:
+                config.add_entry_str(key, self._to_config.get_value(key))
+        config.add_entry_str("zone_file_tld", self._to_config.get_value("zone_file_tld"))
+        config.add_entry_date("zone_file_date", self._to_config.get_value("zone_file_date"))
+        config.add_entry_date("delta_zone_file_date", self._from_config.get_value("zone_file_date"))
+        # As merged from sorted packs.
+        config.add_entry_bool("sort", True)
+        config.write()
+
+    def generate_pack_slds(self, load_zone_file_pack_path):
+        # Every sld of the pack, in order, as checked, since a merge requires
+        # both packs sorted, each sld once.
+        last_sld = None
+        for file_name in sorted(os.listdir(load_zone_file_pack_path)):
+            if file_name.endswith(tuple(pack.SLD_SUFFIXES)):
+                for sld in pack.generate_slds(os.path.join(load_zone_file_pack_path, file_name)):
+                    if ((last_sld is not None) and (sld <= last_sld)):
+                        msg = f"Unexpected unsorted sld, as a delta requires packs made with --sort: {sld} within: {file_name}\n"
+                        util.stop(msg)
+                    last_sld = sld
+                    yield sld
+
+    def make_delta_path(self, delta_path):
+        path = os.path.join(self._delta_load_zone_file_pack_path, delta_path)
+        os.mkdir(path)
+        return path
+
+    def process_slds(self):
+        # A single merge of both packs, as each is sorted.
+        added_writer = SldPartWriter(self._delta_load_zone_file_pack_path, self._part_size, self._pack_format)
+        removed_writer = SldPartWriter(self.make_delta_path(pack.DELTA_REMOVED_PATH), self._part_size, self._pack_format)
+        unchanged_writer = SldPartWriter(self.make_delta_path(pack.DELTA_UNCHANGED_PATH), self._part_size, self._pack_format)
+        from_slds = self.generate_pack_slds(self._from_load_zone_file_pack_path)
+        to_slds = self.generate_pack_slds(self._to_load_zone_file_pack_path)
+        from_sld = next(from_slds, None)
+        to_sld = next(to_slds, None)
+        while ((from_sld is not None) or (to_sld is not None)):
+            if ((to_sld is None) or ((from_sld is not None) and (from_sld < to_sld))):
+                removed_writer.write(from_sld)
+                from_sld = next(from_slds, None)
+            elif ((from_sld is None) or (to_sld < from_sld)):
+                added_writer.write(to_sld)
+                to_sld = next(to_slds, None)
+            else:
+                unchanged_writer.write(to_sld)
+                from_sld = next(from_slds, None)
+                to_sld = next(to_slds, None)
+        added_writer.close()
+        removed_writer.close()
+        unchanged_writer.close()
+        util.info(f"Delta: "
+                  f"Added: {added_writer.get_sld_total()} "
+                  f"Removed: {removed_writer.get_sld_total()} "
+                  f"Unchanged: {unchanged_writer.get_sld_total()}\n")
+
+    def start(self):
+        self.process_arguments()
+        self.process_config()
+        self.generate_config()
+        self.process_slds()
+
+if __name__ == '__main__':
+    main = Main()
+    main.start()
@@ -8,6 +8,7 @@ import argparse
 import itertools
 
 # Local
+import database
 import util
 
 #-------------------------------------------------------------------------------
@@ -18,6 +19,8 @@ class Main():
         # Arguments.
         self._domains_database_user = None
         self._domains_database_password = None
+        self._domains_database_backend = None
+        self._domains_database_path_file = None
         self._inspect_date = None
         self._scan_key_values = None
         self._scan_formats = None
@@ -36,6 +39,20 @@ class Main():
                             required=True,
                             help="Domains Database password. "
                                  "(Mandatory)")
+        argument_parser.add_argument("--domains_database_backend",
+                                     type=str,
+                                     choices=database.BACKENDS,
+                                     default=database.MARIADB,
+                                     help="Domains Database backend. "
+                                          f"Either {database.MARIADB}, as a server, by the user and password, "
+                                          f"or {database.SQLITE}, as an embedded file, by --domains_database_path_file, made when absent. "
+                                          f"Default: {database.MARIADB}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_path_file",
+                                     type=str,
+                                     help=f"Domains Database path file, for the {database.SQLITE} backend. "
+                                          f"Mandatory for the {database.SQLITE} backend. "
+                                          "(Optional)")
         argument_parser.add_argument("--inspect_date",
                                      type=str,
                                      required=True,
@@ -76,6 +93,12 @@ class Main():
         namespace = argument_parser.parse_args()
         self._domains_database_user = namespace.domains_database_user
         self._domains_database_password = namespace.domains_database_password
+        self._domains_database_backend = namespace.domains_database_backend
+        if namespace.domains_database_path_file is not None:
+            self._domains_database_path_file = util.make_item_path_file_viable(namespace.domains_database_path_file)
+        elif self._domains_database_backend == database.SQLITE:
+            msg = f"Backend {database.SQLITE} requires --domains_database_path_file\n"
+            util.stop(msg)
         self._inspect_date = util.make_item_date(namespace.inspect_date)
         self._scan_key_values = namespace.scan_key_value
         for scan_key_value in self._scan_key_values:
@@ -120,6 +143,9 @@ class Main():
         self._config = util.Config(self._batch_pack_path)
         self._config.add_entry_str("domains_database_user", self._domains_database_user)
         self._config.add_entry_str("domains_database_password", self._domains_database_password)
+        self._config.add_entry_str("domains_database_backend", self._domains_database_backend)
+        if self._domains_database_path_file is not None:
+            self._config.add_entry_str("domains_database_path_file", self._domains_database_path_file)
         self._config.add_entry_date("inspect_date", self._inspect_date)
         self._config.write()
 
@@ -0,0 +1,123 @@
+# Setup
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
+# Internal
+import argparse
+import hashlib
+import time
+
+# Local
+import util
+import zone
+
+#-------------------------------------------------------------------------------
+
+class Main():
+
+    BLOCK_SIZE = 1024 * 1024 * 4
+
+    # Megabytes, as decimal.
+    MB = 1000 * 1000
+
+    def __init__(self):
+        # Arguments.
+        self._zone_file_path_file = None
+        self._repeat_total = None
+
+        # State.
+        self._zone_file_octet_total = None
+
+    def process_arguments(self):
+        argument_parser = argparse.ArgumentParser()
+        argument_parser.add_argument("--zone_file_path_file",
+                                     type=str,
+                                     required=True,
+                                     help="Zone File path file, as inflated. "
+                                          "Must exist. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--repeat_total",
+                                     type=int,
+                                     default=3,
+                                     help="Number of runs of each parser, of which the fastest is reported. "
+                                          "Default: 3. "
+                                          "(Optional)")
+
+        namespace = argument_parser.parse_args()
+        self._zone_file_path_file = util.make_item_path_file_exist(namespace.zone_file_path_file)
+        self._repeat_total = util.make_int_ge(namespace.repeat_total, 1)
+        self._zone_file_octet_total = os.path.getsize(self._zone_file_path_file)
+
+    def parse_line(self):
+        # As generate_sld, without the parts.
+        sha256 = hashlib.sha256()
+        sld_total = 0
+        last_sld = None
+        zone_file_handle = open(self._zone_file_path_file, "r")
+        zone_file_handle.readline()
+        for line in zone_file_handle:
+            sld = zone.make_line_sld(line)
+            if ((sld is not None) and (sld != last_sld)):
+                sha256.update(f"{sld}\n".encode())
+                sld_total = sld_total + 1
+                last_sld = sld
+        zone_file_handle.close()
+        return (sld_total, sha256.hexdigest())
+
+    def parse_block(self):
+        # As generate_block_slds, without the parts.
+        sha256 = hashlib.sha256()
+        sld_total = 0
+        last_sld = None
+        zone_file_handle = open(self._zone_file_path_file, "rb")
+        zone_file_handle.readline()
+        tail_octets = b""
+        remain = True
+        while remain:
+            block_octets = zone_file_handle.read(Main.BLOCK_SIZE)
+            if len(block_octets) == 0:
+                remain = False
+                block_octets = tail_octets
+            else:
+                block_octets = tail_octets + block_octets
+                eol_index = block_octets.rfind(b"\n") + 1
+                tail_octets = block_octets[eol_index:]
+                block_octets = block_octets[:eol_index]
+            (slds, last_sld) = zone.make_block_slds(block_octets, last_sld)
+            if len(slds) > 0:
+                sha256.update(b"\n".join(slds) + b"\n")
+                sld_total = sld_total + len(slds)
+        zone_file_handle.close()
+        return (sld_total, sha256.hexdigest())
+
+    def measure(self, label, parse):
+        seconds = None
+        for _ in range(self._repeat_total):
+            start_seconds = time.perf_counter()
+            (sld_total, digest) = parse()
+            run_seconds = time.perf_counter() - start_seconds
+            if ((seconds is None) or (run_seconds < seconds)):
+                seconds = run_seconds
+        rate = (self._zone_file_octet_total / Main.MB) / seconds
+        util.info(f"Parser: {label} "
+                  f"Slds: {sld_total} "
+                  f"Seconds: {seconds:.2f} "
+                  f"Rate: {rate:.1f} MB/s\n")
+        return (seconds, sld_total, digest)
+
+    def benchmark(self):
+        (line_seconds, line_sld_total, line_digest) = self.measure("line", self.parse_line)
+        (block_seconds, block_sld_total, block_digest) = self.measure("block", self.parse_block)
+        if ((line_sld_total, line_digest) != (block_sld_total, block_digest)):
+            msg = "Unexpected difference in slds between parsers\n"
+            util.stop(msg)
+        util.info(f"Speedup: {line_seconds / block_seconds:.2f}\n")
+
+    def start(self):
+        self.process_arguments()
+        self.benchmark()
+
+if __name__ == '__main__':
+    main = Main()
+    main.start()
@@ -5,26 +5,217 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__f
 
 # Internal
 import argparse
+import io
+import time
+import zlib
 
 # Local
+import database
+import distribute
+import pack
+import sort
 import util
+import zone
+
+#-------------------------------------------------------------------------------
+
+class TaskRange(distribute.Task):
+
+    def __init__(self, 
+                 zone_file_path_file,
+                 head_index,
+                 tail_index,
+                 load_zone_file_pack_path,
+                 range_count,
+                 parser):
+        self._zone_file_path_file = zone_file_path_file
+        self._parser = parser
+        self._head_index = head_index
+        self._tail_index = tail_index
+        self._range_path_file = os.path.join(load_zone_file_pack_path, f"{range_count:06}.range.txt")
+        log_path_file = os.path.join(load_zone_file_pack_path, f"{range_count:06}.range.log.txt")
+        distribute.Task.__init__(self,
+                                 log_path_file=log_path_file) 
+
+    def get_range_path_file(self):
+        return self._range_path_file
+
+    def make_command(self):
+        script_path_file = os.path.abspath(__file__)
+        script_path = os.path.dirname(script_path_file)
+        range_py_path_file = os.path.join(script_path, "zone_file_to_load_zone_file_pack_range.py")
+        command = [sys.executable,
+                   range_py_path_file,
+                   "--zone_file_path_file", self._zone_file_path_file,
+                   "--head_index", str(self._head_index),
+                   "--tail_index", str(self._tail_index),
+                   "--range_path_file", self._range_path_file,
+                   "--parser", self._parser]
+        return command
+
+    def tidy(self):
+        os.remove(self._range_path_file)
+        os.remove(self._log_path_file)
+
+#-------------------------------------------------------------------------------
+
+class Archive(io.RawIOBase):
+
+    BLOCK_SIZE = 1024 * 1024 * 4
+    INFLATE_SIZE = 1024 * 1024 * 4
+    IDLE_FREQ_SECONDS = 1
+
+    # Gzip, rather than zlib or raw deflate.
+    GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+    def __init__(self,
+                 full_path_file,
+                 dat_path_file=None,
+                 frontier_path_file=None):
+        # When following, the archive is read as its parts arrive, up to the
+        # frontier published by the download, until renamed as complete.
+        io.RawIOBase.__init__(self)
+        self._full_path_file = full_path_file
+        self._dat_path_file = dat_path_file
+        self._frontier_path_file = frontier_path_file
+        self._handle = None
+        self._length = None
+        self._limit = None
+        self._index = 0
+        self._decompress = zlib.decompressobj(wbits=Archive.GZIP_WBITS)
+        self._octets = memoryview(b"")
+        self._octet_index = 0
+        self._eof = False
+
+    def get_index(self):
+        return self._index
+
+    def get_length(self):
+        return self._length
+
+    def readable(self):
+        return True
+
+    def open(self):
+        wait = False
+        while self._handle is None:
+            if os.path.isfile(self._full_path_file):
+                self._handle = open(self._full_path_file, "rb", buffering=0)
+                self._length = os.fstat(self._handle.fileno()).st_size
+                self._limit = self._length
+            elif ((self._dat_path_file is not None) and os.path.isfile(self._dat_path_file)):
+                # Preallocated, so already of full length.
+                self._handle = open(self._dat_path_file, "rb", buffering=0)
+                self._length = os.fstat(self._handle.fileno()).st_size
+                self._limit = 0
+            else:
+                if not wait:
+                    util.info(f"Wait: {self._full_path_file}\n")
+                    wait = True
+                time.sleep(Archive.IDLE_FREQ_SECONDS)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        io.RawIOBase.close(self)
+
+    def _follow(self):
+        frontier_record = util.Record(self._frontier_path_file)
+        frontier_record.read()
+        if frontier_record.get_value("Error") is not None:
+            msg = f"Unexpected Failure: Download: {self._dat_path_file} Error: {frontier_record.get_value('Error')}\n"
+            util.stop(msg)
+        index = frontier_record.get_value("Index")
+        if index is not None:
+            self._limit = max(self._limit, int(index))
+        elif os.path.isfile(self._full_path_file):
+            # Complete, and the frontier already tidied.
+            self._limit = self._length
+
+    def _read_block(self):
+        # Returns None once the whole archive is read.
+        while ((self._index == self._limit) and (self._limit < self._length)):
+            time.sleep(Archive.IDLE_FREQ_SECONDS)
+            self._follow()
+        block_octets = None
+        if self._index < self._length:
+            block_octets = os.pread(self._handle.fileno(), min(Archive.BLOCK_SIZE, self._limit - self._index), self._index)
+            if len(block_octets) == 0:
+                msg = f"Unexpected end of: {self._handle.name}\n"
+                util.stop(msg)
+            self._index = self._index + len(block_octets)
+        return block_octets
+
+    def _inflate(self):
+        # Gzip permits concatenated members. Output is bounded per call, so
+        # memory is bounded whatever the compression ratio.
+        if self._decompress.eof:
+            block_octets = self._decompress.unused_data
+            if len(block_octets) == 0:
+                block_octets = self._read_block()
+            if block_octets is not None:
+                self._decompress = zlib.decompressobj(wbits=Archive.GZIP_WBITS)
+        else:
+            block_octets = self._decompress.unconsumed_tail
+            if len(block_octets) == 0:
+                block_octets = self._read_block()
+            if block_octets is None:
+                msg = f"Unexpected end of gzip stream: {self._handle.name}\n"
+                util.stop(msg)
+        if block_octets is None:
+            self._eof = True
+        else:
+            try:
+                self._octets = memoryview(self._decompress.decompress(block_octets, Archive.INFLATE_SIZE))
+            except zlib.error as e:
+                msg = f"Unexpected gzip stream: {self._handle.name} Error: {e}\n"
+                util.stop(msg)
+            self._octet_index = 0
+
+    def readinto(self, buffer):
+        while ((self._octet_index == len(self._octets)) and (not self._eof)):
+            self._inflate()
+        size = min(len(buffer), len(self._octets) - self._octet_index)
+        buffer[:size] = self._octets[self._octet_index:self._octet_index + size]
+        self._octet_index = self._octet_index + size
+        return size
 
 #-------------------------------------------------------------------------------
 
 class Main():
 
-    IGNORE_RECORD_TYPES = ["nsec3",
-                           "nsec3param",
-                           "rrsig",
-                           "dnskey"]
+    # Parser.
+    LINE = "line"
+    BLOCK = "block"
+
+    PARSERS = [LINE, BLOCK]
+
+    BLOCK_SIZE = 1024 * 1024 * 4
+
+    SORT_MEMORY_SIZE = 1024 * 1024 * 256
+
+    # Pack format.
+    TEXT = "text"
+    BINARY = "binary"
+
+    PACK_FORMATS = [TEXT, BINARY]
 
     def __init__(self):
         # Arguments.
         self._domains_database_user = None
         self._domains_database_password = None
+        self._domains_database_backend = None
+        self._domains_database_path_file = None
         self._zone_file_path_file = None
         self._part_size = None
         self._load_zone_file_pack_path = None
+        self._follow = None
+        self._core_total = None
+        self._parser = None
+        self._sort = None
+        self._sort_memory_size = None
+        self._pack_format = None
 
         # State.
         self._zone_file_tld = None
@@ -34,6 +225,10 @@ class Main():
         self._zone_file_octet_count = None
         self._last_sld = None
         self._part_number = None
+        self._part_encode = None
+        self._sld_handle = None
+        self._sld_writer = None
+        self._archive = None
 
     def process_arguments(self):
         argument_parser = argparse.ArgumentParser()
@@ -47,11 +242,26 @@ class Main():
                             required=True,
                             help="Domains Database password. "
                                  "(Mandatory)")
+        argument_parser.add_argument("--domains_database_backend",
+                                     type=str,
+                                     choices=database.BACKENDS,
+                                     default=database.MARIADB,
+                                     help="Domains Database backend. "
+                                          f"Either {database.MARIADB}, as a server, by the user and password, "
+                                          f"or {database.SQLITE}, as an embedded file, by --domains_database_path_file, made when absent. "
+                                          f"Default: {database.MARIADB}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--domains_database_path_file",
+                                     type=str,
+                                     help=f"Domains Database path file, for the {database.SQLITE} backend. "
+                                          f"Mandatory for the {database.SQLITE} backend. "
+                                          "(Optional)")
         argument_parser.add_argument("--zone_file_path_file",
                                      type=str,
                                      required=True,
                                      help="Zone File path file. "
                                           "File name format: TLD#YYYY-MM-DD#full.txt "
+                                          "or, as a gzip archive, TLD#YYYY-MM-DD#full.txt.gz "
                                           "Must exist. "
                                           "(Mandatory)")
         argument_parser.add_argument("--part_size",
@@ -66,80 +276,180 @@ class Main():
                                      help="Load Zone File pack path. "
                                           "Must exist and must be empty. "
                                           "(Mandatory)")
+        argument_parser.add_argument("--follow",
+                                     default=False,
+                                     action="store_true",
+                                     help="Follow the download of a Zone File archive, parsing its parts as they arrive. "
+                                          "The Zone File path file is then as within the Zone Files pack, "
+                                          "in file name format: TLD#YYYY-MM-DD#full.txt.gz "
+                                          "and need not yet exist. "
+                                          "(Optional)")
+        argument_parser.add_argument("--core_total",
+                                     type=int,
+                                     default=1,
+                                     help="Number of cores. "
+                                          "When more than 1, the Zone File is split into ranges of lines, each parsed on its own core. "
+                                          "Requires the Zone File as TLD#YYYY-MM-DD#full.txt "
+                                          "Default: 1. "
+                                          "(Optional)")
+        argument_parser.add_argument("--parser",
+                                     type=str,
+                                     choices=Main.PARSERS,
+                                     default=Main.LINE,
+                                     help="Parser. "
+                                          "Either line, as a decode and split per line, "
+                                          "or block, as a faster parse over large blocks of octets. "
+                                          "Default: line. "
+                                          "(Optional)")
+        argument_parser.add_argument("--sort",
+                                     default=False,
+                                     action="store_true",
+                                     help="Sort the slds, each once across the whole Zone File, "
+                                          "rather than only without consecutive repeats. "
+                                          "(Optional)")
+        argument_parser.add_argument("--sort_memory_size",
+                                     type=int,
+                                     default=Main.SORT_MEMORY_SIZE,
+                                     help="Sort memory size, in octets, beyond which sorted runs are spilled to the Load Zone File pack path. "
+                                          f"Default: {Main.SORT_MEMORY_SIZE}. "
+                                          "(Optional)")
+        argument_parser.add_argument("--pack_format",
+                                     type=str,
+                                     choices=Main.PACK_FORMATS,
+                                     default=Main.TEXT,
+                                     help="Pack format of the sld parts. "
+                                          "Either text, as NNNNNN.sld.txt with an sld per line, "
+                                          "or binary, as NNNNNN.sld.bin with slds front coded in blocks. "
+                                          "Default: text. "
+                                          "(Optional)")
 
         namespace = argument_parser.parse_args()
         self._domains_database_user = namespace.domains_database_user
         self._domains_database_password = namespace.domains_database_password
-        self._zone_file_path_file = util.make_item_path_file_exist(namespace.zone_file_path_file)
+        self._domains_database_backend = namespace.domains_database_backend
+        if namespace.domains_database_path_file is not None:
+            self._domains_database_path_file = util.make_item_path_file_viable(namespace.domains_database_path_file)
+        elif self._domains_database_backend == database.SQLITE:
+            msg = f"Backend {database.SQLITE} requires --domains_database_path_file\n"
+            util.stop(msg)
+        self._follow = namespace.follow
+        if self._follow:
+            self._zone_file_path_file = util.make_item_path_file_viable(namespace.zone_file_path_file)
+            zone_file_formats = ["TLD#YYYY-MM-DD#full.txt.gz"]
+        else:
+            self._zone_file_path_file = util.make_item_path_file_exist(namespace.zone_file_path_file)
+            zone_file_formats = ["TLD#YYYY-MM-DD#full.txt", "TLD#YYYY-MM-DD#full.txt.gz"]
         zone_file_file_name = os.path.basename(self._zone_file_path_file)
         zone_file_file_name_parts = zone_file_file_name.split("#")
-        if len(zone_file_file_name_parts) != 3:
-            msg = "Zone file path file not in format: TLD#YYYY-MM-DD#full.txt\n"
+        if ((len(zone_file_file_name_parts) != 3) or
+            (zone_file_file_name_parts[2] not in [zone_file_format.split("#")[2] for zone_file_format in zone_file_formats])):
+            msg = f"Zone file path file not in format: {' or '.join(zone_file_formats)}\n"
             util.stop(msg)
         self._zone_file_tld = zone_file_file_name_parts[0]
         self._zone_file_date = util.make_item_date(zone_file_file_name_parts[1])
         self._part_size = util.make_int_ge(namespace.part_size, 1)
         self._load_zone_file_pack_path = util.make_item_path_exist_empty(namespace.load_zone_file_pack_path)
-        self._zone_file_octet_total = os.path.getsize(self._zone_file_path_file)
+        self._core_total = util.make_int_ge(namespace.core_total, 1)
+        self._parser = namespace.parser
+        self._sort = namespace.sort
+        self._sort_memory_size = util.make_int_ge(namespace.sort_memory_size, 1)
+        self._pack_format = namespace.pack_format
+        if ((self._core_total > 1) and (self._follow or self._zone_file_path_file.endswith(".gz"))):
+            msg = "Zone file path file not in format: TLD#YYYY-MM-DD#full.txt as required for --core_total more than 1\n"
+            util.stop(msg)
         self._zone_file_octet_count = 0
         self._part_number = 0
 
-    def generate_sld(self, zone_file_handle):
+    def open_part(self):
+        # Binary parts are encoded as written, else text parts, as also
+        # written ahead of a sort.
         self._part_number = self._part_number + 1
-        sld_file_name = f"{self._part_number:06}.sld.txt"
-        sld_path_file = os.path.join(self._load_zone_file_pack_path, sld_file_name)
-        sld_handle = open(sld_path_file, "w")
+        if self._part_encode:
+            sld_path_file = os.path.join(self._load_zone_file_pack_path, f"{self._part_number:06}{pack.SLD_BINARY_SUFFIX}")
+            self._sld_writer = pack.SldWriter(sld_path_file)
+        else:
+            sld_path_file = os.path.join(self._load_zone_file_pack_path, f"{self._part_number:06}{pack.SLD_TEXT_SUFFIX}")
+            self._sld_handle = open(sld_path_file, "wb")
+
+    def write_part_slds(self, slds):
+        # As octets, without the newlines.
+        if self._sld_writer is not None:
+            for sld in slds:
+                self._sld_writer.write(sld)
+        else:
+            self._sld_handle.write(b"\n".join(slds) + b"\n")
+
+    def close_part(self):
+        if self._sld_writer is not None:
+            self._sld_writer.close()
+            self._sld_writer = None
+        if self._sld_handle is not None:
+            self._sld_handle.close()
+            self._sld_handle = None
+
+    def generate_sld(self, zone_file_handle):
+        self.open_part()
         remain = True
         current_part_size = 0
         while (remain and (current_part_size < self._part_size)):
-            # Line format:
-            # <Host Label><tab><TTL><tab><Record Class><tab><Record Type><tab><Record Data>[<tab><Extra>...]
-            # The Extra content is expected on the first and last lines.
             line = zone_file_handle.readline()
             self._zone_file_octet_count = self._zone_file_octet_count + len(line)
             if len(line) == 0:
                 remain = False
             else:
-                line_parts = line.split(sep="\t")
-                if len(line_parts) < 5:
-                    msg = f"Unexpected Line format: {line}\n"
-                    util.stop(msg)
-                host_label = line_parts[0]
-                record_type = line_parts[3]
-                if record_type not in Main.IGNORE_RECORD_TYPES:
-                    host_label_parts = host_label.split(sep=".")
-                    # Entries without an sld have form:
-                    # "tld." ==> ['tld', ''] ==> length as 2
-                    #
-                    # Entries with a sld have form:
-                    # "sld.tld." ==> ['sld', 'tld', ''] ==> length as 3
-                    #
-                    # Entries with a subdomain have form:
-                    # "subdomain.tld.com." ==> ['subdomain', 'sld', 'tld', ''] ==> length as 4
-                    # The sld always occurs without the subdomain, thus these
-                    # may be ignored.
-                    if len(host_label_parts) < 2:
-                        msg = f"Unexpected Host Label format: {host_label}\n"
-                        util.stop(msg)
-                    if len(host_label_parts) == 3:
-                        sld = host_label_parts[-3]
-                        if sld != self._last_sld:
-                            sld_handle.write(f"{sld}\n")
-                            current_part_size = current_part_size + 1
-                            self._last_sld = sld
-        sld_handle.close()
+                sld = zone.make_line_sld(line)
+                if ((sld is not None) and (sld != self._last_sld)):
+                    self.write_part_slds([sld.encode()])
+                    current_part_size = current_part_size + 1
+                    self._last_sld = sld
+        self.close_part()
         return remain
 
     def generate_config(self):
         self._config = util.Config(self._load_zone_file_pack_path)
         self._config.add_entry_str("domains_database_user", self._domains_database_user)
         self._config.add_entry_str("domains_database_password", self._domains_database_password)
+        self._config.add_entry_str("domains_database_backend", self._domains_database_backend)
+        if self._domains_database_path_file is not None:
+            self._config.add_entry_str("domains_database_path_file", self._domains_database_path_file)
         self._config.add_entry_str("zone_file_tld", self._zone_file_tld)
         self._config.add_entry_date("zone_file_date", self._zone_file_date)
+        self._config.add_entry_bool("sort", self._sort)
         self._config.write()
 
+    def open_zone_file(self, binary=False):
+        # An archive is inflated as read, never to disk.
+        if self._follow:
+            # As named by the download, while parts still arrive.
+            zone_prefix = self._zone_file_path_file[:-len("#full.txt.gz")]
+            self._archive = Archive(self._zone_file_path_file,
+                                    dat_path_file=f"{zone_prefix}#full.dat.bin",
+                                    frontier_path_file=f"{zone_prefix}#full.frontier.txt")
+        elif self._zone_file_path_file.endswith(".gz"):
+            self._archive = Archive(self._zone_file_path_file)
+        if self._archive is not None:
+            self._archive.open()
+            zone_file_handle = io.BufferedReader(self._archive, buffer_size=Archive.BLOCK_SIZE)
+            if not binary:
+                zone_file_handle = io.TextIOWrapper(zone_file_handle)
+        else:
+            self._zone_file_octet_total = os.path.getsize(self._zone_file_path_file)
+            if binary:
+                zone_file_handle = open(self._zone_file_path_file, "rb")
+            else:
+                zone_file_handle = open(self._zone_file_path_file, "r")
+        return zone_file_handle
+
+    def make_per(self):
+        # Compressed octets consumed, when an archive.
+        if self._archive is not None:
+            per = int((self._archive.get_index() / self._archive.get_length()) * 100)
+        else:
+            per = int((self._zone_file_octet_count / self._zone_file_octet_total) * 100)
+        return per
+
     def generate_slds(self):
-        zone_file_handle = open(self._zone_file_path_file, "r")
+        zone_file_handle = self.open_zone_file()
         # Discard header.
         line = zone_file_handle.readline()
         self._zone_file_octet_count = self._zone_file_octet_count + len(line)
@@ -148,16 +458,159 @@ class Main():
         last_per = None
         while remain:
             remain = self.generate_sld(zone_file_handle)
-            per = int((self._zone_file_octet_count / self._zone_file_octet_total) * 100)
+            per = self.make_per()
             if per != last_per:
                 util.info(f"{per}%\n")
                 last_per = per
         zone_file_handle.close()
 
+    def generate_block_slds(self):
+        zone_file_handle = self.open_zone_file(binary=True)
+        # Discard header.
+        line = zone_file_handle.readline()
+        self._zone_file_octet_count = self._zone_file_octet_count + len(line)
+
+        self.open_part()
+        current_part_size = 0
+        tail_octets = b""
+        remain = True
+        last_per = None
+        while remain:
+            block_octets = zone_file_handle.read(Main.BLOCK_SIZE)
+            self._zone_file_octet_count = self._zone_file_octet_count + len(block_octets)
+            if len(block_octets) == 0:
+                remain = False
+                block_octets = tail_octets
+            else:
+                # Whole lines only, where a partial last line is carried.
+                block_octets = tail_octets + block_octets
+                eol_index = block_octets.rfind(b"\n") + 1
+                tail_octets = block_octets[eol_index:]
+                block_octets = block_octets[:eol_index]
+            (slds, self._last_sld) = zone.make_block_slds(block_octets, self._last_sld)
+
+            # Parts as for the line parser.
+            sld_index = 0
+            while sld_index < len(slds):
+                sld_total = min(len(slds) - sld_index, self._part_size - current_part_size)
+                self.write_part_slds(slds[sld_index:sld_index + sld_total])
+                sld_index = sld_index + sld_total
+                current_part_size = current_part_size + sld_total
+                if current_part_size == self._part_size:
+                    self.close_part()
+                    self.open_part()
+                    current_part_size = 0
+            per = self.make_per()
+            if per != last_per:
+                util.info(f"{per}%\n")
+                last_per = per
+        self.close_part()
+        zone_file_handle.close()
+
+    def make_ranges(self):
+        # Newline aligned, so each range holds whole lines only.
+        zone_file_octet_total = os.path.getsize(self._zone_file_path_file)
+        head_indexes = [0]
+        zone_file_handle = open(self._zone_file_path_file, "rb")
+        for range_count in range(1, self._core_total):
+            index = (zone_file_octet_total * range_count) // self._core_total
+            if index > head_indexes[-1]:
+                zone_file_handle.seek(index - 1)
+                zone_file_handle.readline()
+                index = zone_file_handle.tell()
+                if ((index > head_indexes[-1]) and (index < zone_file_octet_total)):
+                    head_indexes.append(index)
+        zone_file_handle.close()
+        tail_indexes = [head_index - 1 for head_index in head_indexes[1:]] + [zone_file_octet_total - 1]
+        return list(zip(head_indexes, tail_indexes))
+
+    def generate_ranges(self):
+        task_manager = distribute.TaskManager(label="Ranges",
+                                              core_total=self._core_total,
+                                              track_freq_seconds=30)
+        for (range_count, (head_index, tail_index)) in enumerate(self.make_ranges(), start=1):
+            task_range = TaskRange(self._zone_file_path_file,
+                                   head_index,
+                                   tail_index,
+                                   self._load_zone_file_pack_path,
+                                   range_count,
+                                   self._parser)
+            task_manager.add_task(task_range)
+        task_manager.execute()
+
+        # Parts as for a single core, where an sld split across ranges is
+        # removed as a consecutive repeat.
+        task_ranges = task_manager.get_tasks()
+        self.open_part()
+        current_part_size = 0
+        last_per = None
+        for (range_count, task_range) in enumerate(task_ranges, start=1):
+            range_handle = open(task_range.get_range_path_file(), "rb")
+            for line in range_handle:
+                sld = line.rstrip(b"\n")
+                if sld != self._last_sld:
+                    self.write_part_slds([sld])
+                    current_part_size = current_part_size + 1
+                    self._last_sld = sld
+                    if current_part_size == self._part_size:
+                        self.close_part()
+                        self.open_part()
+                        current_part_size = 0
+            range_handle.close()
+            task_range.tidy()
+            per = int((range_count / len(task_ranges)) * 100)
+            if per != last_per:
+                util.info(f"{per}%\n")
+                last_per = per
+        self.close_part()
+
+    def sort_slds(self):
+        # The parts as generated are replaced by parts as sorted, where each
+        # sld occurs once, as a zone file need not be grouped by owner.
+        sorter = sort.Sorter(self._load_zone_file_pack_path, self._sort_memory_size)
+        part_total = self._part_number
+        last_per = None
+        for part_number in range(1, part_total + 1):
+            sld_path_file = os.path.join(self._load_zone_file_pack_path, f"{part_number:06}{pack.SLD_TEXT_SUFFIX}")
+            sld_handle = open(sld_path_file, "rb")
+            for line in sld_handle:
+                sorter.add(line[:-1])
+            sld_handle.close()
+            os.remove(sld_path_file)
+            per = int((part_number / part_total) * 100)
+            if per != last_per:
+                util.info(f"Sort: {per}%\n")
+                last_per = per
+
+        util.info(f"Merge: Spills: {sorter.get_run_total()}\n")
+        self._part_number = 0
+        self._part_encode = (self._pack_format == Main.BINARY)
+        self.open_part()
+        current_part_size = 0
+        for sld in sorter.generate():
+            self.write_part_slds([sld])
+            current_part_size = current_part_size + 1
+            if current_part_size == self._part_size:
+                self.close_part()
+                self.open_part()
+                current_part_size = 0
+        self.close_part()
+        sorter.tidy()
+
     def start(self):
         self.process_arguments()
         self.generate_config()
-        self.generate_slds()
+        # When sorted, parts are first made as text, then sorted into the
+        # pack format.
+        self._part_encode = ((self._pack_format == Main.BINARY) and (not self._sort))
+        if self._core_total > 1:
+            self.generate_ranges()
+        elif self._parser == Main.BLOCK:
+            self.generate_block_slds()
+        else:
+            self.generate_slds()
+        if self._sort:
+            self.sort_slds()
 
 if __name__ == '__main__':
     main = Main()
@@ -0,0 +1,128 @@
+# Setup
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
+# Internal
+import argparse
+
+# Local
+import util
+import zone
+
+#-------------------------------------------------------------------------------
+
+class Main():
+
+    # Parser.
+    LINE = "line"
+    BLOCK = "block"
+
+    PARSERS = [LINE, BLOCK]
+
+    BLOCK_SIZE = 1024 * 1024 * 4
+
+    def __init__(self):
+        # Arguments.
+        self._zone_file_path_file = None
+        self._head_index = None
+        self._tail_index = None
+        self._range_path_file = None
+        self._parser = None
+
+    def process_arguments(self):
+        argument_parser = argparse.ArgumentParser()
+        argument_parser.add_argument("--zone_file_path_file",
+                                     type=str,
+                                     required=True,
+                                     help="Zone File path file. "
+                                          "Must exist. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--head_index",
+                                     type=int,
+                                     required=True,
+                                     help="Index of the first octet of the range, as the start of a line. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--tail_index",
+                                     type=int,
+                                     required=True,
+                                     help="Index of the last octet of the range, as the end of a line. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--range_path_file",
+                                     type=str,
+                                     required=True,
+                                     help="Range path file, to hold the slds of the range. "
+                                          "(Mandatory)")
+        argument_parser.add_argument("--parser",
+                                     type=str,
+                                     choices=Main.PARSERS,
+                                     default=Main.LINE,
+                                     help="Parser. "
+                                          "Default: line. "
+                                          "(Optional)")
+
+        namespace = argument_parser.parse_args()
+        self._zone_file_path_file = util.make_item_path_file_exist(namespace.zone_file_path_file)
+        self._head_index = util.make_int_ge(namespace.head_index, 0)
+        self._tail_index = namespace.tail_index
+        self._range_path_file = util.make_item_path_file_viable(namespace.range_path_file)
+        self._parser = namespace.parser
+
+    def generate_line_range(self, zone_file_handle, range_handle, index):
+        last_sld = None
+        while index <= self._tail_index:
+            line = zone_file_handle.readline()
+            if len(line) == 0:
+                msg = f"Unexpected end of: {self._zone_file_path_file}\n"
+                util.stop(msg)
+            index = index + len(line)
+            sld = zone.make_line_sld(line.decode())
+            if ((sld is not None) and (sld != last_sld)):
+                range_handle.write(f"{sld}\n".encode())
+                last_sld = sld
+
+    def generate_block_range(self, zone_file_handle, range_handle, index):
+        last_sld = None
+        tail_octets = b""
+        while index <= self._tail_index:
+            block_octets = zone_file_handle.read(min(Main.BLOCK_SIZE, (self._tail_index + 1) - index))
+            if len(block_octets) == 0:
+                msg = f"Unexpected end of: {self._zone_file_path_file}\n"
+                util.stop(msg)
+            index = index + len(block_octets)
+            # Whole lines only, where a partial last line is carried, and the
+            # range ends with a whole line.
+            block_octets = tail_octets + block_octets
+            if index <= self._tail_index:
+                eol_index = block_octets.rfind(b"\n") + 1
+                tail_octets = block_octets[eol_index:]
+                block_octets = block_octets[:eol_index]
+            (slds, last_sld) = zone.make_block_slds(block_octets, last_sld)
+            if len(slds) > 0:
+                range_handle.write(b"\n".join(slds) + b"\n")
+
+    def generate_range(self):
+        # Consecutive repeats are removed within the range only, so the first
+        # sld may repeat the last sld of the prior range.
+        zone_file_handle = open(self._zone_file_path_file, "rb")
+        zone_file_handle.seek(self._head_index)
+        range_handle = open(self._range_path_file, "wb")
+        index = self._head_index
+        # Discard header.
+        if index == 0:
+            line = zone_file_handle.readline()
+            index = index + len(line)
+        if self._parser == Main.BLOCK:
+            self.generate_block_range(zone_file_handle, range_handle, index)
+        else:
+            self.generate_line_range(zone_file_handle, range_handle, index)
+        range_handle.close()
+        zone_file_handle.close()
+
+    def start(self):
+        self.process_arguments()
+        self.generate_range()
+
+if __name__ == '__main__':
+    main = Main()
+    main.start()